@@ -32,13 +32,23 @@ if not sys.warnoptions:
 from frescobaldi import toplevel
 toplevel.install()              # Add the path to frescobaldi to sys.path
 
+import startupprofile           # measure startup time if requested
+if any(arg in ('--profile-startup', '--profile-trace')
+       or arg.startswith('--profile-trace=') for arg in sys.argv[1:]):
+    startupprofile.enable()
+
 import checks                   # check whether Frescobaldi really can run
 
+import remoteclient             # hand simple command lines to a running instance
+if sys.argv[0] and not hasattr(sys, 'ps1'):   # not from an interactive shell
+    if remoteclient.handle_command_line(sys.argv[1:]):
+        sys.exit(0)
+
 import os
 import platform
 import re
 
-from PyQt6.QtCore import QSettings, QTimer, QUrl
+from PyQt6.QtCore import QSettings, QTimer
 from PyQt6.QtGui import QTextCursor
 from PyQt6.QtWidgets import QApplication
 
@@ -83,6 +93,11 @@ def parse_commandline():
         help=_("list the session names and exit"))
     parser.add_argument('-n', '--new', action="store_true", default=False,
         help=_("always start a new instance"))
+    parser.add_argument('--profile-startup', action="store_true", default=False,
+        help=_("report the time used by imports, plugins, panels and "
+               "extensions during startup"))
+    parser.add_argument('--profile-trace', metavar=_("FILE"),
+        help=_("profile the startup and save a trace in JSON format to FILE"))
     parser.add_argument('--python-ly', type=str, metavar=_("STR"), default="",
         help=_("path to python-ly"))
     parser.add_argument('files', metavar=_("file"), nargs='*',
@@ -115,18 +130,6 @@ def parse_commandline():
     return parser.parse_args(args[1:])
 
 
-def url(arg):
-    """Converts a filename-like argument to a QUrl."""
-    if re.match(r'^(https?|s?ftp)://', arg):
-        return QUrl(arg)
-    elif arg.startswith('file://'):
-        return QUrl.fromLocalFile(os.path.abspath(arg[7:]))
-    elif arg.startswith('file:'):
-        return QUrl.fromLocalFile(os.path.abspath(arg[5:]))
-    else:
-        return QUrl.fromLocalFile(os.path.abspath(arg))
-
-
 ## it would be nice if the LY check could move to checks and be performed
 ## earlier, before parsing the arguments.  That would mean that the --python-ly
 ## option be removed, and the PYTHONPATH is used to point Frescobaldi to another
@@ -190,7 +193,7 @@ def main(debug=False):
             sys.stdout.write(name + '\n')
         sys.exit(0)
 
-    urls = list(map(url, args.files))
+    urls = list(map(remoteclient.url, args.files))
 
     if not app.qApp.isSessionRestored():
 
@@ -207,7 +210,8 @@ def main(debug=False):
 
         if QSettings().value("splash_screen", True, bool):
             import splashscreen
-            splashscreen.show()
+            with startupprofile.measure('window', 'splashscreen'):
+                splashscreen.show()
 
     # application icon. On macOS this feature is not recommended, because it changes the launcher icon in the dock while the app is in use.
     if platform.system() != "Darwin":
@@ -223,12 +227,23 @@ def main(debug=False):
     import session          # Initialize QSessionManager support
     import sessions         # Initialize our own named session support
 
-    # boot Frescobaldi-specific stuff that should be running on startup
-    import viewhighlighter  # highlight arbitrary ranges in text
-    import progress         # creates progress bar in view space
-    import musicpos         # shows music time in statusbar
-    import autocomplete     # auto-complete input
-    import wordboundary     # better wordboundary behaviour for the editor
+    # boot Frescobaldi-specific stuff that should be running on startup,
+    # the modules are imported when their trigger signal is first emitted
+    import activation
+    # highlight arbitrary ranges in text
+    activation.register(app.viewCreated, 'viewhighlighter', 'highlighter')
+    # creates progress bar in view space
+    activation.register(app.viewSpaceCreated, 'progress', 'ProgressBar.instance')
+    # shows music time in statusbar
+    activation.register(app.viewSpaceCreated, 'musicpos', 'MusicPosition.instance')
+    # auto-complete input
+    activation.register(app.mainwindowCreated, 'autocomplete', 'CompleterManager.instance')
+    # better wordboundary behaviour for the editor
+    activation.register(app.viewCreated, 'wordboundary', 'handler.install_textedit')
+    # index of LilyPond files in the include path
+    activation.register(app.appStarted, 'projectindex', '_startup')
+    # unload documents that are not used for a long time
+    activation.register(app.appStarted, 'documentunloader', 'start')
 
     if app.qApp.isSessionRestored():
         # Restore session, we are started by the session manager
@@ -243,11 +258,13 @@ def main(debug=False):
             win.show()
             win.activateWindow()
     else:
-        win = mainwindow.MainWindow()
-        win.show()
-        win.activateWindow()
+        with startupprofile.measure('window', 'MainWindow'):
+            win = mainwindow.MainWindow()
+            win.show()
+            win.activateWindow()
     # make sure all dock tools are initialized and resized
-    app.qApp.processEvents()
+    with startupprofile.measure('window', 'processEvents'):
+        app.qApp.processEvents()
 
     # load specified session?
     doc = None
@@ -285,6 +302,9 @@ def main(debug=False):
 
     app.appStarted() # Emit the appStarted signal
 
+    if args.profile_startup or args.profile_trace:
+        QTimer.singleShot(0, lambda: startupprofile.finish(args.profile_trace))
+
     if not debug:
         sys.exit(app.run())
 
@@ -0,0 +1,86 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Lazy activation of subsystems.
+
+Subsystems that are not needed to show the first main window are not
+imported at startup. Instead they are registered here with a trigger, a
+Signal such as app.viewCreated or app.mainwindowCreated. The first time the
+signal is emitted, the module is imported and (optionally) a function in it
+is called with the arguments of the signal, so the object that caused the
+activation is also handled. After that, the module itself takes care of
+connecting to the signals it needs, as it did when it was imported directly.
+
+If a module is imported by other means before its trigger fires, it is not
+activated a second time.
+
+"""
+
+
+import importlib
+import sys
+
+import startupprofile
+
+
+_pending = {}   # module name -> list of (signal, slot)
+
+
+def register(signal, module, func=None):
+    """Import module the first time signal is emitted.
+
+    If func is given, it is the (dotted) name of a callable in module, that is
+    called with the arguments of the signal. A module can be registered with
+    more than one signal, it is activated by the first one that is emitted.
+
+    """
+    if module in sys.modules:
+        return
+    def slot(*args):
+        if activate(module) and func:
+            obj = sys.modules[module]
+            for name in func.split('.'):
+                obj = getattr(obj, name)
+            obj(*args)
+    signal.connect(slot)
+    _pending.setdefault(module, []).append((signal, slot))
+
+
+def activate(module):
+    """Import the module now if it was still pending.
+
+    Returns True if the module was imported by this call.
+
+    """
+    triggers = _pending.pop(module, None)
+    if triggers is None:
+        return False
+    for signal, slot in triggers:
+        signal.disconnect(slot)
+    if module in sys.modules:
+        return False
+    with startupprofile.measure('activation', module):
+        importlib.import_module(module)
+    return True
+
+
+def pending():
+    """Return the names of the modules that are not yet activated."""
+    return list(_pending)
@@ -56,6 +56,7 @@ mainwindowClosed = Signal()     # MainWindow
 documentCreated = Signal()      # Document
 documentUrlChanged = Signal()   # Document
 documentLoaded = Signal()       # Document
+documentUnloading = Signal()    # Document
 documentModificationChanged = Signal() # Document
 documentClosed = Signal()       # Document
 documentSaved = Signal()        # Document
@@ -82,10 +83,12 @@ def activeWindow():
             return w
         return windows[0]
 
-def openUrl(url, encoding=None):
+def openUrl(url, encoding=None, deferred=False):
     """Returns a Document instance for the given QUrl.
 
     If there is already a document with that url, it is returned.
+    If deferred is True, a newly created document is only loaded when it is
+    needed (see document.EditorDocument.new_deferred()).
 
     """
     d = findDocument(url)
@@ -103,7 +106,10 @@ def openUrl(url, encoding=None):
                 d.load(url)
         else:
             import document
-            d = document.EditorDocument.new_from_url(url, encoding)
+            if deferred and not url.isEmpty():
+                d = document.EditorDocument.new_deferred(url, encoding)
+            else:
+                d = document.EditorDocument.new_from_url(url, encoding)
     return d
 
 def findDocument(url):
@@ -113,10 +119,58 @@ def findDocument(url):
 
     """
     if not url.isEmpty():
+        filename = url.toLocalFile()
+        if filename:
+            return findDocumentByPath(filename)
         for d in documents:
             if url == d.url():
                 return d
 
+def findDocumentByPath(filename):
+    """Returns the Document with the given local filename if already loaded.
+
+    The lookup uses an index, maintained when documents are created, closed
+    or change their url. Returns None if there is no such document.
+
+    """
+    docs = findDocumentsByPath(filename)
+    if docs:
+        return docs[0]
+
+def findDocumentsByPath(filename):
+    """Returns a list of all Documents with the given local filename."""
+    import util
+    return list(_documentsByPath.get(util.path_key(filename), ()))
+
+def _indexDocument(doc, url=None):
+    """(Internal) Adds the document to the path index, under url or its url."""
+    import util
+    filename = (url or doc.url()).toLocalFile()
+    if filename:
+        _documentsByPath.setdefault(util.path_key(filename), []).append(doc)
+
+def _unindexDocument(doc, url=None):
+    """(Internal) Removes the document from the path index."""
+    import util
+    filename = (url or doc.url()).toLocalFile()
+    if filename:
+        key = util.path_key(filename)
+        docs = _documentsByPath.get(key, [])
+        if doc in docs:
+            docs.remove(doc)
+            if not docs:
+                del _documentsByPath[key]
+
+def _reindexDocument(doc, url, old):
+    """(Internal) Called when the url of a document changes."""
+    _unindexDocument(doc, old)
+    _indexDocument(doc, url)
+
+_documentsByPath = {}   # path_key(filename) -> list of documents with that filename
+documentCreated.connect(_indexDocument, -1000)
+documentUrlChanged.connect(_reindexDocument, -1000)
+documentClosed.connect(_unindexDocument, 1000)
+
 def instantiate():
     """Instantiate the global QApplication object."""
     global qApp
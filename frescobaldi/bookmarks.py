@@ -65,6 +65,7 @@ class Bookmarks(plugin.DocumentPlugin):
         document.loaded.connect(self.load)
         document.saved.connect(self.save)
         document.closed.connect(self.save)
+        document.unloading.connect(self.save)
         self.load() # initializes self._marks
 
     def marks(self, type=None):
@@ -182,6 +183,8 @@ class Bookmarks(plugin.DocumentPlugin):
 
     def save(self):
         """Saves the marks to the metainfo."""
+        if self.document().isDeferred():
+            return # the marks were saved when the document was unloaded
         d = {}
         for type in types:
             d[type] = lines = []
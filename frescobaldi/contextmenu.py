@@ -107,8 +107,17 @@ def jump_to_definition(cursor, menu, mainwindow):
                 def activate():
                     definition.goto_target(mainwindow, target)
             else:
-                a.setText(_("&Jump to definition (unknown)"))
-                a.setEnabled(False)
+                location = definition.indexed_target(node)
+                if location:
+                    filename, position = location
+                    a.setText(_("&Jump to definition (in {filename})").format(
+                        filename=util.homify(filename)))
+                    @a.triggered.connect
+                    def activate():
+                        definition.goto_location(mainwindow, filename, position)
+                else:
+                    a.setText(_("&Jump to definition (unknown)"))
+                    a.setEnabled(False)
         QTimer.singleShot(0, complete)
         return [a]
     return []
@@ -52,6 +52,20 @@ def target(node):
         return target
 
 
+def indexed_target(node):
+    """Return the (filename, position) where the node is defined, or None.
+
+    This looks in the project index (see projectindex.py), which contains
+    the files in the include path, also if they are not included by the
+    node's document.
+
+    """
+    import projectindex
+    locations = projectindex.definitions(node.name())
+    if locations:
+        return locations[0]
+
+
 def goto_definition(mainwindow, cursor=None):
     """Go to the definition of the item the mainwindow's cursor is at.
 
@@ -66,6 +80,10 @@ def goto_definition(mainwindow, cursor=None):
         if t:
             goto_target(mainwindow, t)
             return True
+        location = indexed_target(node)
+        if location:
+            goto_location(mainwindow, *location)
+            return True
 
 
 def goto_target(mainwindow, target):
@@ -78,8 +96,19 @@ def goto_target(mainwindow, target):
         # it is an included file, just load it
         filename = target.document.filename
         doc = app.openUrl(QUrl.fromLocalFile(filename))
+    goto_position(mainwindow, doc, target.position)
+
+
+def goto_location(mainwindow, filename, position):
+    """Switch to (or load) the file and go to the position."""
+    doc = app.openUrl(QUrl.fromLocalFile(filename))
+    goto_position(mainwindow, doc, position)
+
+
+def goto_position(mainwindow, doc, position):
+    """Switch to the document and set the cursor at the position."""
     cursor = QTextCursor(doc)
-    cursor.setPosition(target.position)
+    cursor.setPosition(min(position, doc.characterCount() - 1))
     browseriface.get(mainwindow).setTextCursor(cursor)
     mainwindow.currentView().centerCursor()
 
@@ -0,0 +1,114 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Stores and retrieves cached data in the user's cache directory.
+
+Everything stored here can be recomputed; the cache directory may be removed
+at any time. Objects are pickled, together with a version value. When an
+object is loaded with a different version (e.g. because the format of the
+data changed), it is discarded.
+
+"""
+
+
+import os
+import pickle
+
+from PyQt6.QtCore import QStandardPaths
+
+
+def directory(*names):
+    """Return the path of a (sub)directory in our cache directory.
+
+    The directory is created if it does not exist.
+
+    """
+    path = os.path.join(QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.CacheLocation), *names)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def filename(name):
+    """Return the full path of the cache file with the given name.
+
+    The name may contain slashes to refer to a file in a subdirectory.
+
+    """
+    dirname, basename = os.path.split(name)
+    return os.path.join(directory(dirname), basename)
+
+
+def load(name, version=None):
+    """Return the object stored under name, or None.
+
+    None is also returned if the object was stored with another version,
+    or if the file can't be read.
+
+    """
+    try:
+        with open(filename(name), 'rb') as f:
+            stored_version, obj = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError,
+            AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+    if stored_version == version:
+        return obj
+
+
+def save(name, obj, version=None):
+    """Store the object under name.
+
+    The file is written atomically, so a reader never sees a partially
+    written file. Returns True if the object was stored.
+
+    """
+    path = filename(name)
+    temp = path + '.tmp'
+    try:
+        with open(temp, 'wb') as f:
+            pickle.dump((version, obj), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except OSError:
+        return False
+    return True
+
+
+def remove(name):
+    """Remove the object stored under name, if any."""
+    try:
+        os.remove(filename(name))
+    except OSError:
+        pass
+
+
+def prune(dirname, count):
+    """Remove all but the count most recently stored files in dirname."""
+    path = directory(dirname)
+    try:
+        entries = [e for e in os.scandir(path) if e.is_file()]
+    except OSError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in entries[count:]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
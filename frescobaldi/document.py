@@ -30,10 +30,16 @@ GUI environment. That means: use EditorDocument for documents open in the
 editor, Document for "abstract" documents, for example to pass a generated
 document to a job.lilypond.LilyPondJob without implicitly creating a tab.
 
+An EditorDocument can also be created deferred, with new_deferred(). It then
+has an url but no contents yet; the file is read as soon as the document is
+displayed in a View or its text is queried. An unmodified document can be
+unloaded again (see documentunloader.py) to reclaim memory.
+
 """
 
 
 import os
+import time
 
 from PyQt6.QtCore import QTimer, QUrl
 from PyQt6.QtGui import QTextCursor, QTextDocument
@@ -171,6 +177,14 @@ class AbstractDocument(QTextDocument):
             self.setUrl(url)
         return url, filename
 
+    def isDeferred(self):
+        """Return True if the contents of the document are not yet loaded."""
+        return False
+
+    def ensureLoaded(self):
+        """Load the contents of a deferred document. Does nothing by default."""
+        pass
+
     def url(self):
         return self._url
 
@@ -231,6 +245,20 @@ class Document(AbstractDocument):
         self._save(url, filename)
 
 
+def _loading(name):
+    """Return the QTextDocument method name, wrapped so that it first loads
+    a deferred document and records the time the document was used."""
+    method = getattr(QTextDocument, name)
+    def wrapper(self, *args):
+        if self._deferred:
+            self.ensureLoaded()
+        self._lastUsed = time.monotonic()
+        return method(self, *args)
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
 class EditorDocument(AbstractDocument):
     """A Frescobaldi document for use in the main editor view.
     Basically this is an AbstractDocument with signals added."""
@@ -244,6 +272,27 @@ class EditorDocument(AbstractDocument):
     # occurring within a short time period, to avoid repeatedly triggering
     # slots while the user is typing
     changesStopped = signals.Signal()
+    # emitted before the contents of the document are unloaded, plugins that
+    # keep positions in the document can save them, they are restored when
+    # the document is loaded again
+    unloading = signals.Signal()
+
+    _deferred = False
+
+    # the methods that need the contents of a deferred document
+    toPlainText = _loading('toPlainText')
+    toRawText = _loading('toRawText')
+    isEmpty = _loading('isEmpty')
+    characterCount = _loading('characterCount')
+    characterAt = _loading('characterAt')
+    blockCount = _loading('blockCount')
+    begin = _loading('begin')
+    firstBlock = _loading('firstBlock')
+    lastBlock = _loading('lastBlock')
+    findBlock = _loading('findBlock')
+    findBlockByNumber = _loading('findBlockByNumber')
+    findBlockByLineNumber = _loading('findBlockByLineNumber')
+    find = _loading('find')
 
     @classmethod
     def new_from_url(cls, url, encoding=None):
@@ -253,8 +302,26 @@ class EditorDocument(AbstractDocument):
             app.documentLoaded(d)
         return d
 
-    def __init__(self, url=None, encoding=None):
+    @classmethod
+    def new_deferred(cls, url, encoding=None):
+        """Create and return a new document for url, without loading it yet.
+
+        Raises OSError if the url is not an existing local file. The contents
+        are loaded by ensureLoaded(), which is called automatically when the
+        document is displayed in a View or its text is requested.
+
+        """
+        filename = url.toLocalFile()
+        if not filename:
+            raise OSError("not a local file")
+        if not os.path.isfile(filename):
+            raise FileNotFoundError(filename)
+        return cls(url, encoding, deferred=True)
+
+    def __init__(self, url=None, encoding=None, deferred=False):
         super().__init__(url, encoding)
+        self._deferred = deferred
+        self._lastUsed = time.monotonic()
         self.modificationChanged.connect(self.slotModificationChanged)
         app.documents.append(self)
         app.documentCreated(self)
@@ -274,10 +341,56 @@ class EditorDocument(AbstractDocument):
         app.documents.remove(self)
 
     def load(self, url=None, encoding=None, keepUndo=False):
-        super().load(url, encoding, keepUndo)
+        deferred, self._deferred = self._deferred, False
+        try:
+            super().load(url, encoding, keepUndo)
+        except OSError:
+            self._deferred = deferred
+            raise
+        self._lastUsed = time.monotonic()
         self.loaded()
         app.documentLoaded(self)
 
+    def isDeferred(self):
+        """Return True if the contents of the document are not yet loaded."""
+        return self._deferred
+
+    def ensureLoaded(self):
+        """Load the contents if the document is deferred.
+
+        If the file can't be read (anymore), the document stays empty.
+
+        """
+        if self._deferred:
+            try:
+                self.load()
+            except OSError:
+                self._deferred = False
+
+    def unload(self):
+        """Discard the contents of the document to reclaim memory.
+
+        Only an unmodified document with an url can be unloaded. It becomes
+        deferred again, and is reloaded from disk when it is needed. Returns
+        True if the document was unloaded.
+
+        """
+        if self._deferred or self.isModified() or self._url.isEmpty():
+            return False
+        self.unloading()
+        app.documentUnloading(self)
+        # let everybody who keeps positions or caches see the text disappear
+        self.clear()
+        self.setModified(False)
+        self._deferred = True
+        self._changeTimer.stop()
+        return True
+
+    def lastUsed(self):
+        """Return the time.monotonic() value of the last time the text of the
+        document was requested or loaded."""
+        return self._lastUsed
+
     def save(self, url=None, encoding=None):
         url, filename = super().save(url, encoding)
         with self.saving(), app.documentSaving(self):
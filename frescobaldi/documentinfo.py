@@ -120,6 +120,32 @@ def defaultfilename(doc):
     return filename + ext
 
 
+def includepath():
+    """Return the configured include path.
+
+    A path is a list of directories.
+
+    If there is a session specific include path, it is used.
+    Otherwise the path is taken from the LilyPond preferences.
+
+    """
+    # get the global include path
+    include_path = qsettings.get_string_list(
+        QSettings(), "lilypond_settings/include_path")
+
+    # get the session specific include path
+    import sessions
+    session_settings = sessions.currentSessionGroup()
+    if session_settings and session_settings.value("set-paths", False, bool):
+        sess_path = qsettings.get_string_list(session_settings, "include-path")
+        if session_settings.value("repl-paths", False, bool):
+            include_path = sess_path
+        else:
+            include_path = sess_path + include_path
+
+    return include_path
+
+
 class DocumentInfo(plugin.DocumentPlugin):
     """Computes and caches various information about a Document.
 
@@ -195,21 +221,7 @@ class DocumentInfo(plugin.DocumentPlugin):
         Currently the document does not matter.
 
         """
-        # get the global include path
-        include_path = qsettings.get_string_list(
-            QSettings(), "lilypond_settings/include_path")
-
-        # get the session specific include path
-        import sessions
-        session_settings = sessions.currentSessionGroup()
-        if session_settings and session_settings.value("set-paths", False, bool):
-            sess_path = qsettings.get_string_list(session_settings, "include-path")
-            if session_settings.value("repl-paths", False, bool):
-                include_path = sess_path
-            else:
-                include_path = sess_path + include_path
-
-        return include_path
+        return includepath()
 
     def jobinfo(self, create=False):
         """Returns a two-tuple(filename, includepath).
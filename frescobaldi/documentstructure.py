@@ -28,9 +28,9 @@ from PyQt6.QtCore import QSettings
 
 import app
 import plugin
+import tokeniter
 
-import lydocument
-import ly.document
+import ly.lex
 
 # default outline patterns that are ignored in comments
 default_outline_patterns = [
@@ -54,6 +54,9 @@ r"\b(?P<alert>(FIXME|HACK|XXX+)\b\W*\w+)",
 _outline_re = None
 _outline_re_comments = None
 
+# incremented when the expressions change, invalidates all cached outlines
+_generation = 0
+
 
 def outline_re(comments):
     """Return the expression to look for document outline items.
@@ -67,8 +70,10 @@ def outline_re(comments):
 def _reset_outline_re():
     global _outline_re
     global _outline_re_comments
+    global _generation
     _outline_re = None
     _outline_re_comments = None
+    _generation += 1
 
 
 app.settingsChanged.connect(_reset_outline_re, -999)
@@ -108,50 +113,118 @@ def create_outline_re(comments):
     return re.compile(rx, re.MULTILINE | re.UNICODE)
 
 
+class OutlineItem:
+    """A match of an outline pattern in a block of the document.
+
+    The start(), group() and groupdict() methods mimic those of the match
+    object, but the position is always up-to-date, also when the text before
+    the block is changed.
+
+    """
+    __slots__ = ('block', 'match')
+
+    def __init__(self, block, match):
+        self.block = block
+        self.match = match
+
+    def start(self):
+        """Return the position of the match in the document."""
+        return self.block.position() + self.match.start()
+
+    def group(self, *args):
+        return self.match.group(*args)
+
+    def groupdict(self, default=None):
+        return self.match.groupdict(default)
+
+
 class DocumentStructure(plugin.DocumentPlugin):
+    """Maintains the outline of a document.
+
+    The outline items are cached for every text block, and only recomputed
+    for blocks that have changed. The tokens of the syntax highlighter are
+    used to exclude comments.
+
+    """
     def __init__(self, document):
         self._outline = None
+        self._generation = _generation
+        document.contentsChanged.connect(self.invalidate)
 
     def invalidate(self):
-        """Called when the document changes or the settings are changed."""
+        """Called when the document changes."""
         self._outline = None
-        app.settingsChanged.disconnect(self.invalidate)
-        self.document().contentsChanged.disconnect(self.invalidate)
 
     def outline(self):
-        """Return the document outline as a series of match objects."""
-        if self._outline is None:
-            # match patterns excluding comments
-            active_code = self.remove_comments()
-            outline_list = list(outline_re(False).finditer(active_code))
-            # match patterns including comments
-            outline_list_comments = list(outline_re(True).finditer(self.document().toPlainText()))
-            # merge lists and sort by start position
-            self._outline = outline_list + outline_list_comments
-            self._outline.sort(key=lambda match: match.start())
-            self.document().contentsChanged.connect(self.invalidate)
-            app.settingsChanged.connect(self.invalidate, -999)
+        """Return the document outline as a list of OutlineItem objects.
+
+        Items belonging to blocks that did not change are the same objects
+        as in the previous list; use diff() to find out what changed.
+
+        """
+        if self._outline is None or self._generation != _generation:
+            self._generation = _generation
+            outline = []
+            block = self.document().firstBlock()
+            while block.isValid():
+                outline.extend(self.block_outline(block))
+                block = block.next()
+            self._outline = outline
         return self._outline
 
-    def remove_comments(self):
-        """Remove Lilypond comments from text"""
-        def whiteout_section(cursor, start, end):
-            spaces = ''.join(' ' for x in range(start, end))
-            with cursor.document as doc:
-                doc[start:end] = spaces
-
-        doc = ly.document.Document(self.document().toPlainText())
-        cursor = lydocument.Cursor(doc)
-        source = ly.document.Source(cursor, True, tokens_with_position=True)
-        start = 0
-        for token in source:
-            if isinstance(token, ly.lex.BlockCommentStart):
-                start = token.pos
-            elif isinstance(token, ly.lex.BlockCommentEnd):
-                if start:
-                    whiteout_section(cursor, start, token.end)
-                    start = 0
-            elif isinstance(token, ly.lex.Comment):
-                whiteout_section(cursor, token.pos, token.end)
-        return cursor.document.plaintext()
+    def block_outline(self, block):
+        """Return the list of OutlineItem objects for the block.
 
+        The list is cached in the block's user data, as long as the tokens
+        of the highlighter do not change.
+
+        """
+        tokens = getattr(block.userData(), 'tokens', None)
+        try:
+            generation, cached_tokens, items = block.userData().outline
+        except AttributeError:
+            pass
+        else:
+            if tokens is not None and tokens is cached_tokens and generation == _generation:
+                return items
+        text = block.text()
+        if tokens is None:
+            tokens = tokeniter.tokens(block)
+        items = self._match_block(block, text, tokens)
+        # only cache if the highlighter has run, so we can check the tokens
+        if getattr(block.userData(), 'tokens', None) is tokens:
+            block.userData().outline = (_generation, tokens, items)
+        return items
+
+    def _match_block(self, block, text, tokens):
+        """(internal) Return the outline items for the block's text."""
+        code = text
+        if any(isinstance(t, ly.lex.Comment) for t in tokens):
+            chars = list(text)
+            for t in tokens:
+                if isinstance(t, ly.lex.Comment):
+                    chars[t.pos:t.end] = ' ' * (t.end - t.pos)
+            code = ''.join(chars)
+        matches = list(outline_re(False).finditer(code))
+        matches.extend(outline_re(True).finditer(text))
+        matches.sort(key=lambda match: match.start())
+        return [OutlineItem(block, m) for m in matches]
+
+
+def diff(old, new):
+    """Compare two outline lists and return a three-tuple (start, old_end, new_end).
+
+    The items old[start:old_end] have been replaced by new[start:new_end];
+    the items before start and after the end are the same objects.
+    If nothing changed, start equals both old_end and new_end.
+
+    """
+    start = 0
+    end = min(len(old), len(new))
+    while start < end and old[start] is new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] is new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_end
@@ -0,0 +1,78 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Unloads documents that have not been used for some time, to reclaim memory.
+
+Only unmodified documents with an url that are not displayed in any View and
+that have no point and click links bound to them are unloaded (see
+document.EditorDocument.unload()); they are read from disk again as soon as
+they are needed. The time is set in the Sessions preferences,
+zero disables unloading.
+
+"""
+
+
+import time
+
+from PyQt6.QtCore import QSettings, QTimer
+
+import app
+import pointandclick
+
+
+_timer = None
+
+
+def start():
+    """Start checking for unused documents every minute."""
+    global _timer
+    if _timer is None:
+        _timer = QTimer(interval=60000, timeout=check)
+        _timer.start()
+
+
+def minutes():
+    """Return the time in minutes after which unused documents are unloaded."""
+    return QSettings().value("session/unload_minutes", 30, int)
+
+
+def displayed_documents():
+    """Return the set of documents that have a View in any main window."""
+    docs = set()
+    for win in app.windows:
+        for space in win.viewManager.viewSpaces():
+            docs.update(view.document() for view in space.views)
+    return docs
+
+
+def check():
+    """Unload the documents that have not been used for the configured time.
+
+    Returns the number of documents that were unloaded.
+
+    """
+    m = minutes()
+    if m <= 0:
+        return 0
+    limit = time.monotonic() - m * 60
+    displayed = displayed_documents()
+    return sum(doc.unload() for doc in app.documents
+               if doc not in displayed and doc.lastUsed() < limit
+               and not pointandclick.isbound(doc))
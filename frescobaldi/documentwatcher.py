@@ -88,19 +88,16 @@ def unchange(document):
 
 def documentUrlChanged(document, url, old):
     """Called whenever the URL of an existing Document changes."""
-    for d in app.documents:
-        if d.url() == old:
-            break
-    else:
+    if not app.findDocument(old):
         removeUrl(old)
     addUrl(url)
 
 
 def documentClosed(document):
     """Called whenever a document closes."""
-    for d in app.documents:
-        if d is not document and d.url() == document.url():
-            return
+    filename = document.url().toLocalFile()
+    if any(d is not document for d in app.findDocumentsByPath(filename)):
+        return
     removeUrl(document.url())
 
 
@@ -141,7 +138,8 @@ def start():
         app.documentSaving.connect(whileSaving)
         watcher.fileChanged.connect(fileChanged)
         for d in app.documents:
-            documentLoaded(d)
+            if not d.isDeferred():
+                documentLoaded(d)
 
 
 def stop():
@@ -53,10 +53,11 @@ from PyQt6.QtWidgets import (
 
 import app
 import icons
+import startupprofile
 import vbcl
 import qsettings
 import util
-from . import actions, settings
+from . import actions, declared, settings
 
 
 class Extension(QObject):
@@ -166,13 +167,19 @@ class Extension(QObject):
         return widget
 
     def create_panel(self):
-        """Create the Extension's Tool Panel if a widget class is provided."""
+        """Create the Extension's Tool Panel if a widget class is provided.
+        If the panel was declared in the extension's info file, the
+        declared panel is taken over."""
         if self._panel_widget_class:
             from . import panel
-            self._panel = panel.ExtensionPanel(
-                self,
-                self._panel_widget_class,
-                self._panel_dock_area)
+            self._panel = self.parent().declared_panel(self.name())
+            if self._panel:
+                self._panel.set_extension(self, self._panel_widget_class)
+            else:
+                self._panel = panel.ExtensionPanel(
+                    self,
+                    self._panel_widget_class,
+                    self._panel_dock_area)
 
     def display_name(self):
         """Return the display name of the extension, or the extension
@@ -213,12 +220,6 @@ class Extension(QObject):
         actions and hierarchical submenus.
         """
 
-        def add_action_or_submenu(m, entry):
-            if isinstance(entry, QMenu):
-                m.addMenu(entry)
-            else:
-                m.addAction(entry)
-
         m = self._menus.get(target, None)
         if not m:
             # Menu is not cached already, create it
@@ -238,15 +239,32 @@ class Extension(QObject):
                 self.display_name(), self.mainwindow())
             if self.has_icon():
                 m.setIcon(self.icon())
-            if panel and target == 'tools':
-                panel.toggleViewAction().setText(_("&Tool Panel"))
-                m.addAction(panel.toggleViewAction())
-                if actions:
-                    m.addSeparator()
-            for entry in actions:
-                add_action_or_submenu(m, entry)
+            self.populate_menu(m, target)
         return m
 
+    def populate_menu(self, m, target):
+        """Add the panel's toggle action (for the 'tools' target)
+        and the actions or submenus for the given target to the menu."""
+        actions = self.action_collection().menu_actions(target)
+        panel = self.panel()
+        if panel and target == 'tools':
+            panel.toggleViewAction().setText(_("&Tool Panel"))
+            m.addAction(panel.toggleViewAction())
+            if actions:
+                m.addSeparator()
+        for entry in actions:
+            if isinstance(entry, QMenu):
+                m.addMenu(entry)
+            else:
+                m.addAction(entry)
+
+    def adopt_menu(self, target, m):
+        """Take over a menu that was created from the declarations in
+        the extension's info file, replacing its contents."""
+        m.clear()
+        self._menus[target] = m
+        self.populate_menu(m, target)
+
     def name(self):
         """Return the extension's internal name
         (which actually is retrieved from the directory name)."""
@@ -536,7 +554,12 @@ class FailedTree(QTreeView):
 
 class Extensions(QObject):
     """Global object managing the extensions.
-    Accessed with app.extensions()"""
+    Accessed with app.extensions()
+
+    Extensions that declare their Tool panel or actions in their
+    extension.cnf file are not imported at startup, but when the panel
+    is shown or one of the actions is used (see the declared module).
+    """
 
     def __init__(self, mainwindow):
         super().__init__()
@@ -549,6 +572,7 @@ class Extensions(QObject):
         self._icons = {}
         self._infos = {}
         self._extensions = {}
+        self._declared = {}
         self._extensions_ordered = []
         self._failed_infos = {}
         self._failed_dependencies = []
@@ -575,15 +599,17 @@ class Extensions(QObject):
             if (self._failed_infos
                 or self._failed_extensions
                 or self._failed_dependencies):
-                FailedTree._model = FailedModel(self, {
-                    'infos': self._failed_infos,
-                    'dependencies': self._failed_dependencies,
-                    'exceptions': self._failed_extensions
-                })
+                self.update_failed()
                 self.report_failed()
-        del self._failed_infos
-        del self._failed_dependencies
-        del self._failed_extensions
+
+    def update_failed(self):
+        """Update the model of the failed extensions tree
+        from the recorded failures."""
+        FailedTree._model = FailedModel(self, {
+            'infos': self._failed_infos,
+            'dependencies': self._failed_dependencies,
+            'exceptions': self._failed_extensions
+        })
 
     def active(self):
         """Returns True if extensions are enabled globally."""
@@ -678,36 +704,85 @@ class Extensions(QObject):
         return reversed(result)
 
     def load_extensions(self):
-        """Load active extensions in topological order."""
+        """Load active extensions in topological order.
+        Extensions that declare their panel or actions are only
+        registered, they are loaded on first use."""
         root = self.root_directory()
         if root not in sys.path:
             sys.path.append(root)
 
         for ext in [ext for ext  in self._extensions_ordered
             if ext not in self.inactive_extensions()]:
+            # Add extension's icons dir (if present) to icon search path
+            icon_path = os.path.join(self.root_directory(), ext, 'icons')
+            if os.path.isdir(icon_path):
+                search_paths = QDir.searchPaths('icons')
+                QDir.setSearchPaths('icons', [icon_path] + search_paths)
+            if declared.is_declared(self.infos(ext)):
+                self._declared[ext] = declared.DeclaredExtension(self, ext)
+                continue
             try:
-                # measure loading time
-                start = perf_counter()
-                # Try importing the module. Will fail here if there's
-                # no Python module in the subdirectory or loading the module
-                # produces errors
-                module = importlib.import_module(ext)
-                # Add extension's icons dir (if present) to icon search path
-                icon_path = os.path.join(self.root_directory(), ext, 'icons')
-                if os.path.isdir(icon_path):
-                    search_paths = QDir.searchPaths('icons')
-                    QDir.setSearchPaths('icons', [icon_path] + search_paths)
-                # Instantiate the extension,
-                # this will fail if the module is no valid extension
-                # (doesn't have an Extension class) or has other errors in it
-                extension = module.Extension(self, ext)
-                end = perf_counter()
-                extension.set_load_time(
-                    f"{(end - start) * 1000:.2f} ms")
-                self._extensions[ext] = extension
+                self._load_extension(ext)
             except Exception:
                 self._failed_extensions[ext] = sys.exc_info()
 
+    def _load_extension(self, ext):
+        """Import the extension module and instantiate the Extension.
+        Extensions it depends on are loaded first."""
+        deps = (self.infos(ext) or {}).get('dependencies', '---')
+        if deps != '---':
+            for dep in deps:
+                self.load(dep)
+        # measure loading time
+        start = perf_counter()
+        # Try importing the module. Will fail here if there's
+        # no Python module in the subdirectory or loading the module
+        # produces errors
+        module = importlib.import_module(ext)
+        # Instantiate the extension,
+        # this will fail if the module is no valid extension
+        # (doesn't have an Extension class) or has other errors in it
+        extension = module.Extension(self, ext)
+        end = perf_counter()
+        startupprofile.record('extension', ext, start, end)
+        extension.set_load_time(
+            f"{(end - start) * 1000:.2f} ms")
+        self._extensions[ext] = extension
+        return extension
+
+    def load(self, name):
+        """Return the Extension object for the extension with the given
+        name, loading it if it was only declared.
+        Exceptions that occur while loading are reported like those
+        at startup, the extension is then considered failed.
+        Returns None for unknown, inactive or failed extensions."""
+        extension = self._extensions.get(name)
+        if extension is None and name in self._declared:
+            # keep the declaration while loading, the extension's
+            # Tool panel takes over the declared panel
+            declared = self._declared.get(name)
+            try:
+                extension = self._load_extension(name)
+            except Exception:
+                self._declared.pop(name, None)
+                self._failed_extensions[name] = sys.exc_info()
+                self.update_failed()
+                self.report_failed()
+                return None
+            self._declared.pop(name, None)
+            declared.loaded(extension)
+        return extension
+
+    def is_declared(self, name):
+        """Return True if the extension is registered to be loaded
+        on first use and has not been loaded yet."""
+        return name in self._declared
+
+    def declared_panel(self, name):
+        """Return the Tool panel declared by the extension, or None."""
+        ext = self._declared.get(name)
+        return ext.panel() if ext else None
+
     def _load_icon(self, name):
         """Tries to load a main icon for the given extension if
         <extension-dir>/icons/extension.svg exists.
@@ -835,7 +910,9 @@ class Extensions(QObject):
             #TODO: Create mnemonics for the menu entries
             m = self._menus[target] = QMenu(_("&Extensions"), self.mainwindow())
             m.setIcon(icons.get('network-plug'))
-            for ext in self.extensions():
+            exts = list(self._extensions.values()) + list(self._declared.values())
+            exts.sort(key=lambda extension: extension.display_name())
+            for ext in exts:
                 ext_menu = ext.menu(target)
                 if ext_menu:
                     m.addMenu(ext_menu)
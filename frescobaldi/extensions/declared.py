@@ -0,0 +1,178 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+
+"""
+Extensions that are loaded on first use.
+
+An extension can declare its Tool panel and the entries of its menus in
+its extension.cnf file. It is then not imported at startup; instead a
+DeclaredExtension provides the panel and the menus, and the extension is
+loaded when the panel is shown or one of the declared actions is used.
+
+The following keys are recognized (all optional):
+
+    panel-title: Title of the Tool panel
+    panel-dock-area: left (or right, top, bottom)
+    actions: [
+        action_name: Menu &text
+    ]
+
+'actions' lists the entries for the Tools menu. The context menus are
+declared in the same way with the 'editor-actions', 'musicview-actions'
+and 'manuscriptview-actions' keys. The action names are the names of the
+actions in the extension's action collection.
+
+"""
+
+from PyQt6.QtCore import QObject, Qt
+from PyQt6.QtGui import QAction
+from PyQt6.QtWidgets import QMenu
+
+
+# The info file keys that declare actions for a menu target
+action_keys = {
+    'tools': 'actions',
+    'editor': 'editor-actions',
+    'musicview': 'musicview-actions',
+    'manuscriptview': 'manuscriptview-actions',
+}
+
+dock_areas = {
+    'left': Qt.DockWidgetArea.LeftDockWidgetArea,
+    'right': Qt.DockWidgetArea.RightDockWidgetArea,
+    'top': Qt.DockWidgetArea.TopDockWidgetArea,
+    'bottom': Qt.DockWidgetArea.BottomDockWidgetArea,
+}
+
+
+def is_declared(infos):
+    """Return True if the infos declare a panel or actions."""
+    return bool(infos) and any(key in infos
+        for key in ('panel-title', *action_keys.values()))
+
+
+class DeclaredExtension(QObject):
+    """Stands in for an extension that is not loaded yet.
+
+    Provides the declared Tool panel and menus. When the extension is
+    loaded, the menus are handed over to the Extension object.
+
+    """
+    def __init__(self, parent, name):
+        super().__init__(parent)
+        self._name = name
+        self._menus = {}
+        self._panel = None
+        if self.infos().get('panel-title'):
+            from . import panel
+            area = dock_areas.get(
+                self.infos().get('panel-dock-area', 'left'),
+                Qt.DockWidgetArea.LeftDockWidgetArea)
+            self._panel = panel.ExtensionPanel(self, None, area)
+
+    def name(self):
+        """Return the extension's internal name."""
+        return self._name
+
+    def infos(self):
+        """Return the infos dictionary for the extension."""
+        return self.parent().infos(self.name()) or {}
+
+    def display_name(self):
+        """Return the display name of the extension."""
+        return self.infos().get('extension-name', self.name())
+
+    def icon(self):
+        """Return the extension's Icon, or None."""
+        return self.parent().icon(self.name())
+
+    def has_icon(self):
+        """Returns True if the extension has a custom icon."""
+        return self.icon() is not None
+
+    def mainwindow(self):
+        """Returns a reference to the main window."""
+        return self.parent().mainwindow()
+
+    def panel(self):
+        """Return the declared Tool panel, or None."""
+        return self._panel
+
+    def declared_actions(self, target):
+        """Return a list of (name, text) tuples for the menu target."""
+        result = []
+        entries = self.infos().get(action_keys.get(target), [])
+        if isinstance(entries, list):
+            for entry in entries:
+                name, sep, text = entry.partition(':')
+                if sep:
+                    result.append((name.strip(), text.strip()))
+        return result
+
+    def menu(self, target):
+        """Return a submenu for use in an Extensions menu, or None.
+
+        See Extension.menu(). The entries load the extension when triggered.
+
+        """
+        m = self._menus.get(target)
+        if not m:
+            actions = self.declared_actions(target)
+            panel = self.panel()
+            if not actions and not (panel and target == 'tools'):
+                return None
+            m = self._menus[target] = QMenu(
+                self.display_name(), self.mainwindow())
+            if self.has_icon():
+                m.setIcon(self.icon())
+            if panel and target == 'tools':
+                panel.toggleViewAction().setText(_("&Tool Panel"))
+                m.addAction(panel.toggleViewAction())
+                if actions:
+                    m.addSeparator()
+            for name, text in actions:
+                # The actions are owned by us, not by the menu, because the
+                # menu is cleared while the triggered action is handled.
+                a = QAction(text, self)
+                a.triggered.connect(
+                    lambda checked=False, name=name: self.trigger(name))
+                m.addAction(a)
+        return m
+
+    def load(self):
+        """Load the extension and return the Extension object.
+
+        Returns None if the extension failed to load.
+
+        """
+        return self.parent().load(self.name())
+
+    def loaded(self, extension):
+        """Called when the extension is loaded; hand over our menus."""
+        for target, m in self._menus.items():
+            extension.adopt_menu(target, m)
+
+    def trigger(self, name):
+        """Load the extension and trigger the named action."""
+        extension = self.load()
+        if extension:
+            action = extension.action_collection().actions().get(name)
+            if action:
+                action.trigger()
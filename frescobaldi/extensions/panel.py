@@ -30,9 +30,22 @@ class ExtensionPanel(panel.Panel):
     It is a lightweight layer around the regular panel.Panel,
     its only purpose being to act as a bridge to ExtensionWidget and
     descendants.
+
+    If the panel is declared in the extension's info file, it is created
+    for a DeclaredExtension, without a widget class. The extension is then
+    loaded when the widget is needed, and calls set_extension().
     """
     def __init__(self, extension, widget_class, dock_area):
         self._extension = extension
+        if widget_class:
+            self._check_widget_class(widget_class)
+        self._widget_class = widget_class
+        super().__init__(extension.mainwindow())
+        self.hide()
+        self.mainwindow().addDockWidget(dock_area, self)
+
+    def _check_widget_class(self, widget_class):
+        """Raise TypeError if the widget class can't be used for a panel."""
         if not issubclass(widget_class, ExtensionMixin):
             raise TypeError(_(
                 "Extension panel widget class '{classname}' "
@@ -40,17 +53,23 @@ class ExtensionPanel(panel.Panel):
                 "Please derive either from ExtensionWidget "
                 "or add extensions.ExtensionMixin as a second base class."
             ).format(classname=widget_class.__name__))
+
+    def set_extension(self, extension, widget_class):
+        """Called by a (lazily) loaded extension to take over a declared panel."""
+        self._check_widget_class(widget_class)
+        self._extension = extension
         self._widget_class = widget_class
-        super().__init__(extension.mainwindow())
-        self.hide()
-        self.mainwindow().addDockWidget(dock_area, self)
 
     def createWidget(self):
         """Create the panel's widget.
         *If* an ExtensionPanel is actually instantiated it also has
         information about it's widget class, which we use here.
-        If the widget's class is not dre"""
+        If the panel was declared, the extension is loaded first."""
         try:
+            if not self._widget_class and not self.extension().load():
+                # the failure has already been reported
+                from extensions.widget import FailedExtensionWidget
+                return FailedExtensionWidget(self)
             w = self._widget_class(self)
             if not hasattr(w, 'extension'):
                 w.extension = lambda: self.extension()
@@ -88,7 +107,9 @@ class ExtensionPanel(panel.Panel):
             return FailedExtensionWidget(self)
 
     def translateUI(self):
-        self.setWindowTitle(self.extension().display_name())
+        self.setWindowTitle(
+            self.extension().infos().get('panel-title')
+            or self.extension().display_name())
 
     def extension(self):
         return self._extension
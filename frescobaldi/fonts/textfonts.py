@@ -17,6 +17,7 @@
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # See http://www.gnu.org/licenses/ for more information.
 
+import hashlib
 import os
 import re
 
@@ -46,6 +47,7 @@ from PyQt6.QtGui import (
 )
 
 import app
+import diskcache
 import job
 import signals
 
@@ -53,6 +55,9 @@ import signals
 # List of notation fonts currently installed.
 _installed_notation_fonts = []
 
+# change this when the format of the cached font inventory changes
+_CACHE_VERSION = 1
+
 
 class TextFontsWidget(QWidget):
     """Display installed text fonts available for a given LilyPond version."""
@@ -89,6 +94,8 @@ class TextFontsWidget(QWidget):
         else:
             self.display_waiting()
             self.fonts.loaded.connect(self.populate)
+        self.fonts.updated.connect(self.display_count)
+        self.fonts.failed.connect(self.display_failed)
 
     def translateUI(self):
         self.filter_edit.setPlaceholderText(_(
@@ -119,6 +126,9 @@ class TextFontsWidget(QWidget):
     def display_waiting(self):
         self.status_label.setText(_("Running LilyPond to list fonts ..."))
 
+    def display_failed(self):
+        self.status_label.setText(_("Running LilyPond to list fonts failed."))
+
     def load_font_tree_column_width(self):
         """Load column widths for fontTreeView,
         factored out because it has to be done upon reload too."""
@@ -234,6 +244,42 @@ class FontTreeModel(QStandardItemModel):
 
     def populate(self, families):
         """Populate the data model to be displayed in the results"""
+        self.reset()
+        root = self.invisibleRootItem()
+        for name in sorted(families, key=self.sort_key):
+            root.appendRow(self.family_item(name, families[name]))
+        self._families = families
+
+    def update(self, families):
+        """Update the model to the given families.
+
+        Only the rows of families that were added, removed or changed are
+        touched, so the view keeps its expanded items, selection and
+        scroll position.
+
+        """
+        old = self._families
+        for row in reversed(range(self.rowCount())):
+            name = self.item(row).data(Qt.ItemDataRole.UserRole)
+            if families.get(name) != old.get(name):
+                self.removeRow(row)
+        # the remaining rows are sorted, insert the new ones in between
+        row = 0
+        for name in sorted(families, key=self.sort_key):
+            if (row < self.rowCount()
+                and self.item(row).data(Qt.ItemDataRole.UserRole) == name):
+                row += 1
+            else:
+                self.insertRow(row, self.family_item(name, families[name]))
+                row += 1
+        self._families = families
+
+    @staticmethod
+    def sort_key(name):
+        return name.lower(), name
+
+    def family_item(self, name, family):
+        """Return a top-level item for the family with the given name."""
 
         def sample(sub_family, style):
             """Produce a styled font sample for a given weight/style.
@@ -249,49 +295,47 @@ class FontTreeModel(QStandardItemModel):
             item.setFont(font)
             return item
 
-        self.reset()
-        family_names = sorted(families.keys(), key=lambda s: s.lower())
-        root = self.invisibleRootItem()
-        for name in family_names:
-            family = families[name]
-            sub_families = []
-            for sub_family_name in sorted(family.keys()):
-                sub_family = family[sub_family_name]
-                if len(sub_family) == 1:
-                    # Subfamily has only one entry, create single line
-                    style = sub_family[0]
-                    sub_families.append(
-                        [QStandardItem('{} ({})'.format(
-                            sub_family_name, style)),
-                        sample(sub_family_name, style)])
-                else:
-                    # Subfamily has multiple entries, create
-                    # container plus styled line for each style
-                    sub_family_item = QStandardItem(sub_family_name)
-                    sub_families.append(sub_family_item)
-                    for style in sorted(sub_family):
-                        sub_family_item.appendRow(
-                            [QStandardItem(style),
-                            sample(sub_family_name, style)])
-
-            # Pull up subfamily as top-level entry if
-            # - there is only one subfamily and
-            # - it is a subfamily item with children
-            if (len(sub_families) == 1
-                and isinstance(sub_families[0], QStandardItem)
-            ):
-                root.appendRow(sub_families[0])
+        sub_families = []
+        for sub_family_name in sorted(family.keys()):
+            sub_family = family[sub_family_name]
+            if len(sub_family) == 1:
+                # Subfamily has only one entry, create single line
+                style = sub_family[0]
+                sub_families.append(
+                    [QStandardItem('{} ({})'.format(
+                        sub_family_name, style)),
+                    sample(sub_family_name, style)])
             else:
-                family_item = QStandardItem(name)
-                root.appendRow(family_item)
-                for f in sub_families:
-                    family_item.appendRow(f)
+                # Subfamily has multiple entries, create
+                # container plus styled line for each style
+                sub_family_item = QStandardItem(sub_family_name)
+                sub_families.append(sub_family_item)
+                for style in sorted(sub_family):
+                    sub_family_item.appendRow(
+                        [QStandardItem(style),
+                        sample(sub_family_name, style)])
+
+        # Pull up subfamily as top-level entry if
+        # - there is only one subfamily and
+        # - it is a subfamily item with children
+        if (len(sub_families) == 1
+            and isinstance(sub_families[0], QStandardItem)
+        ):
+            family_item = sub_families[0]
+        else:
+            family_item = QStandardItem(name)
+            for f in sub_families:
+                family_item.appendRow(f)
+        # remember the family name, the text may be the subfamily name
+        family_item.setData(name, Qt.ItemDataRole.UserRole)
+        return family_item
 
     def proxy(self):
         return self._proxy
 
     def reset(self):
         self.clear()
+        self._families = {}
         self.setColumnCount(2)
         self.setHeaderData(0, Qt.Orientation.Horizontal, _("Font"))
         self.setHeaderData(1, Qt.Orientation.Horizontal, _("Sample"))
@@ -342,9 +386,19 @@ class TextFonts(QObject):
     A Fonts() object is immediately available as fonts.available_fonts, and
     its is_loaded member can be requested to test if fonts have already been
     loaded.
+
+    The parsed results are also stored in the cache directory, together with
+    the modification times of the fontconfig files and font directories
+    LilyPond reported. If none of them changed, the cached results are used
+    without running LilyPond. Otherwise the cached results are shown at once
+    and LilyPond is run in the background; when it has finished the models
+    are updated and the 'updated' signal is emitted. If running LilyPond
+    fails, the cached results are kept and the 'failed' signal is emitted.
     """
 
     loaded = signals.Signal()
+    updated = signals.Signal()
+    failed = signals.Signal()
 
     def __init__(self, lilypond_info):
         super().__init__()
@@ -477,13 +531,45 @@ class TextFonts(QObject):
         Afterwards process_results() will parse the output and build
         info structures to be used later.
         If a log.Log widget is passed as second argument this will
-        be connected to the Job to provide realtime feedback on the process.
+        be connected to the Job to provide realtime feedback on the process,
+        and LilyPond is always run.
+        Otherwise, the results are read from the cache if possible.
         Any caller should connect to the 'loaded' signal because this
         is an asynchronous task that takes long to complete."""
         self.reset()
         self.acknowledge_lily_fonts()
+        if log_widget is None:
+            cached = diskcache.load(self.cache_name(), _CACHE_VERSION)
+            if cached:
+                fingerprint, results = cached
+                self.populate(*results)
+                if fingerprint == self.fingerprint(*results[1:]):
+                    return
         self.run_lilypond(log_widget)
 
+    def cache_name(self):
+        """Return the name of the cache file for our LilyPond version."""
+        info = self.lilypond_info
+        key = '{}\0{}'.format(
+            info.abscommand() or info.command, info.versionString())
+        return 'textfonts/' + hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def fingerprint(config_files, config_dirs, font_dirs):
+        """Return the modification times of the fontconfig files and dirs.
+
+        When fonts are installed or removed, or the fontconfig configuration
+        is changed, some of these change.
+
+        """
+        def mtime(path):
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+        return [(path, mtime(path))
+                for path in sorted(set(config_files + config_dirs + font_dirs))]
+
     def misc_model(self):
         return self._misc_model
 
@@ -522,18 +608,33 @@ class TextFonts(QObject):
 
         return families, config_files, config_dirs, font_dirs
 
+    def populate(self, families, config_files, config_dirs, font_dirs):
+        """Populate the models, updating them if they were already loaded."""
+        self._misc_model.populate(config_files, config_dirs, font_dirs)
+        if self._is_loaded:
+            self._tree_model.update(families)
+            self.updated.emit()
+        else:
+            self._tree_model.populate(families)
+            self._is_loaded = True
+            self.loaded.emit()
+
     def process_results(self):
         """Parse the job history list to dictionaries."""
 
         self.flatten_log()
-        families, config_files, config_dirs, font_dirs = self.parse_entries()
-
-        self._tree_model.populate(families)
-        self._misc_model.populate(config_files, config_dirs, font_dirs)
-
-        self._is_loaded = True
+        results = self.parse_entries()
+        success = self.job.success
         self.job = None
-        self.loaded.emit()
+        if success and results[0]:
+            self.populate(*results)
+            diskcache.save(self.cache_name(),
+                (self.fingerprint(*results[1:]), results), _CACHE_VERSION)
+        else:
+            if not self._is_loaded:
+                # no cached results to fall back on
+                self.populate(*results)
+            self.failed()
 
     def run_lilypond(self, log_widget=None):
         """Run lilypond from info with the args list, and a job title."""
@@ -22,8 +22,10 @@ A basic parenthesis/brace character matcher for a textedit widget.
 """
 
 
-from PyQt6.QtCore import QObject, QRegularExpression, Qt, QTimer
-from PyQt6.QtGui import QTextCharFormat, QTextCursor, QTextDocument
+import re
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+from PyQt6.QtGui import QTextCharFormat, QTextCursor
 from PyQt6.QtWidgets import QTextEdit
 
 
@@ -82,33 +84,53 @@ class Matcher(QObject):
         # the cursor is at a character from matchPairs
         i = self.matchPairs.index(c)
         cursor.setPosition(block.position() + col)
+        match = self.matchPairs[i-1] if i & 1 else self.matchPairs[i+1]
 
         # find the matching character
+        position = self.findMatch(block, col, c, match, bool(i & 1))
+        if position == -1:
+            self.clear()
+            return
         new = QTextCursor(cursor)
-        if i & 1:
-            # look backward
-            match = self.matchPairs[i-1]
-            flags = QTextDocument.FindFlag.FindBackward
-        else:
-            # look forward
-            match = self.matchPairs[i+1]
-            flags = QTextDocument.FindFlag(0)
-            new.movePosition(QTextCursor.MoveOperation.Right)
-
-        # search, also nesting
-        rx = QRegularExpression(QRegularExpression.escape(c)
-                                + '|'
-                                + QRegularExpression.escape(match))
-        nest = 0
-        while nest >= 0:
-            new = cursor.document().find(rx, new, flags)
-            if new.isNull():
-                self.clear()
-                return
-            nest += 1 if new.selectedText() == c else -1
+        new.setPosition(position)
+        new.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
         cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
         self.highlight([cursor, new])
 
+    def findMatch(self, block, col, char, match, backward):
+        """Return the position in the document of the matching character.
+
+        The character char is at column col in the block, match is the
+        character to look for. Nested pairs are skipped. The text is searched
+        block by block, backwards if backward is True. Returns -1 if the
+        matching character was not found.
+
+        """
+        rx = re.compile(re.escape(char) + '|' + re.escape(match))
+        nest = 0
+        if backward:
+            text = block.text()[:col]
+            while True:
+                for m in reversed(list(rx.finditer(text))):
+                    nest += 1 if m.group() == char else -1
+                    if nest < 0:
+                        return block.position() + m.start()
+                block = block.previous()
+                if not block.isValid():
+                    return -1
+                text = block.text()
+        else:
+            start = col + 1
+            while True:
+                for m in rx.finditer(block.text(), start):
+                    nest += 1 if m.group() == char else -1
+                    if nest < 0:
+                        return block.position() + m.start()
+                block = block.next()
+                if not block.isValid():
+                    return -1
+                start = 0
+
     def highlight(self, cursors):
         """Highlights the selections of the specified QTextCursor instances."""
         selections = []
@@ -25,8 +25,13 @@ import builtins
 import gettext
 from pathlib import Path
 
+from . import mofile
+
 modir = __path__[0]
 
+_available = None   # the cached list of available languages
+_catalogs = {}      # MO filename -> MoFile
+
 class UnknownLanguageError(Exception):
     """Raised when calling translator() on an unknown language."""
     pass
@@ -37,7 +42,10 @@ def available():
     Note that this is not the full list of available languages; there
     are also English ("en") and the special language "C".
     """
-    return [str(path.parent.stem) for path in Path(modir).rglob("LC_MESSAGES")]
+    global _available
+    if _available is None:
+        _available = [str(path.parent.stem) for path in Path(modir).rglob("LC_MESSAGES")]
+    return list(_available)
 
 def translator(language, domain="frescobaldi"):
     """Returns a function that can translate messages using the specified language.
@@ -55,12 +63,20 @@ def translator(language, domain="frescobaldi"):
     - context, message, plural_message, count
 
     In all cases a single string (the translation) is returned.
+
+    The MO file is memory-mapped and messages are looked up when they are
+    requested (see the mofile module); catalogs are shared between translators.
     """
     if language == "C" or language == "en" or language.split('_')[0] == "en":
-        catalog = gettext.NullTranslations()
+        catalog = mofile.NullMoFile()
     elif language in available() or language.split('_')[0] in available():
-        catalog = gettext.translation(domain, localedir=modir,
-                                      languages=[language])
+        filename = gettext.find(domain, localedir=modir, languages=[language])
+        if not filename:
+            raise FileNotFoundError(f"No translation file found for domain: {domain!r}")
+        try:
+            catalog = _catalogs[filename]
+        except KeyError:
+            catalog = _catalogs[filename] = mofile.MoFile(filename)
     else:
         raise UnknownLanguageError
     funcs = (None, catalog.gettext, catalog.pgettext, catalog.ngettext, catalog.npgettext)
@@ -0,0 +1,277 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+
+"""
+A translation catalog that reads a compiled MO file on demand.
+
+The MO file is memory-mapped, and messages are looked up by binary search in
+the (sorted) table of original strings when they are requested. Translations
+that were looked up are remembered. So, unlike gettext.GNUTranslations, the
+full catalog is never decoded into a dictionary; the operating system only
+pages in the parts of the file that are actually used.
+
+The MoFile class provides the 'gettext', 'pgettext', 'ngettext' and
+'npgettext' methods, like the loader in i18n/mofile.py of the source tree,
+which this module is based on.
+
+"""
+
+import mmap
+import re
+from struct import unpack_from
+
+__all__ = ['NullMoFile', 'MoFile', 'parse_header', 'parse_plural_expr']
+
+LE_MAGIC = 0x950412de
+BE_MAGIC = 0xde120495
+
+
+class NullMoFile:
+    """Empty "mo file", returning messages untranslated."""
+    def gettext(self, message):
+        return message
+
+    def ngettext(self, message, message_plural, n):
+        return message if n == 1 else message_plural
+
+    def pgettext(self, context, message):
+        return message
+
+    def npgettext(self, context, message, message_plural, n):
+        return message if n == 1 else message_plural
+
+
+class MoFile(NullMoFile):
+    """Represents a memory-mapped MO file and provides methods to translate messages.
+
+    Raises OSError if the file can't be read or is not a valid MO file.
+
+    """
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                self._buf = b''
+        if len(self._buf) < 20:
+            raise OSError(0, 'Invalid MO data', filename)
+        magic = unpack_from('<I', self._buf)[0]
+        if magic == LE_MAGIC:
+            self._ii = '<II'
+        elif magic == BE_MAGIC:
+            self._ii = '>II'
+        else:
+            raise OSError(0, 'Invalid MO data', filename)
+        self._count, self._masteridx, self._transidx = unpack_from(
+            self._ii[0] + '3I', self._buf, 8)
+        if max(self._masteridx, self._transidx) + self._count * 8 > len(self._buf):
+            raise OSError(0, 'Corrupt MO data', filename)
+        self._cache = {}
+        self._charset = 'UTF-8'
+        self._plural = lambda n: int(n != 1)
+        self._fallback = NullMoFile()
+        # read the header (the translation of the empty message)
+        self._info = {}
+        if self._count and not self._original(0):
+            info = parse_header(self._translation(0))
+            try:
+                self._charset = info.get(b'content-type', b'').split(b'charset=')[1].decode('ascii')
+            except IndexError:
+                pass
+            try:
+                plural = info.get(b'plural-forms', b'').split(b';')[1].split(b'plural=')[1]
+            except IndexError:
+                pass
+            else:
+                f = parse_plural_expr(plural.decode(self._charset))
+                if f:
+                    self._plural = f
+            self._info = {k.decode(self._charset): v.decode(self._charset)
+                          for k, v in info.items()}
+
+    def _original(self, index):
+        """Returns the original string (bytes) at index."""
+        length, offset = unpack_from(self._ii, self._buf, self._masteridx + index * 8)
+        return self._buf[offset:offset+length]
+
+    def _translation(self, index):
+        """Returns the translated string (bytes) at index."""
+        length, offset = unpack_from(self._ii, self._buf, self._transidx + index * 8)
+        return self._buf[offset:offset+length]
+
+    def _bisect(self, msgid):
+        """Returns the index of the first original string not less than msgid."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._original(mid) < msgid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _lookup(self, context, message, plural=False):
+        """Returns the translation of the message, or None if not found.
+
+        If plural is True, a tuple with the translations for all plural forms
+        is returned.
+
+        """
+        key = (context, message, plural)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        charset = self._charset
+        msgid = message.encode(charset)
+        if context is not None:
+            msgid = context.encode(charset) + b'\x04' + msgid
+        index = self._bisect(msgid)
+        result = None
+        if plural:
+            # the original string is the singular and plural message separated
+            # by a null byte, which sorts before all other characters
+            prefix = msgid + b'\x00'
+            for i in range(index, min(index + 2, self._count)):
+                if self._original(i).startswith(prefix):
+                    result = tuple(t.decode(charset)
+                                   for t in self._translation(i).split(b'\x00'))
+                    break
+        elif index < self._count and self._original(index) == msgid:
+            result = self._translation(index).decode(charset)
+        self._cache[key] = result
+        return result
+
+    def set_fallback(self, fallback):
+        """Sets a fallback class to return translations for messages not in this MO file.
+
+        By default, fallback is set to a NullMoFile instance that returns the message
+        untranslated.
+
+        """
+        self._fallback = fallback
+
+    def fallback(self):
+        """Returns the fallback MoFile or NullMoFile object."""
+        return self._fallback
+
+    def info(self):
+        """Returns the header (catalog description) from the MO-file as a dictionary.
+
+        The keys are the header names in lower case, the values unicode strings.
+
+        """
+        return self._info
+
+    def gettext(self, message):
+        """Returns the translation of the message."""
+        result = self._lookup(None, message)
+        if result is None:
+            return self._fallback.gettext(message)
+        return result
+
+    def ngettext(self, message, message_plural, n):
+        """Returns the correct translation (singular or plural) depending on n."""
+        result = self._lookup(None, message, True)
+        try:
+            return result[self._plural(n)]
+        except (TypeError, IndexError):
+            return self._fallback.ngettext(message, message_plural, n)
+
+    def pgettext(self, context, message):
+        """Returns the translation of the message in the given context."""
+        result = self._lookup(context, message)
+        if result is None:
+            return self._fallback.pgettext(context, message)
+        return result
+
+    def npgettext(self, context, message, message_plural, n):
+        """Returns the correct translation (singular or plural) depending on n, in the given context."""
+        result = self._lookup(context, message, True)
+        try:
+            return result[self._plural(n)]
+        except (TypeError, IndexError):
+            return self._fallback.npgettext(context, message, message_plural, n)
+
+
+def parse_header(data):
+    """Parses the "header" (the msgstr of the first, empty, msgid) and returns it as a dict.
+
+    The names are made lower-case.
+
+    """
+    info = {}
+    lastkey = key = None
+    for line in data.splitlines():
+        line = line.strip()
+        if line:
+            if b':' in line:
+                key, val = line.split(b':', 1)
+                key = key.strip().lower()
+                val = val.strip()
+                info[key] = val
+                lastkey = key
+            elif lastkey:
+                info[lastkey] += b'\n' + line
+    return info
+
+
+expr_re = re.compile(r"\d+|>>|<<|[<>!=]=|&&|\|\||[-+*/%^&<>?:|!()n]")
+
+
+def parse_plural_expr(text):
+    """Parses an expression such as the 'plural=<expression>' found in PO/MO files.
+
+    Returns a lambda function taking the 'n' argument and returning the plural number.
+    Returns None if the expression could not be parsed.
+
+    """
+    source = iter(expr_re.findall(text))
+
+    def _expr():
+        result = []
+        for token in source:
+            if token == '?':
+                result.insert(0, 'if')
+                result[0:0] = _expr()
+                result.append('else')
+                result.extend(_expr())
+            elif token == ':':
+                return result
+            elif token == '&&':
+                result.append('and')
+            elif token == '||':
+                result.append('or')
+            elif token == '!':
+                result.append('not')
+            else:
+                result.append(token)
+                if token == '(':
+                    result.extend(_expr())
+                elif token == ')':
+                    return result
+        return result
+
+    py_expression = ' '.join(_expr())
+    if py_expression:
+        code = f"lambda n: int({py_expression})"
+        compiled_code = compile(code, '<plural_expression>', 'eval')
+        return eval(compiled_code, {}, {})
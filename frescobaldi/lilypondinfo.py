@@ -35,6 +35,7 @@ from PyQt6.QtWidgets import QProgressDialog
 
 import app
 import cachedproperty
+import diskcache
 import job
 import job.queue
 import util
@@ -44,6 +45,11 @@ if platform.system() == "Darwin":
     import macos
 
 _infos = None   # this can hold a list of configured LilyPondInfo instances
+_probes = None  # the persistent cache of probe results, see probes()
+
+# change this when the format of the stored probe results changes
+_PROBES_VERSION = 1
+_PROBES_NAME = "lilypondinfo"
 
 LILYPOND_AUTOINSTALL_DIR = (
     os.path.join(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation),
@@ -97,6 +103,69 @@ def saveinfos():
     s.endArray()
 
 
+def probes():
+    """Return the persistent cache of probe results, loading it if needed.
+
+    This is a dictionary mapping the absolute path of a LilyPond command to a
+    tuple (stamp, results). The stamp is a (mtime_ns, size) tuple of the
+    executable, results is a dictionary with the values that were found by
+    running it (e.g. 'version' and 'datadir').
+
+    """
+    global _probes
+    if _probes is None:
+        _probes = diskcache.load(_PROBES_NAME, _PROBES_VERSION) or {}
+    return _probes
+
+
+def _stamp(command):
+    """Return a (mtime_ns, size) tuple for the command, or None."""
+    try:
+        st = os.stat(command)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def cached_probe(command, key):
+    """Return the stored result of probing the command for key, or None.
+
+    None is also returned if the executable has been changed (or removed)
+    since the result was stored.
+
+    """
+    entry = probes().get(command)
+    if entry and entry[0] == _stamp(command):
+        return entry[1].get(key)
+
+
+def store_probe(command, key, value):
+    """Store the result of probing the command for key."""
+    stamp = _stamp(command)
+    if stamp is None:
+        return
+    entry = probes().get(command)
+    if not entry or entry[0] != stamp:
+        entry = probes()[command] = (stamp, {})
+    entry[1][key] = value
+    diskcache.save(_PROBES_NAME, _probes, _PROBES_VERSION)
+
+
+def rescan(infos_=None):
+    """Forget all stored probe results and probe the LilyPond versions again.
+
+    infos_ is a list of LilyPondInfo instances to re-probe, by default the
+    configured instances. The probes run in the background; use e.g.
+    info.versionString() to wait for the results.
+
+    """
+    global _probes
+    _probes = {}
+    diskcache.remove(_PROBES_NAME)
+    for info in infos() if infos_ is None else infos_:
+        info.forgetProbes()
+
+
 def default():
     """Returns a default LilyPondInfo instance with the default LilyPond command.
 
@@ -270,6 +339,9 @@ class LilyPondInfo:
     def versionString(self):
         if not self.abscommand():
             return ""
+        cached = cached_probe(self.abscommand(), 'version')
+        if cached:
+            return cached
 
         j = job.Job([self.abscommand(), '--version'])
 
@@ -282,6 +354,9 @@ class LilyPondInfo:
                 self.versionString = m.group() if m else ""
             else:
                 self.versionString = ""
+            # don't remember failures, they may be caused by a busy system
+            if self.versionString():
+                store_probe(self.abscommand(), 'version', self.versionString())
 
         app.job_queue().add_job(j, 'generic')
 
@@ -315,6 +390,9 @@ class LilyPondInfo:
         """
         if not self.abscommand():
             return False
+        cached = cached_probe(self.abscommand(), 'datadir')
+        if cached and os.path.isdir(cached):
+            return cached
 
         # First ask LilyPond itself.
         j = job.Job([self.abscommand(), '-e',
@@ -327,6 +405,7 @@ class LilyPondInfo:
                 d = output[1].strip('\n')
                 if os.path.isabs(d) and os.path.isdir(d):
                     self.datadir = d
+                    store_probe(self.abscommand(), 'datadir', d)
                     return
 
             # Then find out via the prefix.
@@ -338,6 +417,7 @@ class LilyPondInfo:
                     d = os.path.join(self.prefix(), 'share', 'lilypond', suffix)
                     if os.path.isdir(d):
                         self.datadir = d
+                        store_probe(self.abscommand(), 'datadir', d)
                         return
             self.datadir = False
         app.job_queue().add_job(j, 'generic')
@@ -392,6 +472,18 @@ class LilyPondInfo:
             except FileNotFoundError:
                 pass    # this installation has already been deleted
 
+    def forgetProbes(self):
+        """Forget all computed values, so they are determined again.
+
+        This also searches the command again in the PATH.
+
+        """
+        for name, value in vars(type(self)).items():
+            # a running probe will set its (new) value when it finishes
+            if (isinstance(value, CachedProperty)
+                    and not getattr(self, name).iscomputing()):
+                delattr(self, name)
+
     @CachedProperty.cachedproperty(depends=versionString)
     def prettyName(self):
         """Return a pretty-printable name for this LilyPond instance."""
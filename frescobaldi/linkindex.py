@@ -0,0 +1,131 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+A grid index of the links on a page, for fast hit-testing.
+
+qpageview stores the links of a page in a Rectangles object, which finds
+the links at a point by intersecting sets of all links left, right, above
+and below that point. On pages with thousands of links (e.g. a dense piano
+reduction) this makes every mouse movement expensive.
+
+LinkIndex has the same interface, but puts the links in the cells of a grid
+covering the page, so only the few links in one cell need to be tested.
+
+The pages of the PdfDocument in the pdfdocument module keep their links in
+a LinkIndex; use it via pagedview.loadPdf().
+
+"""
+
+
+import math
+
+import qpageview.link
+
+
+class LinkIndex(qpageview.link.Links):
+    """Manages the Link objects of a page, indexed in a grid.
+
+    The link areas are in coordinates between 0.0 and 1.0. The grid is
+    built when links are bulk added; after adding or removing single links
+    it is rebuilt on the next query.
+
+    """
+    # the average number of links we want in a grid cell
+    density = 4
+
+    # the maximum number of cells in each direction
+    maxsize = 64
+
+    def __init__(self, links=None):
+        self._grid = None
+        self._size = 1
+        super().__init__(links)
+
+    def bulk_add(self, objects):
+        super().bulk_add(objects)
+        self._build()
+
+    def add(self, obj):
+        super().add(obj)
+        self._grid = None
+
+    def remove(self, obj):
+        super().remove(obj)
+        self._grid = None
+
+    def clear(self):
+        super().clear()
+        self._grid = None
+
+    def _build(self):
+        """(internal) Put all links in the cells of the grid."""
+        self._size = size = max(1, min(self.maxsize,
+                                       int(math.sqrt(len(self._items) / self.density))))
+        self._grid = grid = [[] for i in range(size * size)]
+        cell = self._cell
+        for obj, (left, top, right, bottom) in self._items.items():
+            for y in range(cell(top), cell(bottom) + 1):
+                row = y * size
+                for x in range(cell(left), cell(right) + 1):
+                    grid[row + x].append(obj)
+
+    def _cell(self, value):
+        """(internal) Return the row or column of the cell for a coordinate.
+
+        Coordinates outside the page are clamped to the outer cells.
+
+        """
+        return min(self._size - 1, max(0, int(value * self._size)))
+
+    def _candidates(self, left, top, right, bottom):
+        """(internal) Return the set of links in the cells touched by the rectangle."""
+        if self._grid is None:
+            self._build()
+        grid, size, cell = self._grid, self._size, self._cell
+        result = set()
+        for y in range(cell(top), cell(bottom) + 1):
+            row = y * size
+            for x in range(cell(left), cell(right) + 1):
+                result.update(grid[row + x])
+        return result
+
+    def at(self, x, y):
+        """Returns a set() of objects that are touched by the given point."""
+        if self._grid is None:
+            self._build()
+        items = self._items
+        cell = self._grid[self._cell(y) * self._size + self._cell(x)]
+        return set(obj for obj in cell
+            if items[obj][0] <= x <= items[obj][2] and items[obj][1] <= y <= items[obj][3])
+
+    def inside(self, left, top, right, bottom):
+        """Returns a set() of objects that are fully in the given rectangle."""
+        items = self._items
+        return set(obj for obj in self._candidates(left, top, right, bottom)
+            if left <= items[obj][0] and items[obj][2] <= right
+                and top <= items[obj][1] and items[obj][3] <= bottom)
+
+    def intersecting(self, left, top, right, bottom):
+        """Returns a set() of objects intersecting the given rectangle."""
+        items = self._items
+        return set(obj for obj in self._candidates(left, top, right, bottom)
+            if items[obj][0] <= right and left <= items[obj][2]
+                and items[obj][1] <= bottom and top <= items[obj][3])
+
@@ -29,7 +29,7 @@ from PyQt6.QtGui import QAction, QTextCursor
 import app
 import plugin
 import ly.lex
-import lydocument
+import tokeniter
 import viewhighlighter
 import actioncollection
 import actioncollectionmanager
@@ -140,64 +140,132 @@ def matches(cursor, view=None):
     if the list contains two cursors, the first is the token the cursor was at,
     and the second is the matching token.
 
-    If view is given, only the visible part of the document is searched.
+    If view is given, the search for a matching token does not go beyond
+    the visible part of the document.
 
     """
     block = cursor.block()
     column = cursor.position() - block.position()
-    tokens = lydocument.Runner(lydocument.Document(cursor.document()))
-    tokens.move_to_block(block)
-
-    if view is not None:
-        first_block = view.firstVisibleBlock()
-        bottom = view.contentOffset().y() + view.viewport().height()
-        pred_forward = lambda: view.blockBoundingGeometry(tokens.block).top() <= bottom
-        pred_backward = lambda: tokens.block >= first_block
-    else:
-        pred_forward = lambda: True
-        pred_backward = lambda: True
-
-    source = None
-    for token in tokens.forward_line():
+    for token in tokeniter.tokens(block):
         if token.pos <= column <= token.end:
-            if isinstance(token, ly.lex.MatchStart):
-                match, other = ly.lex.MatchStart, ly.lex.MatchEnd
-                def source_gen():
-                    while pred_forward():
-                        yield from tokens.forward_line()
-                        if not tokens.next_block():
-                            break
-                source = source_gen()
-                break
-            elif isinstance(token, ly.lex.MatchEnd):
-                match, other = ly.lex.MatchEnd, ly.lex.MatchStart
-                def source_gen():
-                    while pred_backward():
-                        yield from tokens.backward_line()
-                        if not tokens.previous_block():
-                            break
-                source = source_gen()
+            if isinstance(token, (ly.lex.MatchStart, ly.lex.MatchEnd)):
                 break
         elif token.pos > column:
-            break
-    cursors = []
-    if source:
-        # we've found a matcher item
-        cursors.append(tokens.cursor())
-        nest = 0
-        for token2 in source:
-            if isinstance(token2, other) and token2.matchname == token.matchname:
-                if nest == 0:
-                    # we've found the matching item!
-                    cursors.append(tokens.cursor())
-                    break
-                else:
-                    nest -= 1
-            elif isinstance(token2, match) and token2.matchname == token.matchname:
-                nest += 1
+            return []
+    else:
+        return []
+
+    doc = cursor.document()
+    limit = None
+    if view is not None:
+        bottom = view.viewport().rect().bottomLeft()
+        limit = view.cursorForPosition(bottom).blockNumber()
+    cursors = [token_cursor(doc, block.blockNumber(), token.pos, token.end)]
+    partner = MatchIndex.instance(doc).partner(block.blockNumber(), token, limit)
+    if partner:
+        cursors.append(token_cursor(doc, *partner))
     return cursors
 
 
+def token_cursor(doc, number, pos, end):
+    """Return a QTextCursor selecting the text from pos to end in the block."""
+    position = doc.findBlockByNumber(number).position()
+    c = QTextCursor(doc)
+    c.setPosition(position + pos)
+    c.setPosition(position + end, QTextCursor.MoveMode.KeepAnchor)
+    return c
 
-app.mainwindowCreated.connect(Matcher.instance)
 
+class _Open:
+    """A MatchStart token that is not (yet) matched; used in MatchIndex."""
+    __slots__ = ('key', 'end', 'parent')
+
+    def __init__(self, key, end, parent):
+        self.key = key          # (block number, position in block)
+        self.end = end          # end position in block
+        self.parent = parent    # the previously opened token with this name
+
+
+class MatchIndex(plugin.DocumentPlugin):
+    """Keeps the pairs of matching MatchStart and MatchEnd tokens of a document.
+
+    The index is built from the tokens of the highlighter, lazily from the
+    beginning of the document up to the block that is asked for, and it is
+    discarded from the first changed block on when the document changes.
+    So finding the partner of a token is a dictionary lookup, except the
+    first time after a change.
+
+    """
+    def __init__(self, document):
+        self._open = []     # per block: {matchname: _Open} after the block
+        self._added = []    # per block: the keys added to _pairs in that block
+        self._pairs = {}    # (block number, position) -> (block number, pos, end)
+        document.contentsChange.connect(self.slotContentsChange)
+
+    def slotContentsChange(self, position, removed, added):
+        """Called when the document changes; invalidates the index."""
+        number = self.document().findBlock(position).blockNumber()
+        for keys in self._added[number:]:
+            for key in keys:
+                del self._pairs[key]
+        del self._open[number:]
+        del self._added[number:]
+
+    def partner(self, number, token, limit=None):
+        """Return the partner of the MatchStart or MatchEnd token, or None.
+
+        number is the block number of the token. The partner is returned as
+        a three-tuple (block number, position, end). If limit is given, the
+        index is not built beyond that block number in search of the partner.
+
+        """
+        key = (number, token.pos)
+        self._update(number)
+        if key not in self._pairs and isinstance(token, ly.lex.MatchStart):
+            self._update(limit, key)
+        return self._pairs.get(key)
+
+    def _update(self, number=None, key=None):
+        """(internal) Compute the index up to and including block number.
+
+        If key is given, stop as soon as the key is in the index.
+        If number is None, the index is computed to the end if needed.
+
+        """
+        count = len(self._open)
+        if (number is not None and count > number) or key in self._pairs:
+            return
+        if count:
+            block = self.document().findBlockByNumber(count)
+            stacks = self._open[-1]
+        else:
+            block = self.document().firstBlock()
+            stacks = {}
+        while block.isValid() and (number is None or count <= number):
+            added = []
+            copied = False  # the dict of the previous block must not be changed
+            for t in tokeniter.tokens(block):
+                if isinstance(t, ly.lex.MatchStart):
+                    if not copied:
+                        stacks, copied = dict(stacks), True
+                    stacks[t.matchname] = _Open((count, t.pos), t.end, stacks.get(t.matchname))
+                elif isinstance(t, ly.lex.MatchEnd):
+                    opened = stacks.get(t.matchname)
+                    if opened:
+                        if not copied:
+                            stacks, copied = dict(stacks), True
+                        stacks[t.matchname] = opened.parent
+                        end = (count, t.pos)
+                        self._pairs[opened.key] = end + (t.end,)
+                        self._pairs[end] = opened.key + (opened.end,)
+                        added.append(opened.key)
+                        added.append(end)
+            self._open.append(stacks)
+            self._added.append(added)
+            count += 1
+            block = block.next()
+            if key in self._pairs:
+                return
+
+
+app.mainwindowCreated.connect(Matcher.instance)
@@ -279,6 +279,7 @@ def menu_music(mainwindow):
     m.addSeparator()
     m.addAction(ac.music_jump_to_cursor)
     m.addAction(ac.music_sync_cursor)
+    m.addAction(ac.music_overview)
     m.addSeparator()
     m.addAction(ac.music_maximize)
     m.addAction(ac.music_save_settings)
@@ -74,6 +74,7 @@ class MetaInfo(plugin.DocumentPlugin):
         if doc.__class__ == document.EditorDocument:
             doc.loaded.connect(self.load, -999) # before all others
             doc.closed.connect(self.save,  999) # after all others
+            doc.unloading.connect(self.save, 999)
 
     def settingsGroup(self):
         url = self.document().url()
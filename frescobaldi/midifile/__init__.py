@@ -26,6 +26,7 @@ be used separate from each other:
 - parser:       load midi files or streams
 - event:        very simple named tuples representing events
 - song:         structure loaded data into a Song, with timing and tempo map
+- compact:      like song, but stores the events in NumPy arrays (optional)
 - player:       can play a Song with settable tempo and output
 - output:       abstract class representing a MIDI output port
 """
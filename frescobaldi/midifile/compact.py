@@ -0,0 +1,350 @@
+# Python midifile package -- parse, load and play MIDI files.
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+midifile.compact -- stores MIDI file data in NumPy arrays.
+
+This module can be used instead of the song module to load large MIDI files
+much faster. It needs NumPy; use available() to check if it can be used.
+
+The events of all tracks are stored in one structured array, with the
+fields time, track, type, channel, data1 and data2. The data of meta and
+sysex events is kept in a separate list. Conversion from MIDI time to real
+time is done for all events at once.
+
+The Song class in this module has the same API as song.Song; the MIDI
+events are converted to the named tuples of the event module only when
+they are played.
+
+"""
+
+
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import event
+from . import parser
+from . import song
+
+
+def available():
+    """Returns True if NumPy is available, so this module can be used."""
+    return numpy is not None
+
+
+if numpy is not None:
+    EVENT_DTYPE = numpy.dtype([
+        ('time', numpy.int64),      # MIDI time (ticks)
+        ('track', numpy.uint16),
+        ('type', numpy.uint8),      # the high nibble of the status byte
+        ('channel', numpy.uint8),   # the low nibble of the status byte
+        ('data1', numpy.uint8),     # note, controller, program, or meta type
+        ('data2', numpy.uint8),     # velocity, value, or pitch bend MSB
+        ('extra', numpy.int32),     # index in the data list or -1
+    ])
+
+
+# the number of data bytes of channel messages, by type
+_LENGTHS = (0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 2, 2, 1, 1, 2, 0)
+
+
+def load(filename):
+    """Convenience function to instantiate a Song from a filename.
+
+    If the filename is a type 2 MIDI file, just returns the first track.
+
+    """
+    with open(filename, 'rb') as midifile:
+        fmt, div, tracks = parser.parse_midi_data(midifile.read())
+    if fmt == 2:
+        tracks = tracks[:1]
+    return Song(div, tracks)
+
+
+def scan_track(s):
+    """Finds the events in the bytes string s (typically a track).
+
+    Returns a tuple (deltas, statuses, positions, data). The first three are
+    arrays with the delta time, the status byte and the position of the
+    first data byte of every event; data is a list with the data of the meta
+    and sysex events, in order.
+
+    Raises ValueError or IndexError on invalid MIDI data.
+
+    """
+    deltas = array.array('q')
+    statuses = array.array('B')
+    positions = array.array('q')
+    data = []
+
+    add_delta = deltas.append
+    add_status = statuses.append
+    add_position = positions.append
+    lengths = _LENGTHS
+
+    running_status = None
+    pos = 0
+    end = len(s)
+    while pos < end:
+        delta = 0
+        while True:
+            i = s[pos]
+            pos += 1
+            delta = delta * 128 + (i & 0x7F)
+            if not i & 0x80:
+                break
+
+        status = s[pos]
+        if status & 0x80:
+            running_status = status
+            pos += 1
+        elif not running_status:
+            raise ValueError("invalid running status")
+        else:
+            status = running_status
+
+        add_delta(delta)
+        add_status(status)
+        add_position(pos)
+
+        if status < 0xF0:
+            pos += lengths[status >> 4]
+        else:
+            running_status = None
+            if status == 0xFF:
+                pos += 1    # skip the meta type
+            size, pos = parser.read_var_len(s, pos)
+            data.append(s[pos:pos+size])
+            pos += size
+    return deltas, statuses, positions, data
+
+
+def parse_track(s, track=0):
+    """Parses the bytes string s (typically a track) for MIDI events.
+
+    Returns a two-tuple (events, data). events is a structured array
+    (see EVENT_DTYPE), data the list of meta and sysex data bytes strings,
+    referred to by the extra field of the events.
+
+    Raises ValueError or IndexError on invalid MIDI data.
+
+    """
+    deltas, statuses, positions, data = scan_track(s)
+    events = numpy.zeros(len(statuses), EVENT_DTYPE)
+    if not len(statuses):
+        return events, data
+
+    status = numpy.frombuffer(statuses, numpy.uint8)
+    pos = numpy.frombuffer(positions, numpy.int64)
+    buf = numpy.frombuffer(s, numpy.uint8)
+    last = len(buf) - 1
+
+    events['time'] = numpy.cumsum(numpy.frombuffer(deltas, numpy.int64))
+    events['track'] = track
+    events['type'] = evtype = status >> 4
+    events['channel'] = status & 0x0F
+
+    lengths = numpy.array(_LENGTHS, numpy.uint8)[evtype]
+    events['data1'] = numpy.where(
+        (lengths > 0) | (status == 0xFF), buf[numpy.minimum(pos, last)], 0)
+    events['data2'] = numpy.where(
+        lengths > 1, buf[numpy.minimum(pos + 1, last)], 0)
+    extra = events['extra']
+    extra[:] = -1
+    extra[status >= 0xF0] = numpy.arange(len(data))
+    return events, data
+
+
+def parse_tracks(tracks):
+    """Parses all tracks and returns a two-tuple (events, data).
+
+    The events of all tracks are sorted on time in one array, events of the
+    same time are kept in track order.
+
+    """
+    arrays = []
+    data = []
+    for n, track in enumerate(tracks):
+        events, d = parse_track(track, n)
+        events['extra'][events['extra'] >= 0] += len(data)
+        arrays.append(events)
+        data.extend(d)
+    if not arrays:
+        return numpy.zeros(0, EVENT_DTYPE), data
+    events = numpy.concatenate(arrays)
+    events = events[numpy.argsort(events['time'], kind='stable')]
+    return events, data
+
+
+def is_meta(events, meta_type):
+    """Returns a boolean array that is True for meta events of meta_type."""
+    return ((events['type'] == 0x0F) & (events['channel'] == 0x0F)
+            & (events['data1'] == meta_type))
+
+
+class TempoMap:
+    """Converts midi time to real time in microseconds.
+
+    The midi time may be a single value or an array of values.
+
+    """
+    def __init__(self, events, data, division):
+        """Initialize our tempo map based on the events array and data."""
+        self.division = song.smpte_division(division)
+        tempos = events[is_meta(events, 0x51)]
+        # only the first tempo event at each time counts
+        times, first = numpy.unique(tempos['time'], return_index=True)
+        values = [int.from_bytes(data[i][:3], 'big') for i in tempos['extra'][first]]
+        times = times.tolist()
+        if not times or times[0] != 0:
+            times.insert(0, 0)
+            values.insert(0, 500000)
+        self.times = numpy.array(times, numpy.int64)
+        self.tempos = numpy.array(values, numpy.int64)
+        # the real time (times division) at every tempo change
+        self.offsets = numpy.concatenate(([0], numpy.cumsum(
+            numpy.diff(self.times) * self.tempos[:-1])))
+
+    def real_time(self, midi_time):
+        """Returns the real time in microseconds for the given MIDI time."""
+        t = numpy.asarray(midi_time, numpy.int64)
+        i = numpy.maximum(numpy.searchsorted(self.times, t) - 1, 0)
+        real_time = (self.offsets[i] + (t - self.times[i]) * self.tempos[i]) // self.division
+        return real_time if real_time.ndim else int(real_time)
+
+    def msec(self, midi_time):
+        """Returns the real time in milliseconds."""
+        return self.real_time(midi_time) // 1000
+
+
+class Events:
+    """A sequence of MIDI events, stored in rows of the events array.
+
+    Iterating over it yields the event objects of the event module,
+    created by the factory.
+
+    """
+    __slots__ = ('_events', '_data', '_start', '_stop')
+
+    factory = event.EventFactory()
+
+    def __init__(self, events, data, start, stop):
+        self._events = events
+        self._data = data
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __bool__(self):
+        return self._stop > self._start
+
+    def __iter__(self):
+        f = self.factory
+        data = self._data
+        rows = self._events[self._start:self._stop].tolist()
+        for time, track, evtype, channel, data1, data2, extra in rows:
+            if evtype <= 0x0A:
+                yield f.note_event(evtype, channel, data1, data2)
+            elif evtype == 0x0B:
+                yield f.controller_event(channel, data1, data2)
+            elif evtype == 0x0C:
+                yield f.programchange_event(channel, data1)
+            elif evtype == 0x0D:
+                yield f.channelaftertouch_event(channel, data1)
+            elif evtype == 0x0E:
+                yield f.pitchbend_event(channel, data1 + data2 * 128)
+            elif channel == 0x0F:
+                yield f.meta_event(data1, data[extra])
+            else:
+                yield f.sysex_event(0xF0 + channel, data[extra])
+
+    def __repr__(self):
+        return '<Events {0}>'.format(list(self))
+
+
+class Song(song.Song):
+    """A loaded MIDI file, with the events stored in NumPy arrays.
+
+    Has the same attributes as song.Song; the lists of events in the music
+    attribute are Events instances. Additionally these attributes are set:
+
+    store: the structured array with all events (see EVENT_DTYPE)
+    data: the list with the data of the meta and sysex events
+    msecs: an array with the real time in msec of every event
+
+    """
+    def __init__(self, division, tracks):
+        """Initialize the Song with the given division and track chunks."""
+        self.division = division
+        self.ntracks = len(tracks)
+        self.store, self.data = events, data = parse_tracks(tracks)
+        self.tempo_map = t = TempoMap(events, data, division)
+        self.msecs = t.msec(events['time'])
+        self.length = int(self.msecs[-1]) if len(events) else 0
+
+        # the beats
+        self.beats = b = []
+        if len(events):
+            sigs = events[is_meta(events, 0x58)]
+            time_sigs = [(time, tuple(data[extra]))
+                         for time, extra in sigs[['time', 'extra']].tolist()]
+            beats = list(song.signature_beats(
+                time_sigs, int(events['time'][-1]), division))
+            msecs = t.msec([beat[0] for beat in beats]).tolist()
+            measnum = 0
+            for msec, (midi_time, beat, num, den) in zip(msecs, beats):
+                if beat == 1:
+                    measnum += 1
+                b.append((msec, measnum, beat, num, den))
+
+        # an Events object for every MIDI time
+        times = events['time']
+        starts = numpy.flatnonzero(numpy.diff(times, prepend=-1)).tolist()
+        stops = starts[1:] + [len(events)]
+        self.music = [(msec, Events(events, data, start, stop))
+                      for msec, start, stop in zip(
+                          self.msecs[starts].tolist(), starts, stops)]
+
+    @property
+    def events(self):
+        """A dict mapping MIDI times to a dict with per-track lists of events.
+
+        This is computed on request, for compatibility with song.Song.
+
+        """
+        d = {}
+        for time, track, evs in self.track_events():
+            d.setdefault(time, {})[track] = evs
+        return d
+
+    def track_events(self):
+        """Yields (midi_time, track, events) for every time and track."""
+        events, data = self.store, self.data
+        times, tracks = events['time'], events['track']
+        starts = numpy.flatnonzero(numpy.concatenate(([True],
+            (times[1:] != times[:-1]) | (tracks[1:] != tracks[:-1])))).tolist()
+        stops = starts[1:] + [len(events)]
+        for start, stop in zip(starts, stops):
+            yield (int(times[start]), int(tracks[start]),
+                   list(Events(events, data, start, stop)))
@@ -32,14 +32,19 @@ class Output:
     Inherit to implement the actual writing to MIDI ports.
     The midiplayer.Player calls midi_event and all_notes_off.
 
+    If the output supports timestamps, set the latency attribute to the
+    latency in msec. A Player can then send events in advance, with the
+    timestamp (in the time of the output) at which they should be played.
+
     """
+    latency = 0
 
-    def midi_event(self, midi):
+    def midi_event(self, midi, timestamp=0):
         """Handles a list or dict of MIDI events from a Song (midisong.py)."""
         if isinstance(midi, dict):
             # dict mapping track to events?
             midi = sum(map(midi.get, sorted(midi)), [])
-        self.send_events(midi)
+        self.send_events(midi, timestamp)
 
     def reset(self):
         """Restores the MIDI output to an initial state.
@@ -75,29 +80,40 @@ class Output:
             for c in channels:
                 send(event.ControllerEvent(c, event.MIDI_CTL_RESET_CONTROLLERS, 0))
 
-    def all_sounds_off(self, channel=-1):
+    def all_sounds_off(self, channel=-1, timestamp=0):
         """Sends an all_notes_off message to a channel.
 
         If the channel is -1 (the default), sends the message to all channels.
+        If a timestamp is given, the message is sent at that time.
 
         """
         channels = range(16) if channel == -1 else (channel,)
-        with self.sender() as send:
+        with self.sender(timestamp) as send:
             for c in channels:
                 send(event.ControllerEvent(c, event.MIDI_CTL_ALL_NOTES_OFF, 0))
                 send(event.ControllerEvent(c, event.MIDI_CTL_ALL_SOUNDS_OFF, 0))
 
-    def send_events(self, events):
+    def send_events(self, events, timestamp=0):
         """Writes the list of events to the output port.
 
         Each event is one of the event types in event.py
+        The timestamp is only used if the output has a latency.
         Implement to do the actual writing.
 
         """
         pass
 
+    def flush(self):
+        """Discards the events that were sent with a timestamp but not yet played.
+
+        Returns True if that succeeded. The default implementation can't do
+        that and returns False.
+
+        """
+        return False
+
     @contextlib.contextmanager
-    def sender(self):
+    def sender(self, timestamp=0):
         """Returns a context manager to call for each event to send.
 
         When the context manager exits, the events are sent using the
@@ -107,30 +123,42 @@ class Output:
         l = []
         yield l.append
         if l:
-            self.send_events(l)
+            self.send_events(l, timestamp)
 
 
 class PortMidiOutput(Output):
     """Writes events to a PortMIDI Output instance.
 
-    The PortMIDI Output instance should be in the output attribute.
+    The PortMIDI Output instance should be in the output attribute. If it
+    was opened with a latency, set the latency attribute to the same value,
+    so timestamps are used.
 
     """
     output = None
+    _timestamp = 0  # the last timestamp written
 
-    def send_events(self, events):
+    def send_events(self, events, timestamp=0):
         """Writes the list of events to the PortMIDI output port."""
+        if self.latency:
+            # PortMIDI needs timestamps that never decrease
+            timestamp = self._timestamp = max(timestamp, self._timestamp)
         l = []
         for e in events:
             m = self.convert_event(e)
             if m:
-                l.append([m, 0])
+                l.append([m, timestamp])
         while len(l) > 1024:
             self.output.write(l[:1024])
             l = l[1024:]
         if l:
             self.output.write(l)
 
+    def flush(self):
+        """Discards the events that were sent with a timestamp but not yet played."""
+        self.output.abort()
+        self._timestamp = 0
+        return True
+
     def convert_event(self, e):
         """Returns a list of integers representing a MIDI message from event."""
         t = type(e)
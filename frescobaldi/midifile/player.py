@@ -21,6 +21,7 @@ A MIDI Player.
 """
 
 
+import bisect
 import collections
 import time
 import threading
@@ -35,13 +36,25 @@ class Player:
     You can override: timer_midi_time(), timer_start() and timer_stop()
     to use another timing source than the Python threading.Timer instances.
 
+    If lookahead is set and the output has a latency, MIDI events are sent
+    that many msec in advance, with a timestamp, so the timing of the music
+    does not depend on how precisely the timer fires. This requires that
+    timer_midi_time() returns the time of the output.
+
     """
+    lookahead = 0
+
     def __init__(self):
         self._song = None
         self._events = []
+        self._measures = []         # (measnum, beat) of every beat event
+        self._measure_positions = []    # the corresponding positions
+        self._beat_times = []       # the time in msec of every beat in the song
         self._position = 0
         self._offset = 0
         self._sync_time = 0
+        self._sent = 0          # position up to which MIDI has been sent ahead
+        self._sent_time = 0     # timestamp of the last event sent ahead
         self._playing = False
         self._tempo_factor = 1.0
         self._output = None
@@ -81,6 +94,7 @@ class Player:
             self.timer_stop_playing()
         self._song = song
         self._events = make_event_list(song, time, beat)
+        self._make_indices()
         self._position = 0
         self._offset = 0
         if playing:
@@ -96,9 +110,20 @@ class Player:
             self.stop()
         self._song = None
         self._events = []
+        self._make_indices()
         self._position = 0
         self._offset = 0
 
+    def _make_indices(self):
+        """(Private) Builds the indices used to seek measures and beats."""
+        self._measures = []
+        self._measure_positions = []
+        for i, (t, e) in enumerate(self._events):
+            if e.beat:
+                self._measures.append(e.beat[:2])
+                self._measure_positions.append(i)
+        self._beat_times = [b[0] for b in self._song.beats] if self._song else []
+
     def total_time(self):
         """Returns the length in msec of the current song."""
         if self._events:
@@ -156,23 +181,29 @@ class Player:
     def seek_measure(self, measnum, beat=1):
         """Goes to the specified measure and beat (beat defaults to 1).
 
+        If the measure has no such beat, goes to its last beat.
         Returns whether the measure position could be found (True or False).
 
         """
-        result = False
-        for i, (t, e) in enumerate(self._events):
-            if e.beat:
-                if e.beat[0] == measnum:
-                    position = i
-                    result = True
-                    if e.beat[1] >= beat:
-                        break
-                if e.beat[0] > measnum:
-                    break
-        if result:
-            self.set_position(position)
-            return True
-        return False
+        measures = self._measures
+        i = bisect.bisect_left(measures, (measnum, beat))
+        if i == len(measures) or measures[i][0] != measnum:
+            if i == 0 or measures[i-1][0] != measnum:
+                return False
+            i -= 1
+        self.set_position(self._measure_positions[i])
+        return True
+
+    def beat_at(self, time):
+        """Returns (time, measnum, beat, num, den) for the beat at the time.
+
+        This is the last beat at or before the time (in msec). Returns None if
+        there is no Song or it has no beats.
+
+        """
+        i = bisect.bisect_right(self._beat_times, time) - 1
+        if self._beat_times:
+            return self._song.beats[max(i, 0)]
 
     def set_position(self, position, offset=0):
         """(Private) Goes to the specified position in the internal events list.
@@ -181,6 +212,7 @@ class Player:
 
         """
         old, self._position = self._position, position
+        self._sent = 0
         if old != self._position:
             self.position_event(old, self._position)
         if self._playing:
@@ -205,15 +237,39 @@ class Player:
         """
         if self.has_events():
             time, event = self._events[self._position]
+            if self.lookahead and self._output and self._output.latency:
+                self.send_ahead(time)
             self.handle_event(time, event)
             self._position += 1
             if self._position < len(self._events):
                 return self._events[self._position][0] - time
         return 0
 
+    def send_ahead(self, time):
+        """(Private) Sends the MIDI events of the coming lookahead msec.
+
+        The events are sent with the timestamp at which they should be played,
+        computed from the time of the current event and the tempo factor.
+
+        """
+        events = self._events
+        limit = self.timer_midi_time() + self.lookahead
+        i = max(self._sent, self._position)
+        while i < len(events):
+            t, e = events[i]
+            # never send an event before one that was already sent
+            stamp = max(self._sync_time + (t - time) / self._tempo_factor, self._sent_time)
+            if i > self._position and stamp > limit:
+                break
+            if e.midi:
+                self.midi_event(e.midi, int(stamp))
+            self._sent_time = stamp
+            i += 1
+        self._sent = i
+
     def handle_event(self, time, event):
         """(Private) Called for every event."""
-        if event.midi:
+        if event.midi and self._position >= self._sent:
             self.midi_event(event.midi)
         if event.time:
             self.time_event(time)
@@ -222,15 +278,16 @@ class Player:
         if event.user is not None:
             self.user_event(event.user)
 
-    def midi_event(self, midi):
+    def midi_event(self, midi, timestamp=0):
         """(Private) Plays the specified MIDI events.
 
         The format depends on the way MIDI events are stored in the Song.
+        The timestamp is used if the events are sent ahead.
 
         """
         if self._output:
             try:
-                self._output.midi_event(midi)
+                self._output.midi_event(midi, timestamp)
             except BaseException as e:
                 self.exception_event(e)
 
@@ -248,8 +305,30 @@ class Player:
 
     def stop_event(self):
         """Called when playback is stopped by the user."""
+        self.silence(flush=True)
+
+    def silence(self, flush=False):
+        """(Private) Turns all sounds off, also those of the events sent ahead.
+
+        If flush is True, the output is asked to discard the events that were
+        sent ahead, which can be costly (PortMIDI reopens the device), so this
+        is only done when playback stops. Otherwise the sounds are turned off
+        after the last event that was sent ahead; the output then sends the
+        events that follow not earlier than that, as its timestamps never
+        decrease. Exceptions are handled by exception_event().
+
+        """
         if self._output:
-            self._output.all_sounds_off()
+            try:
+                timestamp = 0
+                if (self._sent_time > self.timer_midi_time()
+                        and not (flush and self._output.flush())):
+                    timestamp = int(self._sent_time)
+                self._output.all_sounds_off(timestamp=timestamp)
+            except BaseException as e:
+                self.exception_event(e)
+        self._sent = 0
+        self._sent_time = 0
 
     def finish_event(self):
         """Called when a song reaches the end by itself."""
@@ -265,8 +344,8 @@ class Player:
         player is playing.
 
         """
-        if self._playing and self._output:
-            self._output.all_sounds_off()
+        if self._playing:
+            self.silence()
 
     def exception_event(self, exception):
         """Called when an exception occurs while writing to a MIDI output.
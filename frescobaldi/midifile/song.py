@@ -168,6 +168,16 @@ def beats(d, division):
         for e in events(d[midi_time]):
             if is_time_signature(e):
                 time_sigs.append((midi_time, get_time_signature(e)))
+    yield from signature_beats(time_sigs, times[-1], division)
+
+
+def signature_beats(time_sigs, end, division):
+    """Yields tuples for every beat up to MIDI time end.
+
+    time_sigs is a list of (midi_time, (num, den, clocks, n32s)) tuples for
+    the time signatures. Yields the same tuples as beats().
+
+    """
     if not time_sigs or time_sigs[0][0] != 0:
         # default time signature at start
         time_sigs.insert(0, (0, (4, 4, 24, 8)))
@@ -175,7 +185,7 @@ def beats(d, division):
     # now yield a tuple for every beat
     time = 0
     sigs_index = 0
-    while time <= times[-1]:
+    while time <= end:
 
         if sigs_index < len(time_sigs) and time >= time_sigs[sigs_index][0]:
             # new time signature
@@ -32,6 +32,7 @@ import signals
 import job
 import resultfiles
 import listmodel
+import midifile.compact
 import midifile.song
 
 
@@ -61,7 +62,9 @@ class MidiFiles(plugin.DocumentPlugin):
             self.update()
         song = self._songs[index]
         if not song:
-            song = self._songs[index] = midifile.song.load(self._files[index])
+            # use the faster NumPy based loader if possible
+            load = midifile.compact.load if midifile.compact.available() else midifile.song.load
+            song = self._songs[index] = load(self._files[index])
         return song
 
     def model(self):
@@ -26,10 +26,20 @@ Handles output to MIDI ports.
 import midifile.output
 
 
+# the latency in msec the output ports are opened with, which makes
+# PortMIDI use the timestamps of the events
+LATENCY = 10
+
+
 class Output(midifile.output.PortMidiOutput):
-    """Handles the output, e.g. for a MIDI player."""
-    def __init__(self, output):
+    """Handles the output, e.g. for a MIDI player.
+
+    The latency should be the latency the PortMIDI output was opened with.
+
+    """
+    def __init__(self, output, latency=0):
         self.output = output
+        self.latency = latency
 
 
 
@@ -33,7 +33,14 @@ def event_filter(midi_event):
 
 
 class Player(qmidi.player.Player):
-    """This Player uses the time from midihub."""
+    """This Player uses the time from midihub.
+
+    MIDI events are sent 80 msec ahead with a timestamp, if the output
+    supports it, so playback does not stutter when the GUI is busy.
+
+    """
+    lookahead = 80
+
     def timer_midi_time(self):
         return midihub.time()
 
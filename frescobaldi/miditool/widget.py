@@ -122,9 +122,9 @@ class Widget(QWidget):
         self._outputCloseTimer.stop()
         if not self._player.output():
             p = QSettings().value("midi/output_port", midihub.default_output(), str)
-            o = midihub.output_by_name(p)
+            o = midihub.output_by_name(p, output.LATENCY)
             if o:
-                self._player.set_output(output.Output(o))
+                self._player.set_output(output.Output(o, output.LATENCY))
 
     def closeOutput(self):
         """Called when the output close timer fires. Closes the output."""
@@ -188,13 +188,15 @@ class Widget(QWidget):
     def slotTimeSliderChanged(self, value):
         self._player.seek(value)
         self._display.setTime(value)
-        if self._player.song():
-            self._display.setBeat(*self._player.song().beat(value)[1:])
+        beat = self._player.beat_at(value)
+        if beat:
+            self._display.setBeat(*beat[1:])
 
     def slotTimeSliderMoved(self, value):
         self._display.setTime(value)
-        if self._player.song():
-            self._display.setBeat(*self._player.song().beat(value)[1:])
+        beat = self._player.beat_at(value)
+        if beat:
+            self._display.setBeat(*beat[1:])
 
     def updateTimeSlider(self):
         if not self._timeSlider.isSliderDown():
@@ -92,6 +92,7 @@ class MusicViewPanel(panel.Panel):
         ac.music_maximize.triggered.connect(self.maximize)
         ac.music_jump_to_cursor.triggered.connect(self.jumpToCursor)
         ac.music_sync_cursor.triggered.connect(self.toggleSyncCursor)
+        ac.music_overview.triggered.connect(self.toggleOverview)
         ac.music_copy_image.triggered.connect(self.copyImage)
         ac.music_copy_text.triggered.connect(self.copyText)
         ac.music_document_select.documentsChanged.connect(self.updateActions)
@@ -104,6 +105,7 @@ class MusicViewPanel(panel.Panel):
         s = QSettings()
         s.beginGroup("musicview")
         ac.music_sync_cursor.setChecked(s.value("sync_cursor", False, bool))
+        ac.music_overview.setChecked(s.value("overview", False, bool))
         props = pagedview.PagedView.properties().setdefaults().load(s)
         ac._viewActions.updateFromProperties(props)
         ac._viewActions.viewRequested.connect(self.widget)   # force creation
@@ -118,6 +120,7 @@ class MusicViewPanel(panel.Panel):
         s = QSettings()
         s.beginGroup("musicview")
         w.view.readProperties(s)
+        w.showOverview(self.actionCollection.music_overview.isChecked())
         w.view.rubberband().selectionChanged.connect(self.updateSelection)
         self.actionCollection._viewActions.setView(w.view)
         selector = self.actionCollection.music_document_select
@@ -177,6 +180,12 @@ class MusicViewPanel(panel.Panel):
         QSettings().setValue("musicview/sync_cursor",
             self.actionCollection.music_sync_cursor.isChecked())
 
+    def toggleOverview(self):
+        enable = self.actionCollection.music_overview.isChecked()
+        QSettings().setValue("musicview/overview", enable)
+        if self.instantiated():
+            self.widget().showOverview(enable)
+
     def copyImage(self):
         page, rect = self.widget().view.rubberband().selectedPage()
         if not page:
@@ -217,6 +226,7 @@ class Actions(actioncollection.ActionCollection):
         self.music_maximize = QAction(panel)
         self.music_jump_to_cursor = QAction(panel)
         self.music_sync_cursor = QAction(panel, checkable=True)
+        self.music_overview = QAction(panel, checkable=True)
         self.music_copy_image = QAction(panel)
         self.music_copy_text = QAction(panel)
         self.music_pager = va.pager
@@ -246,6 +256,7 @@ class Actions(actioncollection.ActionCollection):
         self.music_maximize.setText(_("&Maximize"))
         self.music_jump_to_cursor.setText(_("&Jump to Cursor Position"))
         self.music_sync_cursor.setText(_("S&ynchronize with Cursor Position"))
+        self.music_overview.setText(_("Page &Overview"))
         self.music_copy_image.setText(_("Copy to &Image..."))
         self.music_copy_text.setText(_("Copy Selected &Text"))
         self.music_reload.setText(_("&Reload"))
@@ -91,7 +91,8 @@ class DocumentGroup(plugin.DocumentPlugin):
             for filename, doc in zip(files, itertools.chain(
                     self._documents or (), itertools.repeat(None))):
                 if doc:
-                    doc.setSource(filename)
+                    # only the changed pages need to be rendered again
+                    doc.reload(filename)
                 else:
                     doc = pagedview.loadPdf(filename)
                 doc.updated = newer or results.is_newer(filename)
@@ -19,27 +19,51 @@
 
 """
 Handles Point and Click.
-"""
 
+The links of a PDF document are extracted in a background thread, page by
+page, starting with the pages that are visible. The links that are already
+found can be used right away; the changed signal of the Links object is
+emitted every time new links have been added.
+
+The extracted links are stored in the cache directory, keyed by a hash of
+the contents of the PDF file, so reopening an unchanged PDF is fast.
+
+"""
 
 
-import re
+import hashlib
 import os
-import sys
+import time
 import weakref
 
+from PyQt6.QtCore import QThread, pyqtSignal
+
 import qpageview.locking
 
+import diskcache
+import signals
 import util
 import textedit
 import pointandclick
 
 
+# change this when the format of the cached link tables changes
+_VERSION = 1
+
+# the maximum number of link tables kept in the cache directory
+_MAX_CACHED = 100
+
 # cache point and click handlers for PDF documents
 _cache = weakref.WeakKeyDictionary()
 
 
-def links(document):
+def links(document, pages=()):
+    """Return the Links for the qpageview Document.
+
+    If the links were not yet extracted, this is started in the background;
+    the pages with the numbers in pages are handled first.
+
+    """
     # the backend object is replaced on every load
     # of the pdf, which makes it a suitable cache key
     key = document.document()
@@ -48,23 +72,68 @@ def links(document):
         return _cache[key]
     except KeyError:
         l = _cache[key] = Links()
-        with l:
-            with qpageview.locking.lock(document):
-                for num, page in enumerate(document.pages()):
-                    for link in page.links():
-                        t = textedit.link(link.url)
-                        if t:
-                            filename = util.normpath(t.filename)
-                            l.add_link(filename, t.line, t.column, (num, link.area))
+        l.load(document, pages)
         return l
 
 
+def content_hash(filename):
+    """Return a hex digest of the contents of the file, or None on error."""
+    h = hashlib.sha1()
+    try:
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
 class Links(pointandclick.Links):
     """Stores all the links of a PDF document sorted by URL and text position.
 
     Only textedit:// urls are stored.
 
     """
+    changed = signals.Signal()  # emitted when new links have been added
+
+    def __init__(self):
+        super().__init__()
+        self._loader = None
+        self._stopper = None
+
+    def load(self, document, pages=()):
+        """Start extracting the links from the document in the background.
+
+        The pages with the numbers in pages are handled first.
+
+        """
+        self.finish()
+        self._loader = loader = _Loader(document, pages)
+        loader.linksFound.connect(self._slotLinksFound)
+        loader.finished.connect(self._slotLoaderFinished)
+        # stop the thread if we are dropped, e.g. when the PDF is reloaded;
+        # this also keeps the QThread alive until it has stopped
+        self._stopper = weakref.finalize(self, loader.stop)
+        loader.start()
+
+    def is_loading(self):
+        """Return True if links are still being extracted."""
+        return bool(self._loader)
+
+    def _slotLinksFound(self, links):
+        """Called when the loader has found new links."""
+        filenames = set()
+        for filename, line, column, dest in links:
+            self.add_link(filename, line, column, dest)
+            filenames.add(filename)
+        self.update(filenames)
+        self.changed()
+
+    def _slotLoaderFinished(self):
+        self._stopper.detach()
+        self._loader.wait()
+        self._loader = None
+
     def cursor(self, link, load=False):
         """Returns the destination of a link as a QTextCursor of the destination document.
 
@@ -81,6 +150,79 @@ class Links(pointandclick.Links):
             return super().cursor(filename, t.line, t.column, load)
 
 
-positions = pointandclick.positions
+class _Loader(QThread):
+    """Extracts the textedit links from the pages of a document.
+
+    The links are sent in batches using the linksFound signal, as a list of
+    (filename, line, column, (pagenum, area)) tuples.
+
+    """
+    linksFound = pyqtSignal("PyQt_PyObject")
+
+    # time in seconds after which the links found so far are sent
+    interval = 0.25
+
+    def __init__(self, document, pages=()):
+        super().__init__()
+        self._pages = document.pages()
+        self._filename = document.filename()
+        self._lock = document
+        count = len(self._pages)
+        first = [num for num in pages if 0 <= num < count]
+        # continue after the last visible page, the pages before it come last
+        start = max(first) + 1 if first else 0
+        rest = [num for num in range(start, count)]
+        rest += [num for num in range(start) if num not in first]
+        self._order = first + rest
+        self._first = len(first)
+
+    def run(self):
+        key = self._filename and content_hash(self._filename)
+        name = key and os.path.join("pdflinks", key)
+        table = name and diskcache.load(name, _VERSION)
+        if table is not None and len(table) == len(self._pages):
+            self.linksFound.emit([l for page in table for l in page])
+            try:
+                os.utime(diskcache.filename(name))  # keep it from being pruned
+            except OSError:
+                pass
+            return
+        table = [None] * len(self._pages)
+        batch = []
+        last = time.time()
+        for i, num in enumerate(self._order):
+            if self.isInterruptionRequested():
+                return
+            table[num] = self.pageLinks(num)
+            batch.extend(table[num])
+            # send the visible pages immediately, the others in batches
+            if i < self._first or time.time() - last > self.interval:
+                if batch:
+                    self.linksFound.emit(batch)
+                    batch = []
+                last = time.time()
+        if batch:
+            self.linksFound.emit(batch)
+        if name:
+            diskcache.save(name, table, _VERSION)
+            diskcache.prune("pdflinks", _MAX_CACHED)
+
+    def stop(self):
+        """Stop extracting links and wait for the thread to finish."""
+        self.requestInterruption()
+        self.wait()
+
+    def pageLinks(self, num):
+        """Return the list of textedit links on the page with number num."""
+        result = []
+        with qpageview.locking.lock(self._lock):
+            links = self._pages[num].links()
+        for link in links:
+            t = textedit.link(link.url)
+            if t:
+                filename = util.normpath(t.filename)
+                result.append((filename, t.line, t.column, (num, link.area)))
+        return result
 
 
+positions = pointandclick.positions
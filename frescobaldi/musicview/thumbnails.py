@@ -0,0 +1,292 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Small images of the pages of PDF documents, cached on disk.
+
+Thumbnails are rendered in a background thread after a document has been
+compiled (or when it is first shown in the page overview) and stored as PNG
+files in the cache directory, keyed by the absolute path and modification
+time of the PDF document and the page number.
+
+The OverviewStrip shows the thumbnails next to the Music View. It never
+renders a PDF page itself: a page without thumbnail is shown blank until the
+thumbnail is ready. So browsing to the end of a large score does not
+rasterise all the pages before it.
+
+"""
+
+
+import collections
+import hashlib
+import itertools
+import os
+
+from PyQt6.QtCore import pyqtSignal, QObject, QRect, QSettings, QSize, Qt, QThread
+from PyQt6.QtGui import QImage, QTransform
+from PyQt6.QtPdf import QPdfDocument
+
+import qpageview.page
+import qpageview.sidebarview
+
+import diskcache
+
+from . import documents
+
+
+_CACHE_NAME = "thumbnails"
+_MAX_CACHED = 5000      # maximum number of thumbnail files on disk
+_MAX_IMAGES = 500       # maximum number of thumbnail images in memory
+
+# the width of the thumbnails in pixels
+WIDTH = 200
+
+_manager = None
+_directory = None
+_images = collections.OrderedDict()     # (key, num) -> QImage
+_missing = set()                        # (key, num) without thumbnail on disk
+
+
+def key(filename):
+    """Return a (path, mtime) tuple for the current version of filename.
+
+    Returns None if the file does not exist.
+
+    """
+    path = os.path.abspath(filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return path, mtime
+
+
+def cachefile(directory, key, num):
+    """Return the filename of the thumbnail of page num in directory."""
+    data = "{0}\0{1}\0{2}\0{3}".format(key[0], key[1], num, WIDTH)
+    digest = hashlib.sha1(data.encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(directory, digest + '.png')
+
+
+def directory():
+    """Return the thumbnail cache directory, creating it only once."""
+    global _directory
+    if _directory is None:
+        _directory = diskcache.directory(_CACHE_NAME)
+    return _directory
+
+
+def thumbnail(key, num):
+    """Return the thumbnail QImage of page num, or None if not yet available.
+
+    The thumbnail is read from disk if needed; the most recently used images
+    are kept in memory. A thumbnail that was not found is not looked for
+    again until the Manager reports it ready, so painting blank pages does
+    not touch the disk.
+
+    """
+    try:
+        image = _images[(key, num)]
+    except KeyError:
+        if (key, num) in _missing:
+            return None
+        image = QImage(cachefile(directory(), key, num))
+        if image.isNull():
+            if len(_missing) >= _MAX_CACHED:
+                _missing.clear()
+            _missing.add((key, num))
+            return None
+        _images[(key, num)] = image
+        while len(_images) > _MAX_IMAGES:
+            _images.popitem(False)
+    else:
+        _images.move_to_end((key, num))
+    return image
+
+
+def manager():
+    """Return the global Manager instance."""
+    global _manager
+    if _manager is None:
+        _manager = Manager()
+    return _manager
+
+
+def generate(filename, first=0):
+    """Generate missing thumbnails of the PDF document in the background.
+
+    Starts with page number first (0-based), then the following pages.
+
+    """
+    manager().generate(filename, first)
+
+
+@documents.documentUpdated.connect
+def _slotDocumentUpdated(document, job):
+    """Generate the thumbnails of newly compiled documents if desired."""
+    if QSettings().value("musicview/overview", False, bool):
+        for doc in documents.group(document).documents():
+            filename = doc.filename()
+            if isinstance(filename, str):
+                generate(filename)
+
+
+class Manager(QObject):
+    """Generates thumbnails for one document at a time.
+
+    The pageReady(key, num) signal is emitted when a thumbnail has been
+    stored on disk.
+
+    """
+    pageReady = pyqtSignal(object, int)
+
+    def __init__(self):
+        super().__init__()
+        self._queue = []        # list of (key, first) tuples
+        self._done = set()      # keys for which all thumbnails are present
+        self._thread = None
+        self.pageReady.connect(self._slotPageReady)
+
+    def generate(self, filename, first=0):
+        """Queue the generation of the thumbnails of filename."""
+        k = key(filename)
+        if k is None or k in self._done:
+            return
+        if self._thread:
+            if self._thread.key == k:
+                return
+            elif self._thread.key[0] == k[0]:
+                # an older version of the same file; no use to continue
+                self._thread.requestInterruption()
+        # we only need the thumbnails of the most recent version of a file
+        self._queue = [(kk, f) for kk, f in self._queue if kk[0] != k[0]]
+        self._queue.append((k, first))
+        self._start()
+
+    def _start(self):
+        """(internal) Start a Generator for the next queued document."""
+        if not self._thread and self._queue:
+            k, first = self._queue.pop(0)
+            t = self._thread = Generator(k, first)
+            t.pageReady.connect(self.pageReady)
+            t.finished.connect(self._slotFinished)
+            t.start()
+
+    def _slotPageReady(self, key, num):
+        """(internal) Called when a thumbnail has been stored on disk."""
+        _missing.discard((key, num))
+
+    def _slotFinished(self):
+        """(internal) Called when a Generator has finished."""
+        t, self._thread = self._thread, None
+        if t.complete:
+            self._done.add(t.key)
+        diskcache.prune(_CACHE_NAME, _MAX_CACHED)
+        self._start()
+
+
+class Generator(QThread):
+    """Renders the missing thumbnails of a PDF document in a background thread.
+
+    The document is loaded separately, so the Music View is not involved.
+
+    """
+    pageReady = pyqtSignal(object, int)
+
+    def __init__(self, key, first=0):
+        super().__init__()
+        self.key = key
+        self.first = first
+        self.complete = False
+        self.directory = diskcache.directory(_CACHE_NAME)
+
+    def run(self):
+        doc = QPdfDocument(None)
+        doc.load(self.key[0])
+        if doc.status() != QPdfDocument.Status.Ready:
+            return
+        count = doc.pageCount()
+        first = max(0, min(self.first, count - 1))
+        for num in itertools.chain(range(first, count), range(first)):
+            if self.isInterruptionRequested():
+                return
+            filename = cachefile(self.directory, self.key, num)
+            if os.path.exists(filename):
+                continue
+            size = doc.pagePointSize(num)
+            if size.width() <= 0 or size.height() <= 0:
+                continue
+            height = max(1, round(WIDTH * size.height() / size.width()))
+            image = doc.render(num, QSize(WIDTH, height))
+            temp = filename + '.tmp'
+            if image.save(temp, "PNG"):
+                try:
+                    os.replace(temp, filename)
+                except OSError:
+                    continue
+                self.pageReady.emit(self.key, num)
+        self.complete = True
+
+
+class ThumbnailPage(qpageview.page.AbstractPage):
+    """A Page that displays the cached thumbnail of a page, if available."""
+    def __init__(self, key, num, page):
+        super().__init__()
+        self.key = key
+        self.num = num
+        self.setPageSize(page.pageSize())
+        self.rotation = page.rotation
+        self.paperColor = page.paperColor
+
+    def paint(self, painter, rect, callback=None):
+        """Paint the thumbnail, or a blank page if it is not yet available."""
+        painter.fillRect(rect, self.paperColor or Qt.GlobalColor.white)
+        image = thumbnail(self.key, self.num)
+        if image:
+            if self.computedRotation:
+                image = image.transformed(QTransform().rotate(self.computedRotation * 90))
+            painter.drawImage(QRect(0, 0, self.width, self.height), image)
+
+
+class OverviewStrip(qpageview.sidebarview.SidebarView):
+    """A strip with the thumbnails of all pages of the connected View."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        manager().pageReady.connect(self.slotPageReady)
+
+    def slotLayoutUpdated(self):
+        """Reimplemented to show ThumbnailPages instead of copied pages."""
+        doc = self._view.document()
+        filename = doc.filename() if doc else None
+        k = key(filename) if isinstance(filename, str) else None
+        if k is None:
+            return super().slotLayoutUpdated()
+        self.pageLayout()[:] = (ThumbnailPage(k, num, page)
+            for num, page in enumerate(self._view.pageLayout()))
+        self.pageLayout().rotation = self._view.pageLayout().rotation
+        self.updatePageLayout()
+        generate(filename, self._view.currentPageNumber() - 1)
+
+    def slotPageReady(self, key, num):
+        """Called when a thumbnail has become available."""
+        layout = self.pageLayout()
+        if num < layout.count():
+            page = layout[num]
+            if isinstance(page, ThumbnailPage) and page.key == key:
+                self.repaintPage(page)
@@ -30,7 +30,7 @@ import os
 from PyQt6.QtCore import (pyqtSignal, QMargins, QPoint, QPointF, QRect, QRectF,
                           QSettings, Qt, QUrl)
 from PyQt6.QtGui import QCursor, QTextCharFormat
-from PyQt6.QtWidgets import QToolTip, QVBoxLayout, QWidget
+from PyQt6.QtWidgets import QSplitter, QToolTip, QVBoxLayout, QWidget
 
 import qpageview
 import qpageview.layout
@@ -48,6 +48,7 @@ import viewhighlighter
 import ly.lex.lilypond
 
 from . import pointandclick
+from . import thumbnails
 
 
 class MusicView(QWidget):
@@ -67,9 +68,13 @@ class MusicView(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(layout)
 
-        self.view = pagedview.PagedView(self)
+        self.splitter = QSplitter(self)
+        layout.addWidget(self.splitter)
+        self.overview = thumbnails.OverviewStrip(self.splitter)
+        self.overview.hide()
+        self.view = pagedview.PagedView(self.splitter)
         self.view.setRubberband(qpageview.rubberband.Rubberband())
-        layout.addWidget(self.view)
+        self.splitter.setStretchFactor(1, 1)
         app.settingsChanged.connect(self.readSettings)
         self.readSettings()
         self.view.setLinkHighlighter(qpageview.highlight.Highlighter())
@@ -94,13 +99,26 @@ class MusicView(QWidget):
 
     def openDocument(self, doc):
         """Open a qpageview.Document instance."""
+        if self._links:
+            self._links.changed.disconnect(self.slotLinksChanged)
         self._links = None
         self._highlightRange = None
-        self._links = pointandclick.links(doc)
         self.view.setDocument(doc)
+        # extract the links of the visible pages first
+        pages = {page: num for num, page in enumerate(doc.pages())}
+        visible = [pages[p] for p in self.view.visiblePages() if p in pages]
+        self._links = pointandclick.links(doc, visible)
+        self._links.changed.connect(self.slotLinksChanged)
+
+    def showOverview(self, enable):
+        """Shows or hides the page overview strip."""
+        self.overview.setView(self.view if enable else None)
+        self.overview.setVisible(enable)
 
     def clear(self):
         """Empties the view."""
+        if self._links:
+            self._links.changed.disconnect(self.slotLinksChanged)
         self._links = None
         self._highlightRange = None
         self.view.clear()
@@ -200,6 +218,10 @@ class MusicView(QWidget):
             old.cursorPositionChanged.disconnect(self.slotCursorPositionChanged)
         view.cursorPositionChanged.connect(self.slotCursorPositionChanged)
 
+    def slotLinksChanged(self):
+        """Called when links were added while they are extracted from the PDF."""
+        self.showCurrentLinks()
+
     def slotCursorPositionChanged(self):
         """Called when the user moves the text cursor."""
         self.showCurrentLinks(
@@ -249,6 +271,9 @@ class MusicView(QWidget):
                     pbound |= f(r)
                 boundingRect |= pbound.translated(page.pos())
             self.view.ensureVisible(boundingRect, QMargins(20, 20, 20, 20))
+        else:
+            # render the pages in advance, the user might want to go there
+            self.view.prerenderer.addPages(areas)
 
         if msec is None:
             msec = 5000 if s.stop - s.start > 1 else 2000 # show selections longer
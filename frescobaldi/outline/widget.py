@@ -38,6 +38,8 @@ class Widget(QTreeWidget):
         super().__init__(tool,
             headerHidden=True)
         self._timer = QTimer(singleShot=True, timeout=self.updateView)
+        self._outline = []  # the displayed outline items
+        self._items = []    # the QTreeWidgetItems, in the same order
         tool.mainwindow().currentDocumentChanged.connect(self.slotCurrentDocumentChanged)
         self.itemClicked.connect(self.slotItemClicked)
         self.itemActivated.connect(self.slotItemClicked)
@@ -61,53 +63,55 @@ class Widget(QTreeWidget):
         if added + removed > 1000:
             self._timer.start(100)
         else:
-            self._timer.start(2000)
+            self._timer.start(500)
 
     def updateView(self):
-        """Recreate the items in the view."""
+        """Update the items in the view.
+
+        The new outline is compared with the one currently displayed, and
+        only the items for the changed outline items are recreated. The items
+        after them are kept, and only moved to another parent if needed.
+
+        """
         with qutil.signalsBlocked(self):
-            self.clear()
             doc = self.parent().mainwindow().currentDocument()
             if not doc:
+                self.clear()
+                self._outline = []
+                self._items = []
                 return
+            outline = documentstructure.DocumentStructure.instance(doc).outline()
+            start, old_end, new_end = documentstructure.diff(self._outline, outline)
+            if start == old_end == new_end:
+                return
+            old_items = self._items[start:old_end]
+            kept_items = self._items[old_end:]
+            kept = {id(item): n for n, item in enumerate(kept_items)}
+
+            # take the kept items out of the items that are removed
+            removed = set(map(id, old_items))
+            orphans = set()
+            for item in kept_items:
+                parent = item.parent()
+                if parent and id(parent) in removed:
+                    parent.removeChild(item)
+                    orphans.add(id(item))
+            for item in reversed(old_items):
+                self.takeItem(item)
+            self._outline = outline
+
             view_cursor_position = self.parent().mainwindow().textCursor().position()
-            structure = documentstructure.DocumentStructure.instance(doc)
-            last_item = None
+            last_item = self._items[start - 1] if start else None
             current_item = None
-            last_block = None
-            for i in structure.outline():
-                position = i.start()
-                block = doc.findBlock(position)
+            last_block = last_item.outline.block if last_item else None
+            new_items = []
+            for i in outline[start:new_end]:
+                block = i.block
                 depth = tokeniter.state(block).depth()
-                if block == last_block:
-                    parent = last_item
-                elif last_block is None or depth == 1:
-                    # a toplevel item anyway
-                    parent = self
-                else:
-                    while last_item and depth <= last_item.depth:
-                        last_item = last_item.parent()
-                    if not last_item:
-                        parent = self
-                    else:
-                        # the item could belong to a parent item, but see if they
-                        # really are in the same (toplevel) state
-                        b = last_block.next()
-                        while b < block:
-                            depth2 = tokeniter.state(b).depth()
-                            if depth2 == 1:
-                                parent = self
-                                break
-                            while last_item and depth2 <= last_item.depth:
-                                last_item = last_item.parent()
-                            if not last_item:
-                                parent = self
-                                break
-                            b = b.next()
-                        else:
-                            parent = last_item
-
-                item = last_item = QTreeWidgetItem(parent)
+                parent = self.parentItem(last_item, last_block, block, depth)
+                item = last_item = QTreeWidgetItem()
+                self.insertItem(parent, item, kept, 0)
+                new_items.append(item)
 
                 # set item text and display style bold if 'title' was used
                 for name, text in i.groupdict().items():
@@ -131,20 +135,108 @@ class Widget(QTreeWidget):
                 item.setText(0, text)
 
                 # remember whether is was collapsed by the user
-                try:
-                    collapsed = block.userData().collapsed
-                except AttributeError:
-                    collapsed = False
-                item.setExpanded(not collapsed)
+                item.setExpanded(not collapsed(block))
                 item.depth = depth
-                item.position = position
+                item.outline = i
                 last_block = block
                 # scroll to the item at the view's cursor later
-                if position <= view_cursor_position:
+                if i.start() <= view_cursor_position:
                     current_item = item
-            if current_item:
+            self._items[start:old_end] = new_items
+
+            # The kept items keep their children, but the toplevel kept items
+            # and those that lost their parent may need another parent. That
+            # only needs to be checked if the item before it is not a kept
+            # item that stayed in place.
+            roots = {}      # the topmost kept item a kept item belongs to
+            moved = set()
+            for n, item in enumerate(kept_items):
+                parent = item.parent()
+                if parent and id(parent) in kept:
+                    roots[id(item)] = roots[id(parent)]
+                else:
+                    roots[id(item)] = id(item)
+                    if (id(item) in orphans or n == 0
+                            or roots[id(kept_items[n - 1])] in moved):
+                        new_parent = self.parentItem(last_item, last_block,
+                                                     item.outline.block, item.depth)
+                        if new_parent is self:
+                            new_parent = None
+                        if id(item) in orphans or new_parent is not parent:
+                            if id(item) not in orphans:
+                                self.takeItem(item)
+                            self.insertItem(new_parent or self, item, kept, n)
+                            moved.add(id(item))
+                            # the expanded state is lost when an item is taken
+                            items = [item]
+                            while items:
+                                moved_item = items.pop()
+                                moved_item.setExpanded(not collapsed(moved_item.outline.block))
+                                items.extend(moved_item.child(c)
+                                             for c in range(moved_item.childCount()))
+                last_item = item
+                last_block = item.outline.block
+            if current_item and start == 0:
                 self.scrollToItem(current_item)
 
+    def parentItem(self, last_item, last_block, block, depth):
+        """Return the parent for an outline item in block at depth.
+
+        last_item is the item before it (or None) and last_block its block.
+        Returns self for a toplevel item.
+
+        """
+        if block == last_block:
+            return last_item
+        elif last_block is None or depth == 1:
+            # a toplevel item anyway
+            return self
+        while last_item and depth <= last_item.depth:
+            last_item = last_item.parent()
+        if not last_item:
+            return self
+        # the item could belong to a parent item, but see if they
+        # really are in the same (toplevel) state
+        b = last_block.next()
+        while b < block:
+            depth2 = tokeniter.state(b).depth()
+            if depth2 == 1:
+                return self
+            while last_item and depth2 <= last_item.depth:
+                last_item = last_item.parent()
+            if not last_item:
+                return self
+            b = b.next()
+        return last_item
+
+    def insertItem(self, parent, item, kept, n):
+        """Insert item in parent (or toplevel if parent is self).
+
+        It is inserted before the children that are in the kept dictionary
+        (mapping id() to index) with an index of at least n.
+
+        """
+        if parent is self:
+            count, child, insert = (self.topLevelItemCount,
+                self.topLevelItem, self.insertTopLevelItem)
+        else:
+            count, child, insert = parent.childCount, parent.child, parent.insertChild
+        index = count()
+        while index and kept.get(id(child(index - 1)), -1) >= n:
+            index -= 1
+        insert(index, item)
+        if parent is not self and count() == 1:
+            # the expanded state is not kept for an item without children
+            parent.setExpanded(not collapsed(parent.outline.block))
+
+    def takeItem(self, item):
+        """Remove the item from its parent or from the toplevel items."""
+        parent = item.parent()
+        if parent:
+            parent.removeChild(item)
+        else:
+            self.takeTopLevelItem(self.indexOfTopLevelItem(item))
+
     def cursorForItem(self, item):
         """Returns a cursor for the specified item.
 
@@ -154,7 +246,7 @@ class Widget(QTreeWidget):
         """
         doc = self.parent().mainwindow().currentDocument()
         cursor = QTextCursor(doc)
-        cursor.setPosition(item.position)
+        cursor.setPosition(item.outline.start())
         return cursor
 
     def slotItemClicked(self, item):
@@ -194,3 +286,9 @@ class Widget(QTreeWidget):
         documenttooltip.show(self.cursorForItem(item))
 
 
+def collapsed(block):
+    """Return True if the outline item in the block was collapsed by the user."""
+    try:
+        return block.userData().collapsed
+    except AttributeError:
+        return False
@@ -28,12 +28,14 @@ import itertools
 import os
 import platform
 
-from PyQt6.QtCore import pyqtSignal, QMargins, QSettings, Qt
+from PyQt6.QtCore import pyqtSignal, QMargins, QPoint, QSettings, Qt
+from PyQt6.QtGui import QColor, QPainter
 from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
 
 import app
 import icons
+import prerender
 import textformats
 import qpageview
 import qpageview.view
@@ -85,10 +87,21 @@ class PagedView(qpageview.widgetoverlay.WidgetOverlayViewMixin, qpageview.View):
         self._printer = None
         self.documentPropertyStore = qpageview.view.DocumentPropertyStore()
         self.setMagnifier(Magnifier())
+        self.prerenderer = prerender.PreRenderer(self)
+        self.showRenderStatistics = False
         app.settingsChanged.connect(self.readSettings)
         self.readSettings()
 
     def readSettings(self):
+        # pre-rendering and the render cache
+        s = QSettings()
+        self.prerenderer.enabled = s.value("musicview/prerender", True, bool)
+        prerender.setCacheSize(s.value("musicview/render_cache_size", 200, int))
+        statistics = s.value("musicview/render_statistics", False, bool)
+        if statistics != self.showRenderStatistics:
+            self.showRenderStatistics = statistics
+            self.viewport().update()
+
         # strict paging with pageup/pagedown
         self.strictPagingEnabled = QSettings().value("musicview/strict_paging", False, bool)
 
@@ -138,9 +151,50 @@ class PagedView(qpageview.widgetoverlay.WidgetOverlayViewMixin, qpageview.View):
         if changed:
             self.rerender()
 
+    def paintEvent(self, ev):
+        """Reimplemented to pre-render pages and show render statistics."""
+        if self.showRenderStatistics:
+            stats = prerender.Statistics.instance(self)
+            viewport = self.viewport()
+            pages = []
+            ev_rect = ev.rect().translated(-self.layoutPosition())
+            for page in self.visiblePages(ev_rect):
+                if page.renderer:
+                    rect = (page.geometry() & ev_rect).translated(-page.pos())
+                    stats.painted(page, page.renderer.info(page, viewport, rect))
+                    pages.append(page)
+        super().paintEvent(ev)
+        if self.showRenderStatistics:
+            painter = QPainter(self.viewport())
+            for page in pages:
+                self.paintRenderStatistics(painter, page, stats.get(page))
+        self.prerenderer.schedule()
+
+    def paintRenderStatistics(self, painter, page, stats):
+        """Paint the render statistics of the page in its top left corner."""
+        text = "hits: {0}  misses: {1}  render: {2:.0f} ms{3}".format(
+            stats.hits, stats.misses, stats.averageTime(),
+            "  (pre-rendered)" if stats.prerendered else "")
+        rect = painter.fontMetrics().boundingRect(text).adjusted(-4, -2, 4, 2)
+        rect.moveTopLeft(page.geometry().topLeft() + self.layoutPosition() + QPoint(4, 4))
+        painter.fillRect(rect, QColor(255, 255, 192, 220))
+        painter.setPen(QColor(Qt.GlobalColor.black))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
     def loadPdf(self, filename, renderer=None):
-        """Reimplemented to use a customized renderer by default."""
-        super().loadPdf(filename, renderer or getRenderer("pdf"))
+        """Reimplemented to use a customized renderer and indexed links."""
+        self.setDocument(loadPdf(filename, renderer))
+
+    def reload(self):
+        """Reimplemented to keep the rendered images of unchanged PDF pages."""
+        import pdfdocument
+        doc = self.document()
+        if isinstance(doc, pdfdocument.PdfDocument):
+            doc.reload()
+            with self.modifyPages() as pages:
+                pages[:] = doc.pages()
+        else:
+            super().reload()
 
     def loadSvgs(self, filenames, renderer=None):
         """Reimplemented to use a customized renderer by default."""
@@ -259,9 +313,15 @@ def getRenderer(rendertype):
     return r
 
 
-def loadPdf(filename):
-    """Like qpageview.loadPdf(), but uses a preconfigured renderer."""
-    return qpageview.loadPdf(filename, getRenderer("pdf"))
+def loadPdf(filename, renderer=None):
+    """Like qpageview.loadPdf(), but uses a preconfigured renderer.
+
+    The returned document can be reloaded incrementally and its pages keep
+    their links in a grid index, see the pdfdocument module.
+
+    """
+    import pdfdocument
+    return pdfdocument.PdfDocument(filename, renderer or getRenderer("pdf"))
 
 
 def loadSvgs(filenames):
@@ -32,6 +32,7 @@ import actioncollection
 import actioncollectionmanager
 import plugin
 import app
+import startupprofile
 
 
 def manager(mainwindow):
@@ -104,11 +105,12 @@ class PanelManager(plugin.MainWindowPlugin):
 
         """
         module_name, class_name = name.rsplit('.', 1)
-        __import__(module_name)
-        module = sys.modules[module_name]
+        with startupprofile.measure('panel', name):
+            __import__(module_name)
+            module = sys.modules[module_name]
+            cls = vars(module)[class_name]
+            panel = cls(self.mainwindow())
         attribute_name = module_name.split('.')[-1] if "viewers" in name else module_name.replace('.', '')
-        cls = vars(module)[class_name]
-        panel = cls(self.mainwindow())
         self._panels.append((attribute_name, panel))
         setattr(self, attribute_name, panel)
         if submenu:
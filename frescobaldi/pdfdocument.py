@@ -0,0 +1,404 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+The PDF document and page classes used by the viewers.
+
+PdfDocument can reload its file while keeping the rendered images of the
+pages that did not change. To find those pages, the content streams of the
+pages in the PDF file are hashed (see page_hashes()), together with the
+resources they use (fonts, images, graphic states, etc.). Names of resources
+are numbered in order of appearance before hashing, because PDF writers
+rename them on every run.
+
+The pages keep their links in a LinkIndex, see the linkindex module.
+
+"""
+
+
+import hashlib
+import re
+import zlib
+
+import qpageview.pdf
+import qpageview.render
+
+import linkindex
+
+
+class PdfPage(qpageview.pdf.PdfPage):
+    """A PdfPage that keeps its links in a LinkIndex."""
+    def links(self):
+        """Reimplemented to return the links in a LinkIndex."""
+        try:
+            return self._linkIndex
+        except AttributeError:
+            self._linkIndex = linkindex.LinkIndex(super().links())
+            return self._linkIndex
+
+
+class PdfDocument(qpageview.pdf.PdfDocument):
+    """A PdfDocument that can reload its file incrementally."""
+    pageClass = PdfPage
+
+    def __init__(self, source=None, renderer=None):
+        super().__init__(source, renderer)
+        self._hashes = None
+
+    def createPages(self):
+        """Reimplemented to also store the hashes of the pages."""
+        filename = self.filename()
+        self._hashes = page_hashes(filename) if filename else None
+        return super().createPages()
+
+    def reload(self, filename=None):
+        """Reload the document from filename, or its own file if None.
+
+        The rendered images of the pages that did not change are kept in
+        the render cache, so they don't need to be rendered again.
+        Returns the list of page numbers that changed, or None if all pages
+        should be considered changed.
+
+        """
+        old = self._document
+        hashes = self._hashes
+        oldpages = self._pages
+        if filename is None:
+            self.invalidate()
+        else:
+            self.setSource(filename)
+        self._hashes = None
+        if not old or not hashes or not oldpages:
+            return
+        pages = self.pages()
+        if not pages or not self._hashes or len(self._hashes) != len(pages):
+            return
+        cache = pages[0].renderer.cache
+        numbers = {h: num for num, h in enumerate(hashes)}
+        reused = {}     # oldnum -> the images of the old page
+        changed = []
+        for num, h in enumerate(self._hashes):
+            oldnum = numbers.get(h)
+            if oldnum is None:
+                changed.append(num)
+                continue
+            page = pages[num]
+            if page.pageSize() != oldpages[oldnum].pageSize():
+                continue
+            if oldnum not in reused:
+                # move the images to the new page, so the cache does not
+                # count them twice
+                images = reused[oldnum] = take_images(cache, oldpages[oldnum])
+                put_images(cache, page, images)
+            else:
+                # another page with the same contents: add copies of the images
+                for k, tiles in reused[oldnum].items():
+                    key = qpageview.render.Key(page.group(), page.ident(), *k)
+                    for tile, entry in tiles.items():
+                        cache.addtile(key, tile, entry.image)
+        return changed
+
+    def invalidate(self):
+        """Reimplemented to also forget the page hashes."""
+        super().invalidate()
+        self._hashes = None
+
+
+# qpageview's ImageCache has no public methods to get all the images of a page
+# or to move them to another page. The two functions below access its private
+# _cache dictionary, {group: {ident: {(rotation, width, height): {tile:
+# ImageEntry}}}}, checked against qpageview 1.0.5.
+
+def take_images(cache, page):
+    """Remove the images of the page from the ImageCache and return them.
+
+    Returns a dictionary {(rotation, width, height): {tile: ImageEntry}}, which
+    is empty if there are no images. The cache size is not changed, the images
+    are meant to be given to another page with put_images().
+
+    """
+    return cache._cache.get(page.group(), {}).pop(page.ident(), {})
+
+
+def put_images(cache, page, images):
+    """Store the images returned by take_images() in the cache for the page."""
+    if images:
+        cache._cache.setdefault(page.group(), {})[page.ident()] = images
+
+
+def page_hashes(filename):
+    """Return a list with a hash of the contents of every page in the PDF file.
+
+    Returns None if the file could not be read or parsed.
+
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        return Parser(data).page_hashes()
+    except (ValueError, KeyError, IndexError, TypeError, zlib.error, RecursionError):
+        return None
+
+
+class Ref(tuple):
+    """An indirect reference (num, gen) to an object in a PDF file."""
+    __slots__ = ()
+
+
+class Name(bytes):
+    """A PDF name (without the slash)."""
+    __slots__ = ()
+
+
+_token_re = re.compile(rb'''
+    (?P<ws>(?:\s|%[^\r\n]*)+)
+    |(?P<dict><<)|(?P<enddict>>>)
+    |(?P<array>\[)|(?P<endarray>\])
+    |/(?P<name>[^\s/\[\]()<>{}%]*)
+    |(?P<string>\()
+    |<(?P<hex>[0-9A-Fa-f\s]*)>
+    |(?P<ref>\d+)\s+(?P<gen>\d+)\s+R\b
+    |(?P<number>[-+]?(?:\d+\.?\d*|\.\d+))
+    |(?P<keyword>[A-Za-z]+)
+    ''', re.VERBOSE)
+
+_obj_re = re.compile(rb'(\d+)\s+(\d+)\s+obj\b')
+_stream_re = re.compile(rb'\s*stream(?:\r\n|\n|\r)')
+_name_re = re.compile(rb'/([^\s/\[\]()<>{}%]+)')
+
+
+class Parser:
+    """A minimal PDF parser, just enough to find the content of the pages.
+
+    Handles classic files as well as compressed object streams.
+
+    """
+    def __init__(self, data):
+        self.data = data
+        self.objects = {}       # num -> (value, streamstart, streamend)
+        self._digests = {}      # num -> digest, see object_digest()
+        self._read_objects()
+
+    def _read_objects(self):
+        """(internal) Find all objects, including those in object streams."""
+        data = self.data
+        pos = 0
+        while True:
+            m = _obj_re.search(data, pos)
+            if not m:
+                break
+            value, pos = self.parse(data, m.end())
+            start = end = None
+            s = _stream_re.match(data, pos)
+            if s and isinstance(value, dict):
+                start = s.end()
+                length = value.get(b'Length')
+                if isinstance(length, int):
+                    end = start + length
+                else:
+                    end = data.index(b'endstream', start)
+                pos = end
+            self.objects[int(m.group(1))] = (value, start, end)
+        for num, (value, start, end) in list(self.objects.items()):
+            if start is not None and value.get(b'Type') == b'ObjStm':
+                self._read_object_stream(value, self.stream(num))
+
+    def _read_object_stream(self, d, data):
+        """(internal) Read the objects from a decoded object stream."""
+        first = d[b'First']
+        header = data[:first].split()
+        for i in range(0, d[b'N'] * 2, 2):
+            num, offset = int(header[i]), int(header[i + 1])
+            if num not in self.objects:
+                value, pos = self.parse(data, first + offset)
+                self.objects[num] = (value, None, None)
+
+    def parse(self, data, pos):
+        """Parse one object in data at pos, return (value, newpos)."""
+        stack = [[]]
+        while True:
+            m = _token_re.match(data, pos)
+            if not m:
+                raise ValueError("PDF syntax error at {0}".format(pos))
+            pos = m.end()
+            kind = m.lastgroup
+            if kind == 'ws':
+                continue
+            elif kind in ('dict', 'array'):
+                stack.append([])
+                continue
+            elif kind == 'enddict':
+                items = stack.pop()
+                value = dict(zip(items[::2], items[1::2]))
+            elif kind == 'endarray':
+                value = stack.pop()
+            elif kind == 'name':
+                value = Name(m.group('name'))
+            elif kind == 'string':
+                value, pos = self._parse_string(data, pos)
+            elif kind == 'hex':
+                value = bytes.fromhex(re.sub(rb'\s', b'', m.group('hex')).decode())
+            elif kind == 'gen':
+                value = Ref((int(m.group('ref')), int(m.group('gen'))))
+            elif kind == 'number':
+                n = m.group('number')
+                value = float(n) if b'.' in n else int(n)
+            else:
+                keyword = m.group('keyword')
+                value = {b'true': True, b'false': False}.get(keyword)
+            if len(stack) == 1:
+                return value, pos
+            stack[-1].append(value)
+
+    def _parse_string(self, data, pos):
+        """(internal) Return a literal string (without unescaping) and newpos."""
+        depth = 1
+        start = pos
+        while depth:
+            c = data[pos]
+            if c == 0x5c:       # backslash
+                pos += 1
+            elif c == 0x28:     # (
+                depth += 1
+            elif c == 0x29:     # )
+                depth -= 1
+            pos += 1
+        return data[start:pos-1], pos
+
+    def get(self, value):
+        """Resolve value if it is a reference."""
+        while isinstance(value, Ref):
+            value = self.objects[value[0]][0]
+        return value
+
+    def stream(self, num):
+        """Return the decoded stream data of object num."""
+        d, start, end = self.objects[num]
+        data = self.data[start:end]
+        filters = self.get(d.get(b'Filter'))
+        if not isinstance(filters, list):
+            filters = [filters] if filters else []
+        if [self.get(f) for f in filters] == [b'FlateDecode']:
+            # a decompressobj ignores the end of line before endstream
+            data = zlib.decompressobj().decompress(data)
+        # other encodings are hashed as they are
+        return data
+
+    def pages(self):
+        """Yield (page dict, inherited attributes dict) for all pages in order."""
+        for value, start, end in self.objects.values():
+            if isinstance(value, dict) and value.get(b'Type') == b'Catalog':
+                root = value
+                break
+        else:
+            raise ValueError("no document catalog")
+
+        def walk(node, inherited):
+            node = self.get(node)
+            attrs = dict(inherited)
+            for key in (b'MediaBox', b'CropBox', b'Rotate', b'Resources'):
+                if key in node:
+                    attrs[key] = self.get(node[key])
+            if node.get(b'Type') == b'Pages' or b'Kids' in node:
+                for kid in self.get(node[b'Kids']):
+                    yield from walk(kid, attrs)
+            else:
+                yield node, attrs
+        return walk(root[b'Pages'], {})
+
+    def page_hashes(self):
+        """Return a list of hex digests of the contents of every page."""
+        return [self.page_hash(page, attrs) for page, attrs in self.pages()]
+
+    def page_hash(self, page, attrs):
+        """Return a hex digest of the contents of the page."""
+        h = hashlib.sha1()
+        for key in (b'MediaBox', b'CropBox', b'Rotate'):
+            h.update(repr(attrs.get(key)).encode())
+        # resource names are numbered in order of appearance
+        resources = self.get(attrs.get(b'Resources')) or {}
+        categories = {}
+        for key, value in resources.items():
+            value = self.get(value)
+            if isinstance(value, dict):
+                categories[key] = value
+        names = set()
+        for value in categories.values():
+            names.update(value)
+        numbers = {}
+        def rename(m):
+            name = m.group(1)
+            if name in names:
+                return b'/%d' % numbers.setdefault(name, len(numbers))
+            return m.group()
+        contents = page.get(b'Contents')
+        if isinstance(contents, Ref) and isinstance(self.get(contents), list):
+            contents = self.get(contents)
+        if isinstance(contents, Ref):
+            contents = [contents]
+        for ref in contents or ():
+            h.update(_name_re.sub(rename, self.stream(ref[0])))
+        # and the used resources themselves (images, fonts, etc.)
+        for name in numbers:
+            for key in sorted(categories):
+                if name in categories[key]:
+                    h.update(b'/' + key)
+                    self._update(h, categories[key][name])
+        return h.hexdigest()
+
+    def object_digest(self, num):
+        """Return a digest of object num, its stream and the objects it refers to.
+
+        Object numbers themselves are not used, as they change between runs.
+
+        """
+        try:
+            return self._digests[num]
+        except KeyError:
+            pass
+        self._digests[num] = b''    # in case an object refers to itself
+        h = hashlib.sha1()
+        if num in self.objects:
+            value, start, end = self.objects[num]
+            self._update(h, value)
+            if start is not None:
+                h.update(self.data[start:end])
+        digest = self._digests[num] = h.digest()
+        return digest
+
+    def _update(self, h, value):
+        """(internal) Update the hash object h with the value."""
+        if isinstance(value, Ref):
+            h.update(b'R' + self.object_digest(value[0]))
+        elif isinstance(value, dict):
+            h.update(b'<<')
+            for key in sorted(value):
+                h.update(b'/' + key)
+                self._update(h, value[key])
+            h.update(b'>>')
+        elif isinstance(value, list):
+            h.update(b'[')
+            for item in value:
+                self._update(h, item)
+            h.update(b']')
+        else:
+            h.update(repr(value).encode())
@@ -48,6 +48,8 @@ Finally there is an AttributePlugin class, combining the Attributes and Plugin c
 
 import weakref
 
+import startupprofile
+
 _instances = weakref.WeakKeyDictionary()
 
 
@@ -81,7 +83,8 @@ class Plugin:
             instances = _instances.setdefault(cls, weakref.WeakKeyDictionary())
             result = instances[obj] = cls.__new__(cls, obj)
             result._parent = weakref.ref(obj)
-            result.__init__(obj)
+            with startupprofile.measure('plugin', cls.__qualname__):
+                result.__init__(obj)
         return result
 
     @classmethod
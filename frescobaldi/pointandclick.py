@@ -22,8 +22,14 @@ Generic Point and Click handling.
 """
 
 
-import os
+import array
 import collections
+import difflib
+import heapq
+import itertools
+import os
+import re
+import weakref
 
 from PyQt6.QtCore import QUrl
 from PyQt6.QtGui import QTextCursor
@@ -35,11 +41,21 @@ import ly.document
 import lydocument
 
 
+_instances = weakref.WeakSet()  # all Links objects
+
+
+def isbound(doc):
+    """Return True if point and click links are bound to the document."""
+    return any(doc in links._filenames for links in _instances)
+
+
 class Links:
     """Stores point and click links grouped by filename."""
     def __init__(self):
         self._links = collections.defaultdict(lambda: collections.defaultdict(list))
         self._docs = {}
+        self._filenames = {}    # document -> list of filenames bound to it
+        _instances.add(self)
 
     def add_link(self, filename, line, column, destination):
         """Add a link.
@@ -61,11 +77,9 @@ class Links:
         On exit, finish() is automatically called.
 
         """
-        for filename in self._links:
-            d = scratchdir.findDocument(filename)
-            if d:
-                self.bind(filename, d)
+        self.update(self._links)
         app.documentLoaded.connect(self.slotDocumentLoaded)
+        app.documentUnloading.connect(self.slotDocumentUnloading)
         app.documentClosed.connect(self.slotDocumentClosed)
 
     def __enter__(self):
@@ -78,12 +92,43 @@ class Links:
         """Binds the given filename to the given document.
 
         When the document disappears, the binding is removed automatically.
-        While a document is bound, textedit links are stored as QTextCursors,
+        While a document is bound, the positions of the links follow the edits,
         so they keep their position even if the user changes the document.
 
         """
+        # load a deferred document first, that emits documentLoaded, which
+        # calls bind() again
+        doc.ensureLoaded()
         if filename not in self._docs:
             self._docs[filename] = BoundLinks(doc, self._links[filename])
+            self._filenames.setdefault(doc, []).append(filename)
+
+    def unbind(self, filename):
+        """Removes the binding of the filename, if any."""
+        bound = self._docs.pop(filename, None)
+        if bound:
+            filenames = self._filenames[bound.document]
+            filenames.remove(filename)
+            if not filenames:
+                del self._filenames[bound.document]
+
+    def update(self, filenames):
+        """Binds the given filenames to the documents that are loaded.
+
+        Call this after adding links to filenames that may already be bound,
+        e.g. when the links are added incrementally after finish(). The new
+        links are added to existing bindings, the links that were already
+        bound keep following the edits.
+
+        """
+        for filename in filenames:
+            bound = self._docs.get(filename)
+            if bound:
+                bound.add(self._links[filename])
+            else:
+                d = scratchdir.findDocument(filename)
+                if d:
+                    self.bind(filename, d)
 
     def slotDocumentLoaded(self, doc):
         """Called when a new document is loaded, it maybe possible to bind to it."""
@@ -91,14 +136,18 @@ class Links:
         if filename in self._links:
             self.bind(filename, doc)
 
+    def slotDocumentUnloading(self, doc):
+        """Called when a document is unloaded, removes the bound links.
+
+        They are bound again when the document is loaded.
+
+        """
+        self.slotDocumentClosed(doc)
+
     def slotDocumentClosed(self, doc):
         """Called when a document is closed, removes the bound links."""
-        for filename, b in self._docs.items():
-            if b.document == doc:
-                break
-        else:
-            return
-        del self._docs[filename]
+        for filename in self._filenames.pop(doc, ()):
+            del self._docs[filename]
 
     def cursor(self, filename, line, column, load=False):
         """Returns the destination of a link as a QTextCursor of the destination document.
@@ -119,36 +168,134 @@ class Links:
 
     def boundLinks(self, doc):
         """Returns the Bound links object for the given text document."""
-        for b in self._docs.values():
-            if b.document == doc:
-                return b
+        filenames = self._filenames.get(doc)
+        if filenames:
+            return self._docs[filenames[0]]
 
 
 class BoundLinks:
-    """Stores links as QTextCursors for a document."""
+    """Stores the positions of links in a document.
+
+    The positions are kept in a Positions array that follows the changes
+    in the document, so they keep pointing to the same place in the text
+    even if the user changes the document. This is much cheaper than using
+    a QTextCursor for every link, which Qt would need to update on every
+    keystroke.
+
+    QTextDocument merges all changes made in one edit block (e.g. by
+    re-indenting or transposing) into one contentsChange signal. To keep the
+    links inside such a change in place, a copy of the text of every line is
+    kept, and the old and new text of the changed lines are compared.
+
+    """
     def __init__(self, doc, links):
-        """Creates QTextCursor instances for every link, keeps a reference to the document."""
+        """Computes the position for every link, keeps a reference to the document."""
         self.document = doc
-        # make a sorted list of cursors with their [destination, ...] destinations list
-        self._cursor_dict = d = {}              # mapping from (line, col) to QTextCursor
-        self._cursors = cursors = []            # sorted list of the cursors
+        # make a sorted list of positions with their [destination, ...] destinations list
+        self._index = d = {}                    # mapping from (line, col) to index
+        positions = []                          # sorted list of the positions
         self._destinations = destinations = []  # corresponding list of destinations
         for pos, dest in sorted(links.items()):
             line, column = pos
             b = doc.findBlockByNumber(line - 1)
             if b.isValid():
-                c = d[pos] = QTextCursor(doc)
-                c.setPosition(b.position() + column)
-                cursors.append(c)
+                d[pos] = len(positions)
+                positions.append(b.position() + column)
                 destinations.append(dest)
+        self._positions = Positions(positions)
+        # the line starts follow the edits too, for links added later
+        starts = []
+        self._texts = texts = []    # the text of every line
+        b = doc.firstBlock()
+        while b.isValid():
+            starts.append(b.position())
+            texts.append(_utf16(b.text()))
+            b = b.next()
+        self._lines = Positions(starts)
+        doc.contentsChange.connect(self._slotContentsChange)
+
+    def add(self, links):
+        """Add the links that are not yet known.
+
+        links is a dictionary like the one given on construction, it may
+        contain the links that were already added. The line numbers refer to
+        the document as it was when it was bound, edits made since then are
+        taken into account.
+
+        """
+        lines = self._lines
+        new = []
+        for pos, dest in sorted(links.items()):
+            if pos not in self._index:
+                line, column = pos
+                if 0 < line <= len(lines):
+                    new.append((lines[line - 1] + column, pos, dest))
+        if not new:
+            return
+        keys = [None] * len(self._destinations)
+        for pos, index in self._index.items():
+            keys[index] = pos
+        old = zip(self._positions, keys, self._destinations)
+        merged = list(heapq.merge(old, new, key=lambda item: item[0]))
+        self._index = {pos: index for index, (_, pos, _) in enumerate(merged)}
+        self._positions = Positions(position for position, _, _ in merged)
+        self._destinations[:] = [dest for _, _, dest in merged]
+
+    def _slotContentsChange(self, position, removed, added):
+        """(internal) Update the positions and the copy of the changed lines."""
+        doc = self.document
+        texts = self._texts
+        first = doc.findBlock(position)
+        last = doc.findBlock(min(position + added, doc.characterCount() - 1))
+        start = first.blockNumber()
+        end = last.blockNumber() + 1
+        # the lines after the change are the same
+        old_end = end - doc.blockCount() + len(texts)
+        new = []
+        b = first
+        for i in range(end - start):
+            new.append(_utf16(b.text()))
+            b = b.next()
+        remap = None
+        if not start < old_end <= len(texts):
+            # should not happen, read all lines again
+            start, old_end = 0, len(texts)
+            new = []
+            b = doc.firstBlock()
+            while b.isValid():
+                new.append(_utf16(b.text()))
+                b = b.next()
+        elif removed and added:
+            # compare whole lines, the unchanged parts are the same in both
+            old = '\u2029'.join(texts[start:old_end]) + '\u2029'
+            changed = '\u2029'.join(new) + '\u2029'
+            offset = position - first.position()
+            def remap(offsets):
+                offsets = remap_offsets(old, changed, [o + offset for o in offsets])
+                return [min(max(0, o - offset), added) for o in offsets]
+        self._positions.change(position, removed, added, remap)
+        self._lines.change(position, removed, added, remap)
+        texts[start:old_end] = new
+
+    def _cursor(self, index):
+        """(internal) Return a new QTextCursor at the position of the link."""
+        c = QTextCursor(self.document)
+        c.setPosition(min(self._positions[index], self.document.characterCount() - 1))
+        return c
 
     def cursor(self, line, column):
-        """Returns the QTextCursor for the give line/col."""
-        return self._cursor_dict.get((line, column))
+        """Returns a QTextCursor for the give line/col."""
+        index = self._index.get((line, column))
+        if index is not None:
+            return self._cursor(index)
 
     def cursors(self):
-        """Return the list of cursors, sorted on cursor position."""
-        return self._cursors
+        """Return a list of cursors, sorted on cursor position."""
+        return [self._cursor(i) for i in range(len(self._positions))]
+
+    def positions(self):
+        """Return the Positions array with the current positions of the links."""
+        return self._positions
 
     def destinations(self):
         """Return the list of destination lists.
@@ -175,24 +322,14 @@ class BoundLinks:
         points to the _ending_ point of a slur, beam or phrasing slur.
 
         """
-        cursors = self._cursors
-
-        def findlink(pos):
-            # binary search in list of cursors
-            lo, hi = 0, len(cursors)
-            while lo < hi:
-                mid = (lo + hi) // 2
-                if pos < cursors[mid].position():
-                    hi = mid
-                else:
-                    lo = mid + 1
-            return lo - 1
+        positions = self._positions
+        findlink = lambda pos: positions.bisect_right(pos) - 1
 
         if cursor.hasSelection():
             end = findlink(cursor.selectionEnd() - 1)
             if end >= 0:
                 start = findlink(cursor.selectionStart())
-                if start < 0 or cursors[start].position() < cursor.selectionStart():
+                if start < 0 or positions[start] < cursor.selectionStart():
                     start += 1
                 if start <= end:
                     return slice(start, end+1)
@@ -202,12 +339,13 @@ class BoundLinks:
         if index < 0:
             return # before all other links
 
-        cur2 = cursors[index]
-        if cur2.position() < cursor.position():
+        pos2 = positions[index]
+        if pos2 < cursor.position():
+            block2 = self.document.findBlock(pos2)
             # is the cursor at an ending token like a slur end?
             prevcol = -1
-            if cur2.block() == cursor.block():
-                prevcol = cur2.position() - cur2.block().position()
+            if block2 == cursor.block():
+                prevcol = pos2 - block2.position()
             col = cursor.position() - cursor.block().position()
             found = False
             tokens = ly.document.Runner(lydocument.Document(cursor.document()))
@@ -232,14 +370,211 @@ class BoundLinks:
                         break
             if found:
                 index = findlink(tokens.block.position() + token.pos)
-                if index < 0 or cursors[index].block() != tokens.block:
+                if index < 0 or self.document.findBlock(positions[index]) != tokens.block:
                     return
-            elif cur2.block() != cursor.block():
+            elif block2 != cursor.block():
                 return False
         # highlight it!
         return slice(index, index+1)
 
 
+class Positions:
+    """A sorted array of positions in a text document.
+
+    Call change() with the arguments of the QTextDocument.contentsChange
+    signal to update the positions the same way Qt updates QTextCursors:
+    positions after the change are shifted, positions in removed text move
+    to the end of the inserted text, unless a remap function is given that
+    knows better.
+
+    The shifts are stored in a Fenwick tree, so a change costs O(log n)
+    instead of updating every position.
+
+    """
+    # when more positions than this fraction are moved at once, rebuild
+    _rebuild = 0.1
+
+    def __init__(self, positions=()):
+        self._reset(positions)
+
+    def _reset(self, positions):
+        """(internal) Store the positions and clear the tree."""
+        self._base = array.array('q', positions)
+        self._tree = array.array('q', bytes(8 * (len(self._base) + 1)))
+
+    def __len__(self):
+        return len(self._base)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._base)
+        if not 0 <= index < len(self._base):
+            raise IndexError("Positions index out of range")
+        # add the prefix sum of the shifts
+        pos = self._base[index]
+        tree = self._tree
+        i = index + 1
+        while i:
+            pos += tree[i]
+            i &= i - 1
+        return pos
+
+    def __iter__(self):
+        # recover the shift per index from the tree in O(n)
+        shifts = array.array('q', self._tree)
+        n = len(shifts) - 1
+        for i in range(n, 0, -1):
+            j = i + (i & -i)
+            if j <= n:
+                shifts[j] -= shifts[i]
+        shift = 0
+        for pos, delta in zip(self._base, shifts[1:]):
+            shift += delta
+            yield pos + shift
+
+    def _add(self, index, delta):
+        """(internal) Add delta to all positions from index."""
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def bisect_left(self, pos):
+        """Return the index of the first position >= pos."""
+        lo, hi = 0, len(self._base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] < pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, pos):
+        """Return the index of the first position > pos."""
+        lo, hi = 0, len(self._base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if pos < self[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def change(self, position, removed, added, remap=None):
+        """Update the positions for a change in the document.
+
+        The first three arguments are the same as those of
+        QTextDocument.contentsChange. If given, remap is called with the
+        sorted list of offsets (relative to position) of the positions in
+        the removed text, and must return their new offsets in the inserted
+        text, in the same order. By default they all move to the end of the
+        inserted text.
+
+        """
+        start = self.bisect_left(position)
+        end = self.bisect_left(position + removed)
+        if start < end and remap:
+            moved = [position + offset for offset in
+                        remap([self[i] - position for i in range(start, end)])]
+        else:
+            moved = [position + added] * (end - start)
+        if end - start > len(self._base) * self._rebuild:
+            positions = list(self)
+            delta = added - removed
+            positions[start:end] = moved
+            positions[end:] = [p + delta for p in positions[end:]]
+            self._reset(positions)
+            return
+        for i, pos in enumerate(moved, start):
+            delta = pos - self[i]
+            self._add(i, delta)
+            self._add(i + 1, -delta)
+        self._add(end, added - removed)
+
+
+_non_bmp = re.compile('[\U00010000-\U0010ffff]')
+_tokens = re.compile(r'\w+|\s+|[^\w\s]').findall
+
+
+def _utf16(text):
+    """(internal) Double characters outside the BMP, so text is indexed like Qt does."""
+    return _non_bmp.sub(lambda m: m.group() * 2, text)
+
+
+def _opcodes(old, new):
+    """Yield difflib opcodes describing how old text changed into new text.
+
+    The texts are compared line by line first; replaced lines that are not
+    too long are compared word by word (pairwise if they were replaced by
+    the same number of lines), and replaced words keep their common
+    beginning and end.
+
+    """
+    oldlines = old.splitlines(True)
+    newlines = new.splitlines(True)
+    i = j = 0
+    matcher = difflib.SequenceMatcher(None, oldlines, newlines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'replace' and i2 - i1 == j2 - j1:
+            pairs = zip(oldlines[i1:i2], newlines[j1:j2])
+        else:
+            pairs = [(''.join(oldlines[i1:i2]), ''.join(newlines[j1:j2]))]
+        for a, b in pairs:
+            if tag == 'replace' and len(a) + len(b) <= 4096:
+                atokens = _tokens(a)
+                btokens = _tokens(b)
+                apos = list(itertools.accumulate(map(len, atokens), initial=i))
+                bpos = list(itertools.accumulate(map(len, btokens), initial=j))
+                if len(atokens) == len(btokens):
+                    # e.g. transposed: assume the words correspond one to one
+                    ops = [('equal' if x == y else 'replace', k, k + 1, k, k + 1)
+                           for k, (x, y) in enumerate(zip(atokens, btokens))]
+                else:
+                    ops = difflib.SequenceMatcher(None, atokens, btokens,
+                                                  autojunk=False).get_opcodes()
+                for op, ti1, ti2, tj1, tj2 in ops:
+                    ci1, ci2, cj1, cj2 = apos[ti1], apos[ti2], bpos[tj1], bpos[tj2]
+                    if op != 'replace':
+                        yield op, ci1, ci2, cj1, cj2
+                        continue
+                    # keep the common beginning and end of replaced words
+                    x, y = a[ci1-i:ci2-i], b[cj1-j:cj2-j]
+                    n = len(os.path.commonprefix((x, y)))
+                    m = len(os.path.commonprefix((x[n:][::-1], y[n:][::-1])))
+                    yield 'equal', ci1, ci1 + n, cj1, cj1 + n
+                    yield 'replace', ci1 + n, ci2 - m, cj1 + n, cj2 - m
+                    yield 'equal', ci2 - m, ci2, cj2 - m, cj2
+            else:
+                yield tag, i, i + len(a), j, j + len(b)
+            i += len(a)
+            j += len(b)
+
+
+def remap_offsets(old, new, offsets):
+    """Return the offsets in old text mapped to the new text.
+
+    The offsets must be sorted. An offset in unchanged text keeps pointing
+    to the same character, an offset in changed text moves to the end of
+    the text that replaced it, like a QTextCursor would.
+
+    """
+    if old == new:
+        return offsets
+    result = []
+    ops = _opcodes(old, new)
+    i2 = 0
+    try:
+        for offset in offsets:
+            while offset >= i2:
+                tag, i1, i2, j1, j2 = next(ops)
+            result.append(j1 + offset - i1 if tag == 'equal' else j2)
+    except StopIteration:
+        result.extend([len(new)] * (len(offsets) - len(result)))
+    return result
+
+
 def positions(cursor):
     """Return a list of QTextCursors describing the grob the cursor points at.
 
@@ -186,6 +186,8 @@ class Output:
         if not info.isoutput:
             raise MidiException("not an output device")
 
+        self._device_id = device_id
+        self._latency = latency
         self._output = pypm.Output(device_id, latency)
 
     def close(self):
@@ -194,6 +196,20 @@ class Output:
             self._output.Close()
         self._output = None
 
+    def abort(self):
+        """Discards the output that was written but not yet sent.
+
+        PortMIDI can't use the stream after aborting it, so the stream is
+        closed and opened again.
+
+        """
+        abort = getattr(self._output, 'Abort', None)
+        if abort:
+            abort()
+        self._output.Close()
+        self._output = None
+        self._output = pypm.Output(self._device_id, self._latency)
+
     def write(self, data):
         """Writes a list of MIDI data to the output.
 
@@ -195,12 +195,7 @@ class Installed(preferences.Group):
         extensions = app.extensions()
         for ext in extensions.installed_extensions():
             ext_infos = extensions.infos(ext)
-            display_name = ext_infos.get(ext, ext) if ext_infos else ext.name()
-            loaded_extension = extensions.get(ext)
-            if loaded_extension:
-                display_name += f' ({loaded_extension.load_time()})'
-
-            name_item = QStandardItem(display_name)
+            name_item = QStandardItem(self.item_text(ext))
             name_item.extension_name = ext
             name_item.setCheckable(True)
             self.name_items[ext] = name_item
@@ -247,6 +242,19 @@ class Installed(preferences.Group):
                                 api_version))
                 name_item.appendRow([label_item, details_item])
 
+    def item_text(self, ext):
+        """Return the text for the extension's item, with the time
+        it took to load the extension."""
+        extensions = app.extensions()
+        ext_infos = extensions.infos(ext)
+        display_name = ext_infos.get(ext, ext) if ext_infos else ext.name()
+        loaded_extension = extensions.get(ext)
+        if loaded_extension:
+            display_name += f' ({loaded_extension.load_time()})'
+        elif extensions.is_declared(ext):
+            display_name += ' ({})'.format(_("loaded on first use"))
+        return display_name
+
     def selected_extension(self):
         """Return the (directory) name of the extension that
         is currently selected."""
@@ -273,6 +281,17 @@ class Installed(preferences.Group):
         config.hide_extension()
         self._selected_extension = name
         config.show_extension(name)
+        if name:
+            # the extension may have been loaded to show its config widget,
+            # update the load time without marking the page as changed
+            item = self.name_items[name]
+            text = self.item_text(name)
+            if item.text() != text:
+                model = self.tree.model()
+                model.blockSignals(True)
+                item.setText(text)
+                model.blockSignals(False)
+                self.tree.viewport().update()
 
 
 class Failed(preferences.Group):
@@ -359,7 +378,8 @@ class Config(preferences.Group):
         or None otherwise."""
         widget = self._widgets.get(extension, False)
         if not widget:
-            ext = app.extensions().get(extension)
+            # this loads extensions that are loaded on first use
+            ext = app.extensions().load(extension)
             # skip non-loaded extensions
             if ext:
                 widget = ext.config_widget(self)
@@ -32,6 +32,7 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLineEdit,
     QRadioButton,
+    QSpinBox,
     QStyleFactory,
     QTabWidget,
     QVBoxLayout,
@@ -263,6 +264,16 @@ class SessionsAndFiles(preferences.Group):
         session_layout.addWidget(self.session_lastused, 1, 0, 1, 2)
         session_layout.addWidget(self.session_custom, 2, 0, 1, 1)
         session_layout.addWidget(self.session_combo, 2, 1, 1, 1)
+
+        self.session_lazy = QCheckBox(toggled=changed)
+        self.session_unload_label = QLabel()
+        self.session_unload = QSpinBox(valueChanged=changed)
+        self.session_unload.setRange(0, 1440)
+        self.session_unload_label.setBuddy(self.session_unload)
+
+        session_layout.addWidget(self.session_lazy, 3, 0, 1, 2)
+        session_layout.addWidget(self.session_unload_label, 4, 0, 1, 1)
+        session_layout.addWidget(self.session_unload, 4, 1, 1, 1)
         session_layout_wrap.addStretch()
 
         self.loadNewCombo()
@@ -317,6 +328,16 @@ class SessionsAndFiles(preferences.Group):
         self.session_none.setText(_("Start with no session"))
         self.session_lastused.setText(_("Start with last used session"))
         self.session_custom.setText(_("Start with session:"))
+        self.session_lazy.setText(_("Load documents when they are first needed"))
+        self.session_lazy.setToolTip(_(
+            "If checked, the documents of a session are only read from disk\n"
+            "when they are displayed or otherwise needed."))
+        self.session_unload_label.setText(_("Unload unused documents after:"))
+        self.session_unload.setSpecialValueText(_("Never"))
+        self.session_unload.setSuffix(" " + _("min"))
+        self.session_unload.setToolTip(_(
+            "Unmodified documents that are not displayed and have not been\n"
+            "used for this time are unloaded to save memory."))
 
     def loadNewCombo(self):
         from snippet import snippets
@@ -368,6 +389,8 @@ class SessionsAndFiles(preferences.Group):
         custom = s.value("custom", "", str)
         if custom in sessionNames:
             self.session_combo.setCurrentIndex(sessionNames.index(custom))
+        self.session_lazy.setChecked(s.value("lazy_loading", True, bool))
+        self.session_unload.setValue(s.value("unload_minutes", 30, int))
         s.endGroup()
         self.tabs.setCurrentIndex(
             s.value("prefs_general_file_tab_index", 0, int)
@@ -405,6 +428,8 @@ class SessionsAndFiles(preferences.Group):
         else:
             startup = "none"
         s.setValue("startup", startup)
+        s.setValue("lazy_loading", self.session_lazy.isChecked())
+        s.setValue("unload_minutes", self.session_unload.value())
 
     def saveTabIndex(self):
         s = app.settings("")
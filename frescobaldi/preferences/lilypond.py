@@ -84,6 +84,7 @@ class Versions(preferences.Group):
         self.instances = InfoList(self)
         self.instances.changed.connect(self.changed)
         self.instances.defaultButton.clicked.connect(self.defaultButtonClicked)
+        self.instances.rescanButton.clicked.connect(self.rescanButtonClicked)
         layout.addWidget(self.instances)
         self.autoVersion = QCheckBox(clicked=self.changed)
         layout.addWidget(self.autoVersion)
@@ -102,6 +103,14 @@ class Versions(preferences.Group):
             item.display()
         self.changed.emit()
 
+    def rescanButtonClicked(self):
+        """Run all LilyPond versions again to determine their properties."""
+        items = [item for item in self.instances.items()
+                 if isinstance(item.state, InstalledState)]
+        lilypondinfo.rescan([item.state.info for item in items])
+        for item in items:
+            item.display()
+
     def translateUI(self):
         self.setTitle(_("LilyPond versions to use"))
         self.autoVersion.setText(_("Automatically choose LilyPond version from document"))
@@ -165,10 +174,11 @@ class Versions(preferences.Group):
 
 class InfoList(widgets.listedit.ListEdit):
     def __init__(self, group):
-        # Compared to a basic ListEdit, this widget also has a "Set as Default"
-        # button. This must be initialized before the base class __init__, because
-        # it calls updateSelection().
+        # Compared to a basic ListEdit, this widget also has "Set as Default"
+        # and "Re-scan" buttons. These must be initialized before the base class
+        # __init__, because it calls updateSelection().
         self.defaultButton = QPushButton()
+        self.rescanButton = QPushButton()
 
         super().__init__(group)
 
@@ -177,11 +187,16 @@ class InfoList(widgets.listedit.ListEdit):
         self.addButton.setMenu(self.addMenu)
 
         self.layout().addWidget(self.defaultButton, 3, 1)
+        self.layout().addWidget(self.rescanButton, 4, 1)
         self.layout().addWidget(self.listBox, 0, 0, 5, 1)
 
     def translateUI(self):
         super().translateUI()
         self.defaultButton.setText(_("Set as &Default"))
+        self.rescanButton.setText(_("Re-&scan"))
+        self.rescanButton.setToolTip(_(
+            "Run all LilyPond versions again to determine their version "
+            "and data directory."))
 
     def updateSelection(self):
         """Overridden to grey out the "Edit" and "Set as Default" buttons in more cases."""
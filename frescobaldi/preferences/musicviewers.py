@@ -51,6 +51,7 @@ class MusicViewers(preferences.ScrolledGroupsPage):
         layout.addWidget(PageLayout(self))
         layout.addWidget(Scrolling(self))
         layout.addWidget(ViewerOptions(self))
+        layout.addWidget(Rendering(self))
         layout.addWidget(Magnifier(self))
         layout.addWidget(Printing(self))
         layout.addStretch(1)
@@ -337,6 +338,62 @@ class ViewerOptions(preferences.Group):
         s.setValue("shadow", self.showShadow.isChecked())
 
 
+class Rendering(preferences.Group):
+    def __init__(self, page):
+        super().__init__(page)
+
+        layout = QGridLayout()
+        self.setLayout(layout)
+
+        self.prerender = QCheckBox(toggled=self.changed)
+        layout.addWidget(self.prerender, 0, 0, 1, 2)
+
+        self.cacheSizeLabel = QLabel()
+        self.cacheSize = QSpinBox(valueChanged=self.changed)
+        self.cacheSize.setRange(50, 4000)
+        self.cacheSize.setSingleStep(50)
+        self.cacheSizeLabel.setBuddy(self.cacheSize)
+        layout.addWidget(self.cacheSizeLabel, 1, 0)
+        layout.addWidget(self.cacheSize, 1, 1)
+
+        self.statistics = QCheckBox(toggled=self.changed)
+        layout.addWidget(self.statistics, 2, 0, 1, 2)
+
+        app.translateUI(self)
+
+    def translateUI(self):
+        self.setTitle(_("Rendering"))
+        self.prerender.setText(_("Render neighbouring pages in advance"))
+        self.prerender.setToolTip(_(
+            "If checked, pages near the visible pages and pages that are\n"
+            "highlighted from the text are rendered in the background, so\n"
+            "they show up immediately when you go there."))
+        self.cacheSizeLabel.setText(_("Memory for rendered pages:"))
+        self.cacheSizeLabel.setToolTip(_(
+            "The maximum amount of memory used to keep rendered pages.\n"
+            "The least recently used pages are removed first."))
+        # L10N: as in "200 MB", appended after number in spinbox, note the leading space
+        self.cacheSize.setSuffix(_(" MB"))
+        self.statistics.setText(_("Show rendering statistics"))
+        self.statistics.setToolTip(_(
+            "If checked, the cache hits, misses and render times are\n"
+            "displayed on every page (for debugging)."))
+
+    def loadSettings(self):
+        s = QSettings()
+        s.beginGroup("musicview")
+        self.prerender.setChecked(s.value("prerender", True, bool))
+        self.cacheSize.setValue(s.value("render_cache_size", 200, int))
+        self.statistics.setChecked(s.value("render_statistics", False, bool))
+
+    def saveSettings(self):
+        s = QSettings()
+        s.beginGroup("musicview")
+        s.setValue("prerender", self.prerender.isChecked())
+        s.setValue("render_cache_size", self.cacheSize.value())
+        s.setValue("render_statistics", self.statistics.isChecked())
+
+
 class Magnifier(preferences.Group):
     def __init__(self, page):
         super().__init__(page)
@@ -50,6 +50,7 @@ class Tools(preferences.ScrolledGroupsPage):
         layout.addWidget(CharMap(self))
         layout.addWidget(DocumentList(self))
         layout.addWidget(Outline(self))
+        layout.addWidget(SvgView(self))
         layout.addStretch(1)
 
 
@@ -276,3 +277,32 @@ def is_regex(text):
     except re.error:
         return False
     return True
+
+
+class SvgView(preferences.Group):
+    def __init__(self, page):
+        super().__init__(page)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.nativeCheck = QCheckBox(toggled=self.changed)
+        layout.addWidget(self.nativeCheck)
+        app.translateUI(self)
+
+    def translateUI(self):
+        self.setTitle(_("SVG View"))
+        self.nativeCheck.setText(_("Render SVG files without web engine"))
+        self.nativeCheck.setToolTip(_(
+            "If checked, the SVG View displays SVG files itself, which uses "
+            "much less memory and starts faster. Editing the SVG files is "
+            "not possible then."))
+
+    def loadSettings(self):
+        s = QSettings()
+        s.beginGroup("svgview")
+        self.nativeCheck.setChecked(s.value("native_renderer", False, bool))
+
+    def saveSettings(self):
+        s = QSettings()
+        s.beginGroup("svgview")
+        s.setValue("native_renderer", self.nativeCheck.isChecked())
@@ -0,0 +1,235 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Renders pages of a View in the background, ahead of need.
+
+When the View is idle (the visible pages have all their tiles), the
+PreRenderer renders the pages that are explicitly requested (e.g. the pages targeted
+by point-and-click synchronisation) and the neighbours of the visible pages,
+one page at a time, on qpageview's pool of render threads.
+
+The render cache is limited to the configured memory budget; the least
+recently used tiles are evicted first. Pre-rendering stops before the cache
+would need to evict tiles, so it never pushes visible pages out.
+
+The Statistics class keeps the cache hits, misses and render times for
+every page; the View can display them on top of the pages.
+
+"""
+
+
+import time
+import weakref
+
+from PyQt6.QtCore import QRect, QTimer
+
+import qpageview.cache
+import qpageview.render
+
+
+def setCacheSize(megabytes):
+    """Set the memory budget of the render cache, evicting tiles if needed."""
+    size = megabytes * 1024 * 1024
+    qpageview.cache.ImageCache.maxsize = size
+    cache = qpageview.render.AbstractRenderer.cache
+    cache.maxsize = size
+    cache.purge()
+
+
+class PreRenderer:
+    """Renders pages near the visible pages of a View in the background."""
+
+    # the number of pages before and after the visible pages to render
+    neighbours = 2
+
+    # the part of the cache budget pre-rendering may fill
+    budget = 0.8
+
+    def __init__(self, view):
+        self._view = weakref.ref(view)
+        self._targets = []
+        self._current = None
+        self._pending = 0       # the tiles of the current page being rendered
+        self.enabled = True
+        self._timer = QTimer(view, singleShot=True, timeout=self.start)
+        self._timer.setInterval(300)
+
+    def schedule(self):
+        """Restart the timer; pre-rendering starts when the View is idle."""
+        if self.enabled:
+            self._timer.start()
+
+    def addPages(self, pages):
+        """Render the given pages first, e.g. the targets of point-and-click."""
+        self._targets[:0] = [p for p in pages if p not in self._targets]
+        self.schedule()
+
+    def clear(self):
+        """Forget all requested pages."""
+        self._targets.clear()
+        self._current = None
+        self._pending = 0
+
+    def pages(self):
+        """Yield the pages to render, in order of priority."""
+        view = self._view()
+        if not view:
+            return
+        layout = view.pageLayout()
+        visible = list(view.visiblePages())
+        for page in self._targets:
+            if page in layout and page not in visible:
+                yield page
+        if visible:
+            numbers = [layout.index(p) for p in visible]
+            first, last = min(numbers), max(numbers)
+            for i in range(1, self.neighbours + 1):
+                for num in (last + i, first - i):
+                    if 0 <= num < layout.count():
+                        yield layout[num]
+
+    def start(self):
+        """Render the first page that is not yet in the cache."""
+        view = self._view()
+        if not view or not self.enabled or self._pending:
+            return
+        if self.rendering(view):
+            # don't delay the rendering of visible pages
+            self._timer.start()
+            return
+        page, self._current = self._current, None
+        if page:
+            # the previous page is ready (or its rendering was cancelled)
+            Statistics.instance(view).rendered(page)
+            if page in self._targets:
+                self._targets.remove(page)
+        viewport = view.viewport()
+        for page in self.pages():
+            renderer = page.renderer
+            if not renderer:
+                continue
+            info = renderer.info(page, viewport, QRect(0, 0, page.width, page.height))
+            if not info.missing:
+                continue
+            cache = renderer.cache
+            size = sum(t.w * t.h for t in info.missing) * 4
+            if cache.currentsize + size > cache.maxsize * self.budget:
+                break
+            self._current = page
+            stats = Statistics.instance(view)
+            stats.scheduled(page)
+            stats.prerendered(page)
+            self._pending = len(info.missing)
+            renderer.schedule(page, info.key, info.missing, self._slotRendered)
+            return
+        self._targets.clear()
+
+    def rendering(self, view):
+        """Return True if visible pages of the view still miss tiles.
+
+        The View has scheduled rendering jobs for them.
+
+        """
+        viewport = view.viewport()
+        rect = view.visibleRect()
+        for page in view.visiblePages():
+            if page.renderer:
+                r = (page.geometry() & rect).translated(-page.pos())
+                if page.renderer.info(page, viewport, r).missing:
+                    return True
+        return False
+
+    def _slotRendered(self, page):
+        """Called when a tile of the page being pre-rendered is ready."""
+        if page is self._current and self._pending:
+            self._pending -= 1
+            if not self._pending:
+                # continue as soon as all the tiles are rendered
+                self._timer.start(0)
+
+
+class PageStatistics:
+    """The cache statistics of one page."""
+    __slots__ = ('hits', 'misses', 'renders', 'time', 'prerendered', '_start')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.time = 0.0         # total render time in seconds
+        self.prerendered = False
+        self._start = None
+
+    def averageTime(self):
+        """Return the average render time in milliseconds."""
+        return self.time / self.renders * 1000 if self.renders else 0.0
+
+
+class Statistics:
+    """Collects cache hits, misses and render times for the pages of a View."""
+    _instances = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def instance(cls, view):
+        """Return the Statistics for the view, creating it if needed."""
+        try:
+            return cls._instances[view]
+        except KeyError:
+            s = cls._instances[view] = cls()
+            return s
+
+    def __init__(self):
+        self._pages = weakref.WeakKeyDictionary()
+
+    def get(self, page):
+        """Return the PageStatistics for the page."""
+        try:
+            return self._pages[page]
+        except KeyError:
+            s = self._pages[page] = PageStatistics()
+            return s
+
+    def painted(self, page, info):
+        """Record the outcome of renderer.info() when painting the page."""
+        s = self.get(page)
+        s.hits += len(info.images)
+        s.misses += len(info.missing)
+        if info.missing:
+            self.scheduled(page)
+        elif s._start is not None:
+            self.rendered(page)
+
+    def scheduled(self, page):
+        """Record that rendering of the page starts."""
+        s = self.get(page)
+        if s._start is None:
+            s._start = time.perf_counter()
+
+    def prerendered(self, page):
+        """Record that the page is being pre-rendered."""
+        self.get(page).prerendered = True
+
+    def rendered(self, page):
+        """Record that all needed tiles of the page were rendered."""
+        s = self.get(page)
+        if s._start is not None:
+            s.time += time.perf_counter() - s._start
+            s.renders += 1
+            s._start = None
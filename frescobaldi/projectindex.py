@@ -0,0 +1,430 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+A persistent index of the LilyPond files in the configured include path.
+
+The index contains, for every file, the set of trigrams (three-character
+substrings) occurring in the text, the identifiers it defines and the user
+commands it uses. It is stored in the cache directory and updated
+incrementally (by mtime and size) by a job running on the 'crawl' queue.
+
+Use definitions(name) and usages(name) to find where an identifier is
+defined or used, and search(text) to find text in all indexed files.
+
+"""
+
+
+import collections
+import os
+import pathlib
+import threading
+import time
+
+from PyQt6.QtCore import QThread, QTimer
+
+import app
+import diskcache
+import job
+import util
+import ly.lex
+import ly.lex.lilypond
+
+
+# change this when the format of the stored data changes
+_VERSION = 1
+_CACHE_NAME = "projectindex"
+
+# the extensions of the files we index
+extensions = ('.ly', '.ily', '.lyi')
+
+_index = None   # the global Index instance
+_job = None     # the running IndexJob, if any
+
+
+def index():
+    """Return the global Index, loading it from disk if needed.
+
+    The first time this is called, a (background) update is scheduled.
+
+    """
+    global _index
+    if _index is None:
+        _index = diskcache.load(_CACHE_NAME, _VERSION)
+        if _index is None:
+            _index = Index()
+        app.settingsChanged.connect(update)
+        app.sessionChanged.connect(update)
+        app.documentSaved.connect(_slotDocumentSaved)
+        app.aboutToQuit.connect(save)
+        QTimer.singleShot(0, update)
+    return _index
+
+
+def roots():
+    """Return the list of directories that are indexed.
+
+    These are the directories of the include path, as configured in the
+    LilyPond preferences and the current session.
+
+    """
+    import documentinfo
+    return [os.path.realpath(d) for d in documentinfo.includepath()
+            if os.path.isdir(d)]
+
+
+def update():
+    """Schedule an incremental update of the index on the 'crawl' queue."""
+    global _job
+    if _job is None:
+        _job = IndexJob(index(), roots())
+        _job.done.connect(_slotJobDone)
+        app.job_queue().add_job(_job, 'crawl')
+
+
+def save():
+    """Store the index in the cache directory (if it was changed)."""
+    if _index is not None and _index.modified:
+        with _index.lock:
+            diskcache.save(_CACHE_NAME, _index, _VERSION)
+            _index.modified = False
+
+
+def definitions(name):
+    """Return a list of (filename, position) tuples where name is defined."""
+    return index().definitions(name)
+
+
+def usages(name):
+    """Return a list of (filename, position) tuples where \\name is used."""
+    return index().usages(name)
+
+
+def search(text):
+    """Yield (filename, position) tuples for every occurrence of text."""
+    return index().search(text)
+
+
+def _slotJobDone():
+    global _job
+    _job = None
+    save()
+
+
+def _slotDocumentSaved(doc):
+    """Re-index a saved document immediately if it is in the index roots."""
+    filename = doc.url().toLocalFile()
+    if filename and filename.endswith(extensions):
+        path = pathlib.Path(os.path.realpath(filename))
+        if any(util.path_is_relative_to(path, pathlib.Path(root))
+               for root in roots()):
+            _index.update_file(str(path))
+
+
+def _startup():
+    """Load the index and update it, shortly after startup."""
+    QTimer.singleShot(3000, index)
+
+
+app.appStarted.connect(_startup)
+
+
+def trigrams(text):
+    """Return the set of trigrams in text."""
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
+def analyze(text):
+    """Return a two-tuple (definitions, usages) for the LilyPond text.
+
+    Both are lists of (name, position) tuples. Definitions are assignments
+    at the start of a line, usages are user commands (without backslash).
+
+    """
+    defs = []
+    uses = []
+    state = ly.lex.state("lilypond")
+    pos = 0
+    for line in text.splitlines(True):
+        for t in state.tokens(line):
+            if isinstance(t, ly.lex.lilypond.UserCommand):
+                uses.append((t[1:], pos + t.pos))
+            elif isinstance(t, ly.lex.lilypond.Name) and t.pos == 0:
+                defs.append((str(t), pos))
+        pos += len(line)
+    return defs, uses
+
+
+class Entry:
+    """The information about one indexed file."""
+    __slots__ = ('fileid', 'mtime', 'size', 'trigrams', 'definitions', 'usages')
+
+    def __init__(self, fileid, mtime, size, trigrams, definitions, usages):
+        self.fileid = fileid
+        self.mtime = mtime
+        self.size = size
+        self.trigrams = trigrams
+        self.definitions = definitions
+        self.usages = usages
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class Index:
+    """A trigram index and identifier table for a set of files.
+
+    All access to the internal data is protected by the lock, so the index
+    can be updated in a background thread while it is queried.
+
+    """
+    def __init__(self):
+        self._files = {}        # filename -> Entry
+        self._filenames = {}    # fileid -> filename
+        self._nextid = 0
+        self._trigrams = collections.defaultdict(set)   # trigram -> {fileid}
+        self._definitions = collections.defaultdict(dict)   # name -> {fileid: positions}
+        self._usages = collections.defaultdict(dict)        # name -> {fileid: positions}
+        self.lock = threading.Lock()
+        self.modified = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock'], state['modified']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.modified = False
+
+    def __len__(self):
+        return len(self._files)
+
+    def filenames(self):
+        """Return a list of the indexed filenames."""
+        with self.lock:
+            return list(self._files)
+
+    def definitions(self, name):
+        """Return a list of (filename, position) tuples where name is defined."""
+        with self.lock:
+            return self._lookup(self._definitions, name)
+
+    def usages(self, name):
+        """Return a list of (filename, position) tuples where \\name is used."""
+        with self.lock:
+            return self._lookup(self._usages, name)
+
+    def _lookup(self, table, name):
+        """(internal) Return (filename, position) tuples from table."""
+        d = table.get(name)
+        if not d:
+            return []
+        return [(self._filenames[fileid], pos)
+                for fileid, positions in d.items() for pos in positions]
+
+    def candidates(self, text):
+        """Return the filenames that possibly contain the text.
+
+        For texts shorter than three characters, all filenames are returned.
+
+        """
+        with self.lock:
+            if len(text) < 3:
+                return list(self._files)
+            ids = None
+            # start with the rarest trigrams to keep the intersection small
+            for t in sorted(trigrams(text), key=lambda t: len(self._trigrams.get(t, ()))):
+                fileids = self._trigrams.get(t)
+                if not fileids:
+                    return []
+                ids = set(fileids) if ids is None else ids & fileids
+                if not ids:
+                    return []
+            return [self._filenames[fileid] for fileid in ids]
+
+    def search(self, text):
+        """Yield (filename, position) tuples for every occurrence of text."""
+        for filename in self.candidates(text):
+            try:
+                with open(filename, 'rb') as f:
+                    contents = util.decode(f.read())
+            except OSError:
+                continue
+            pos = contents.find(text)
+            while pos != -1:
+                yield filename, pos
+                pos = contents.find(text, pos + 1)
+
+    def update_file(self, filename):
+        """Index or re-index the file if it is new or changed.
+
+        Returns True if the index was changed. Files that can't be read are
+        removed from the index.
+
+        """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return self.remove_file(filename)
+        with self.lock:
+            entry = self._files.get(filename)
+            if entry and entry.mtime == st.st_mtime and entry.size == st.st_size:
+                return False
+        try:
+            with open(filename, 'rb') as f:
+                text = util.decode(f.read())
+        except (OSError, UnicodeError):
+            return self.remove_file(filename)
+        # the expensive part is done without holding the lock
+        defs, uses = analyze(text)
+        tris = trigrams(text)
+        with self.lock:
+            self._remove(filename)
+            fileid = self._nextid
+            self._nextid += 1
+            self._files[filename] = Entry(
+                fileid, st.st_mtime, st.st_size, tris, defs, uses)
+            self._filenames[fileid] = filename
+            for t in tris:
+                self._trigrams[t].add(fileid)
+            self._add(self._definitions, fileid, defs)
+            self._add(self._usages, fileid, uses)
+            self.modified = True
+        return True
+
+    def remove_file(self, filename):
+        """Remove the file from the index. Returns True if it was indexed."""
+        with self.lock:
+            if filename in self._files:
+                self._remove(filename)
+                self.modified = True
+                return True
+        return False
+
+    def _add(self, table, fileid, names):
+        """(internal) Add the (name, position) tuples to the table."""
+        positions = collections.defaultdict(list)
+        for name, pos in names:
+            positions[name].append(pos)
+        for name, pos in positions.items():
+            table[name][fileid] = tuple(pos)
+
+    def _remove(self, filename):
+        """(internal) Remove the file from all tables. Lock must be held."""
+        entry = self._files.pop(filename, None)
+        if entry:
+            fileid = entry.fileid
+            del self._filenames[fileid]
+            for t in entry.trigrams:
+                s = self._trigrams[t]
+                s.discard(fileid)
+                if not s:
+                    del self._trigrams[t]
+            for table, names in ((self._definitions, entry.definitions),
+                                 (self._usages, entry.usages)):
+                for name in set(name for name, pos in names):
+                    d = table[name]
+                    d.pop(fileid, None)
+                    if not d:
+                        del table[name]
+
+    def crawl(self, roots, aborted=lambda: False):
+        """Update the index for all LilyPond files below the roots.
+
+        Files no longer present are removed. The aborted callable is
+        checked regularly; if it returns True, crawling stops.
+        Returns the number of files that were (re)indexed.
+
+        """
+        found = set()
+        count = 0
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for name in filenames:
+                    if aborted():
+                        return count
+                    if name.endswith(extensions):
+                        filename = os.path.join(dirpath, name)
+                        found.add(filename)
+                        count += self.update_file(filename)
+        for filename in self.filenames():
+            if filename not in found:
+                self.remove_file(filename)
+        return count
+
+
+class IndexJob(job.Job):
+    """A Job that updates an Index in a background thread.
+
+    This job does not run an external process, but it can be put in a
+    job queue like any other Job.
+
+    """
+    def __init__(self, index, roots):
+        super().__init__()
+        self.set_title(_("Indexing LilyPond files"))
+        self._index = index
+        self._roots = roots
+        self._thread = None
+        self.count = 0
+
+    def start(self):
+        """Start crawling in a background thread."""
+        self.success = None
+        self._aborted = False
+        self._elapsed = 0.0
+        self._starttime = time.time()
+        self._thread = _Thread(self._run)
+        self._thread.finished.connect(self._finished)
+        self._thread.start()
+        self.started()
+
+    def _run(self):
+        self.count = self._index.crawl(self._roots, self.is_aborted)
+
+    def _finished(self):
+        self._elapsed = time.time() - self._starttime
+        self._thread = None
+        self.success = not self._aborted
+        self.done(self.success)
+
+    def abort(self):
+        """Stop crawling as soon as possible."""
+        if self._thread:
+            self._aborted = True
+
+    def is_running(self):
+        return bool(self._thread)
+
+
+class _Thread(QThread):
+    """QThread that runs a single callable."""
+    def __init__(self, func):
+        super().__init__()
+        self._func = func
+
+    def run(self):
+        self._func()
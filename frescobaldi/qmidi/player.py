@@ -62,6 +62,7 @@ class Player(QThread, midifile.player.Player):
         QThread.__init__(self, parent)
         midifile.player.Player.__init__(self)
         self._timer = None
+        self._seeking = False
 
     @classmethod
     def instance(cls):
@@ -93,7 +94,9 @@ class Player(QThread, midifile.player.Player):
         """Overridden because we can't start/stop the timer from the gui thread."""
         playing = self.isRunning()
         if playing:
+            self._seeking = True
             self.stop()
+            self._seeking = False
         super().set_position(position, offset)
         if playing:
             self.start()
@@ -105,6 +108,13 @@ class Player(QThread, midifile.player.Player):
     def timer_stop(self):
         self._timer.stop()
 
+    def stop_event(self):
+        """Overridden to keep the output open when stopping to seek."""
+        if self._seeking:
+            self.silence()
+        else:
+            super().stop_event()
+
     def finish_event(self):
         midifile.player.Player.finish_event(self)
         self.exit(0)
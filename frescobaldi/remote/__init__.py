@@ -29,7 +29,7 @@ from PyQt6.QtCore import QSettings
 from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
 import app
-import appinfo
+from remoteclient import ids
 
 
 _server = None
@@ -92,35 +92,6 @@ def slot_new_connection():
     api.Incoming(_server.nextPendingConnection())
 
 
-def ids(count=3):
-    """Yield at most count (default 3) names to use for the IPC socket."""
-    i = generate_id()
-    yield i
-    for c in range(1, count):
-        yield f'{i}#{c}'
-
-
-def generate_id():
-    """Generate a name for the IPC socket.
-
-    The name is unique for the application, the user id and the DISPLAY
-    on X11.
-
-    """
-    name = [appinfo.name]
-
-    try:
-        name.append(format(os.getuid()))
-    except AttributeError:
-        pass
-
-    display = os.environ.get("DISPLAY")
-    if display:
-        name.append(display.replace(':', '_').replace('/', '_'))
-
-    return '-'.join(name)
-
-
 def enabled():
     """Return whether remote support is enabled.
 
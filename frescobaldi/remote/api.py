@@ -30,6 +30,7 @@ from PyQt6.QtCore import QUrl
 from PyQt6.QtNetwork import QLocalSocket
 
 import app
+import remoteclient
 
 
 _incoming_handlers = []
@@ -56,15 +57,9 @@ class Remote:
 
     def command_line(self, args, urls):
         """Let remote Frescobaldi handle a command line."""
-        if urls:
-            if args.encoding:
-                self.write(f'encoding {args.encoding}\n'.encode('utf-8'))
-            for u in urls:
-                self.write(b'open ' + u.toEncoded() + b'\n')
-            self.write(b'set_current ' + u.toEncoded() + b'\n')
-            if args.line is not None:
-                self.write(f'set_cursor {args.line} {args.column or 1}\n'.encode('utf-8'))
-        self.write(b'activate_window\n')
+        for command in remoteclient.commands(
+                urls, args.encoding, args.line, args.column):
+            self.write(command)
 
 
 class Incoming:
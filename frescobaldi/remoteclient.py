@@ -0,0 +1,197 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+A minimal client to hand a command line to a running Frescobaldi instance.
+
+This module is used by the startup script before anything else is set up.
+It only imports QtCore and QtNetwork, so a second launch (e.g. when a file
+is opened from a file manager) can pass its files to the running instance
+and exit without constructing a QApplication, loading translations etc.
+
+Only simple command lines (files with the encoding, line and column options)
+are handled here; for everything else the normal startup path is used,
+which then possibly talks to the running instance via the remote module.
+
+The names of the IPC socket and the commands sent are defined here, and
+are also used by the remote module.
+
+"""
+
+
+import os
+import re
+
+from PyQt6.QtCore import QCoreApplication, QSettings, QUrl
+from PyQt6.QtNetwork import QLocalSocket
+
+import appinfo
+
+
+# options that take a value and can be handled by this client
+_options = {
+    '-e': 'encoding',
+    '--encoding': 'encoding',
+    '-l': 'line',
+    '--line': 'line',
+    '-c': 'column',
+    '--column': 'column',
+}
+
+
+def ids(count=3):
+    """Yield at most count (default 3) names to use for the IPC socket."""
+    i = generate_id()
+    yield i
+    for c in range(1, count):
+        yield f'{i}#{c}'
+
+
+def generate_id():
+    """Generate a name for the IPC socket.
+
+    The name is unique for the application, the user id and the DISPLAY
+    on X11.
+
+    """
+    name = [appinfo.name]
+
+    try:
+        name.append(format(os.getuid()))
+    except AttributeError:
+        pass
+
+    display = os.environ.get("DISPLAY")
+    if display:
+        name.append(display.replace(':', '_').replace('/', '_'))
+
+    return '-'.join(name)
+
+
+def url(arg):
+    """Converts a filename-like argument to a QUrl."""
+    if re.match(r'^(https?|s?ftp)://', arg):
+        return QUrl(arg)
+    elif arg.startswith('file://'):
+        return QUrl.fromLocalFile(os.path.abspath(arg[7:]))
+    elif arg.startswith('file:'):
+        return QUrl.fromLocalFile(os.path.abspath(arg[5:]))
+    else:
+        return QUrl.fromLocalFile(os.path.abspath(arg))
+
+
+def commands(urls, encoding=None, line=None, column=None):
+    """Yield the commands (bytes) to let a remote instance open the urls."""
+    if urls:
+        if encoding:
+            yield f'encoding {encoding}\n'.encode('utf-8')
+        for u in urls:
+            yield b'open ' + u.toEncoded() + b'\n'
+        yield b'set_current ' + u.toEncoded() + b'\n'
+        if line is not None:
+            yield f'set_cursor {line} {column or 1}\n'.encode('utf-8')
+    yield b'activate_window\n'
+
+
+def parse_args(args):
+    """Parse a simple command line.
+
+    Returns a tuple (files, options), or None if the command line contains
+    something that this client does not handle.
+
+    """
+    files = []
+    options = {}
+    args = iter(args)
+    for arg in args:
+        if arg == '--':
+            files.extend(args)
+            break
+        elif arg.startswith('-') and arg != '-':
+            name, eq, value = arg.partition('=')
+            if name not in _options:
+                return
+            if not eq:
+                value = next(args, None)
+                if value is None:
+                    return
+            options[_options[name]] = value
+        else:
+            files.append(arg)
+    for name in ('line', 'column'):
+        if name in options:
+            try:
+                options[name] = int(options[name])
+            except ValueError:
+                return
+    return files, options
+
+
+def connect():
+    """Return a QLocalSocket connected to a running instance, or None."""
+    socket = QLocalSocket()
+    name = os.environ.get("FRESCOBALDI_SOCKET")
+    for name in (name,) if name else ids():
+        socket.connectToServer(name)
+        if socket.waitForConnected(5000):
+            return socket
+
+
+def send(socket, data):
+    """Write the data to the socket and wait until it is written."""
+    while data:
+        l = socket.write(data)
+        if l < 0:
+            return
+        data = data[l:]
+    socket.waitForBytesWritten()
+
+
+def close(socket):
+    """Say goodbye and disconnect."""
+    send(socket, b'bye\n')
+    socket.disconnectFromServer()
+    if socket.state() == QLocalSocket.LocalSocketState.ConnectedState:
+        socket.waitForDisconnected(5000)
+
+
+def handle_command_line(args):
+    """Try to let a running instance handle the command line arguments.
+
+    Returns True if that succeeded, in which case this process can exit.
+
+    """
+    if '-session' in args:
+        return False    # started by the session manager
+    parsed = parse_args(args)
+    if parsed is None:
+        return False
+    files, options = parsed
+    # the same settings as the application will use
+    QCoreApplication.setApplicationName(appinfo.name)
+    QCoreApplication.setOrganizationName(appinfo.name)
+    QCoreApplication.setOrganizationDomain(appinfo.domain)
+    if not QSettings().value('allow_remote', True, bool):
+        return False
+    socket = connect()
+    if not socket:
+        return False
+    send(socket, b''.join(commands(list(map(url, files)), **options)))
+    close(socket)
+    return True
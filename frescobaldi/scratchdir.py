@@ -45,12 +45,23 @@ def findDocument(filename):
     Note that, unlike app.findDocument(), a filename is specified and not a url.
 
     """
-    for d in app.documents:
-        if d.url().toLocalFile() == filename:
-            return d
-        s = ScratchDir.instance(d)
-        if s.directory() and util.equal_paths(filename, s.path()):
-            return d
+    d = app.findDocumentByPath(filename)
+    if d:
+        return d
+    s = _scratchdirs.get(util.path_key(os.path.dirname(filename)))
+    if s and util.equal_paths(filename, s.path()):
+        return s.document()
+
+
+_scratchdirs = {}   # path_key(directory) -> ScratchDir, for findDocument()
+
+
+@app.documentClosed.connect
+def _documentClosed(doc):
+    """Removes the scratch directory of a closed document from the index."""
+    for key, s in list(_scratchdirs.items()):
+        if s.document() is doc:
+            del _scratchdirs[key]
 
 
 class ScratchDir(plugin.DocumentPlugin):
@@ -62,6 +73,7 @@ class ScratchDir(plugin.DocumentPlugin):
         """Creates the local temporary directory."""
         if not self._directory:
             self._directory = util.tempdir()
+            _scratchdirs[util.path_key(self._directory)] = self
 
     def directory(self):
         """Returns the directory if a temporary area was created, else None."""
@@ -83,6 +83,8 @@ def restoreSession(key):
         sessions.setCurrentSession(session_name)
     ## restore documents
     numdocuments = settings.value('numdocuments', 0, int)
+    import sessions
+    deferred = sessions.lazyLoading()
     doc = None
     for index in range(numdocuments):
         settings.beginGroup(f"document{index}")
@@ -92,7 +94,7 @@ def restoreSession(key):
             doc = document.EditorDocument()
         else:
             try:
-                doc = app.openUrl(url)
+                doc = app.openUrl(url, deferred=deferred)
             except OSError:
                 pass
         settings.endGroup()
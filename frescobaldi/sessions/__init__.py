@@ -103,10 +103,11 @@ def loadSession(name):
     session = sessionGroup(name)
     urls = qsettings.get_url_list(session, "urls")
     active = session.value("active", -1, int)
+    deferred = lazyLoading()
     docs = []
     for url in urls:
         try:
-            doc = app.openUrl(url)
+            doc = app.openUrl(url, deferred=deferred)
         except OSError:
             pass
         else:
@@ -117,6 +118,10 @@ def loadSession(name):
             active = 0
         return docs[active]
 
+def lazyLoading():
+    """Return True if documents in a session are loaded when first needed."""
+    return QSettings().value("session/lazy_loading", True, bool)
+
 def saveSession(name, documents, activeDocument=None):
     """Saves the list of documents and which one is active."""
     # only save the documents that have an url
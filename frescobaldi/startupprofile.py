@@ -0,0 +1,195 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Measures where the time goes when Frescobaldi starts up.
+
+This module is enabled by the --profile-startup or --profile-trace command
+line option. It then records how long every first import of a module takes,
+and how long the construction of plugins, panels and extensions takes (those
+places call measure()). When startup is finished, a report sorted by time is
+written to stderr. With --profile-trace, all measurements are also saved in a
+JSON file that can be loaded in the Chrome trace viewer (chrome://tracing) or
+Perfetto.
+
+When profiling is not enabled, measure() does nothing.
+
+"""
+
+
+import builtins
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+
+
+_enabled = False
+_original_import = builtins.__import__
+_start = 0
+_thread = None  # only the main thread is measured
+_records = []   # (category, name, start, duration, self time) in microseconds
+_stack = []     # [category, name, start, time used by children]
+
+
+def enabled():
+    """Return True if startup profiling is enabled."""
+    return _enabled
+
+
+def enable():
+    """Start profiling. Call this as early as possible."""
+    global _enabled, _start, _thread
+    if not _enabled:
+        _enabled = True
+        _start = time.perf_counter()
+        _thread = threading.get_ident()
+        builtins.__import__ = _import
+
+
+def disable():
+    """Stop profiling."""
+    global _enabled
+    _enabled = False
+    if builtins.__import__ is _import:
+        builtins.__import__ = _original_import
+
+
+def _now():
+    """Return the time since profiling was enabled in microseconds."""
+    return (time.perf_counter() - _start) * 1000000
+
+
+@contextlib.contextmanager
+def measure(category, name):
+    """Context manager recording the time its body takes.
+
+    The category is e.g. 'import', 'plugin', 'panel' or 'extension'.
+    Nested measurements are subtracted from the self time.
+
+    """
+    if not _enabled or threading.get_ident() != _thread:
+        yield
+        return
+    entry = [category, name, _now(), 0]
+    _stack.append(entry)
+    try:
+        yield
+    finally:
+        _stack.pop()
+        duration = _now() - entry[2]
+        _records.append((category, name, entry[2], duration, duration - entry[3]))
+        if _stack:
+            _stack[-1][3] += duration
+
+
+def record(category, name, start, end):
+    """Record a measurement made by the caller with time.perf_counter()."""
+    if _enabled:
+        duration = (end - start) * 1000000
+        _records.append((category, name, (start - _start) * 1000000, duration, duration))
+
+
+def _import(name, globals=None, locals=None, fromlist=(), level=0):
+    """Replacement for builtins.__import__ that measures first imports."""
+    fullname = name
+    if level:
+        try:
+            fullname = importlib.util.resolve_name(
+                '.' * level + name, (globals or {}).get('__package__'))
+        except (ImportError, ValueError):
+            pass
+    if not _enabled or fullname in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    with measure('import', fullname):
+        return _original_import(name, globals, locals, fromlist, level)
+
+
+def records():
+    """Return the list of (category, name, start, duration, self) tuples.
+
+    All times are in microseconds, start is relative to the moment profiling
+    was enabled.
+
+    """
+    return list(_records)
+
+
+def report(file=None, count=40):
+    """Write a report of the slowest items to file (default: stderr).
+
+    Items are sorted by their self time; imports also show the total time
+    including the modules they imported.
+
+    """
+    file = file or sys.stderr
+    write = lambda text: file.write(text + '\n')
+    total = _now()
+    write(f"Startup took {total / 1000:.1f} ms")
+    totals = {}
+    for category, name, start, duration, self_time in _records:
+        totals[category] = totals.get(category, 0) + (
+            self_time if category == 'import' else duration)
+    for category, t in sorted(totals.items(), key=lambda i: i[1], reverse=True):
+        write(f"  {category:<10} {t / 1000:9.1f} ms")
+    write("")
+    write(f"{'self ms':>9} {'total ms':>9}  {'category':<10} name")
+    for category, name, start, duration, self_time in sorted(
+            _records, key=lambda r: r[4], reverse=True)[:count]:
+        write(f"{self_time / 1000:9.1f} {duration / 1000:9.1f}  {category:<10} {name}")
+
+
+def save_trace(filename):
+    """Save the measurements in the Chrome trace event format.
+
+    Returns True if the file could be written. An existing file is only
+    overwritten if its name ends with '.json'.
+
+    """
+    events = [{
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': round(start, 1),
+        'dur': round(duration, 1),
+        'pid': 1,
+        'tid': 1,
+    } for category, name, start, duration, self_time in _records]
+    mode = 'w' if os.path.splitext(filename)[1].lower() == '.json' else 'x'
+    try:
+        with open(filename, mode, encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    except OSError:
+        return False
+    return True
+
+
+def finish(filename=None):
+    """Stop profiling, write the report and save the trace to filename if given."""
+    disable()
+    report()
+    if not filename:
+        return
+    if save_trace(filename):
+        sys.stderr.write(f"Startup trace written to {filename}\n")
+    else:
+        sys.stderr.write(f"Could not write startup trace to {filename}\n")
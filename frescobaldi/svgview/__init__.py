@@ -27,7 +27,7 @@ This previews a SVG-file with initial editing abilities.
 
 import importlib.util
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QSettings, Qt
 from PyQt6.QtGui import QAction, QKeySequence
 
 import app
@@ -55,7 +55,8 @@ class SvgViewPanel(panel.Panel):
         self.toggleViewAction().setText(_("SV&G View"))
 
     def createWidget(self):
-        if not importlib.util.find_spec('PyQt6.QtWebEngineWidgets'):
+        native = QSettings().value("svgview/native_renderer", False, bool)
+        if not native and not importlib.util.find_spec('PyQt6.QtWebEngineWidgets'):
             import webenginedummy
             return webenginedummy.WebEngineDummy(self)
         from . import widget
@@ -0,0 +1,175 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+The SVG view without web engine.
+
+This View shows the SVG file using QtSvg, rendered in tiles in the
+background by the "svg" renderer of pagedview, so no web engine process is
+needed. Point and click uses the link index of the svglinks module.
+Editing the SVG is not possible in this view.
+
+"""
+
+
+import xml.etree.ElementTree as ET
+
+from PyQt6.QtCore import QByteArray, QRectF, Qt, QUrl
+from PyQt6.QtGui import QTextCharFormat
+from PyQt6.QtSvg import QSvgRenderer
+
+import app
+import linkindex
+import pagedview
+import textformats
+import qpageview.highlight
+import qpageview.link
+import qpageview.locking
+import qpageview.svg
+
+from . import svglinks
+
+
+class SvgPage(qpageview.svg.SvgPage):
+    """A SvgPage that knows the geometry of the links in the SVG file."""
+    def __init__(self, svgrenderer, elements, renderer=None):
+        super().__init__(svgrenderer, renderer)
+        self._elements = elements
+        self._elementLinks = None
+        self._linkIndex = None
+
+    @classmethod
+    def load(cls, filename, renderer=None):
+        """Reimplemented to give the link elements an id before loading."""
+        try:
+            data, elements = svglinks.identify(filename)
+        except (OSError, ET.ParseError):
+            return
+        r = QSvgRenderer()
+        if r.load(QByteArray(data)):
+            yield cls(r, elements, renderer)
+
+    def elementLinks(self):
+        """Return a dict mapping the numbers of <a> elements to Link objects."""
+        if self._elementLinks is None:
+            self._elementLinks = d = {}
+            box = self._viewBox
+            if box.isEmpty():
+                return d
+            with qpageview.locking.lock(self._svg):
+                for index, (url, ids) in self._elements.items():
+                    rect = QRectF()
+                    for id in ids:
+                        rect |= self._svg.transformForElement(id).mapRect(
+                            self._svg.boundsOnElement(id))
+                    if not rect.isNull():
+                        d[index] = qpageview.link.Link(
+                            (rect.left() - box.left()) / box.width(),
+                            (rect.top() - box.top()) / box.height(),
+                            (rect.right() - box.left()) / box.width(),
+                            (rect.bottom() - box.top()) / box.height(),
+                            url)
+        return self._elementLinks
+
+    def links(self):
+        """Reimplemented to return the links in a LinkIndex."""
+        if self._linkIndex is None:
+            self._linkIndex = linkindex.LinkIndex(self.elementLinks().values())
+        return self._linkIndex
+
+
+class SvgDocument(qpageview.svg.SvgDocument):
+    """A SvgDocument with our SvgPage."""
+    pageClass = SvgPage
+
+
+class View(svglinks.LinkHandlerMixin, pagedview.PagedView):
+    """Displays a SVG file with point and click, without web engine."""
+    def __init__(self, parent):
+        super().__init__(parent)
+        self._links = None
+        self._highlightFormat = QTextCharFormat()
+        self._highlightMusicFormat = qpageview.highlight.Highlighter()
+        self._renderer = pagedview.getRenderer("svg")
+        self.setLinkHighlighter(qpageview.highlight.Highlighter())
+        self.linkClicked.connect(self.slotLinkClicked)
+        self.linkHovered.connect(self.slotLinkHovered)
+        self.linkLeft.connect(self.unHighlight)
+        app.settingsChanged.connect(self.readColors)
+        self.readColors()
+
+    def mainwindow(self):
+        return self.parent().mainwindow()
+
+    def readColors(self):
+        """Reads the colors from the user's preferences."""
+        colors = textformats.formatData('editor').baseColors
+        self._highlightMusicFormat.color = colors['musichighlight']
+        self._renderer.paperColor = colors['paper']
+        color = colors['selectionbackground']
+        color.setAlpha(128)
+        self._highlightFormat.setBackground(color)
+
+    def load(self, url):
+        """Load the SVG file the QUrl points to."""
+        filename = url.toLocalFile()
+        self._links = svglinks.links(filename)
+        self.setDocument(SvgDocument([filename], self._renderer))
+
+    def clear(self):
+        """Empty the View."""
+        self._links = None
+        super().clear()
+
+    def links(self):
+        """Return the svglinks.Links of the displayed SVG file, or None."""
+        return self._links
+
+    def evalSave(self):
+        """Does nothing, editing is not possible in this View."""
+        pass
+
+    def zoomOriginal(self):
+        self.setZoomFactor(1.0)
+
+    def highlightCursor(self, cursor):
+        """Highlight the objects in the SVG the QTextCursor points at."""
+        doc = self.document()
+        if not self._links or not doc or not doc.pages():
+            return
+        page = doc.pages()[0]
+        links = page.elementLinks()
+        rects = [links[index].rect()
+                 for index in self._links.elements(cursor) if index in links]
+        if rects:
+            self.highlight({page: rects}, self._highlightMusicFormat, 2000)
+        else:
+            self.clearHighlight(self._highlightMusicFormat)
+
+    def slotLinkClicked(self, ev, page, link):
+        """Called when the user clicks a link."""
+        if ev.button() == Qt.MouseButton.RightButton:
+            return
+        if not self.doTextEdit(link.url, True):
+            import helpers
+            helpers.openUrl(QUrl(link.url))
+
+    def slotLinkHovered(self, page, link):
+        """Called when the user hovers a link."""
+        self.doTextEdit(link.url, False)
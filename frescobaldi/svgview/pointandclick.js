@@ -46,3 +46,20 @@ for (var i= 0; i < a.length; ++i){
 	
 
 
+
+var highlighted = [];
+
+// color the <a> elements with the given numbers, remove earlier highlighting
+function highlightLinks(indices, color){
+    for (var i = 0; i < highlighted.length; ++i){
+        highlighted[i].style.color = '';
+    }
+    highlighted = [];
+    for (var i = 0; i < indices.length; ++i){
+        var e = a[indices[i]];
+        if (e){
+            e.style.color = color;
+            highlighted.push(e);
+        }
+    }
+}
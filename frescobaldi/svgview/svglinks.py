@@ -0,0 +1,247 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2026 - 2026 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Point and click links of SVG files, read on the Python side.
+
+The SVG file is parsed incrementally (iterparse) and every <a> element is
+numbered in document order, which is the order in which JavaScript's
+document.getElementsByTagName('a') returns them. The textedit links are
+stored in a pointandclick.Links object with the element numbers as
+destinations, so finding the SVG objects a text cursor points at is a
+lookup in the Links, and highlighting them needs only one small JavaScript
+call with the list of element numbers.
+
+"""
+
+
+import collections
+import os
+import xml.etree.ElementTree as ET
+
+from PyQt6.QtCore import QUrl
+from PyQt6.QtGui import QTextCursor
+
+import app
+import pointandclick
+import scratchdir
+import textedit
+import util
+
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+_TAG_A = ('a', '{' + SVG_NS + '}a')
+_HREF = ('{' + XLINK_NS + '}href', 'href')
+
+# keep the usual prefixes when writing SVG documents
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+_MAX_CACHED = 20
+_cache = collections.OrderedDict()     # filename -> ((mtime, size), Links)
+
+
+def links(filename):
+    """Return the Links for the SVG file, or None if it can't be read.
+
+    The Links are cached and re-read when the file changes.
+
+    """
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    try:
+        cached_stamp, l = _cache[filename]
+    except KeyError:
+        pass
+    else:
+        if cached_stamp == stamp:
+            _cache.move_to_end(filename)
+            return l
+    try:
+        l = Links(filename)
+    except (OSError, ET.ParseError):
+        return None
+    _cache[filename] = (stamp, l)
+    while len(_cache) > _MAX_CACHED:
+        _cache.popitem(False)
+    return l
+
+
+def parse(filename):
+    """Yield (index, element) for every <a> element in the SVG file.
+
+    The index is the number of the element in document order. The elements
+    are yielded when their start tag is read, so only the attributes of an
+    element are available.
+
+    """
+    index = 0
+    for event, elem in ET.iterparse(filename, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag in _TAG_A:
+                yield index, elem
+                index += 1
+        else:
+            # we need no content, free memory as we go
+            elem.clear()
+
+
+def href(elem):
+    """Return the link url of the (<a>) element, or None."""
+    for name in _HREF:
+        url = elem.get(name)
+        if url:
+            return url
+
+
+def identify(filename):
+    """Return a two-tuple (data, elements) for the SVG file.
+
+    data is the SVG document (bytes) in which every child of an <a> element
+    has an id attribute, so its geometry can be found using QSvgRenderer
+    (which does not know the ids of <a> elements themselves). elements is a
+    dict mapping the number of every <a> element with a link to a tuple
+    (url, ids), where ids is the list of the ids of its children.
+
+    """
+    tree = ET.parse(filename)
+    elements = {}
+    for index, elem in enumerate(e for e in tree.iter() if e.tag in _TAG_A):
+        url = href(elem)
+        if url:
+            ids = []
+            for num, child in enumerate(elem):
+                id = child.get('id')
+                if not id:
+                    id = "fb-link-{0}-{1}".format(index, num)
+                    child.set('id', id)
+                ids.append(id)
+            elements[index] = (url, ids)
+    return ET.tostring(tree.getroot()), elements
+
+
+class Links(pointandclick.Links):
+    """Stores the textedit links of an SVG file.
+
+    The destination of every link is the number of the <a> element in the SVG
+    document (see parse()).
+
+    """
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        with self:
+            for index, elem in parse(filename):
+                url = href(elem)
+                t = textedit.link(url) if url else None
+                if t:
+                    self.add_link(util.normpath(t.filename), t.line, t.column, index)
+
+    def cursor(self, url, load=False):
+        """Returns the destination of a textedit url as a QTextCursor.
+
+        If load (defaulting to False) is True, the document is loaded if it is
+        not yet loaded. Returns None if the url was not valid or the document
+        could not be loaded.
+
+        """
+        t = textedit.link(url)
+        if t:
+            filename = util.normpath(t.filename)
+            return super().cursor(filename, t.line, t.column, load)
+
+    def elements(self, cursor):
+        """Return the list of element numbers the QTextCursor points at."""
+        bound = self.boundLinks(cursor.document())
+        if bound:
+            indices = bound.indices(cursor)
+            if indices:
+                return [index
+                        for destinations in bound.destinations()[indices]
+                        for index in destinations]
+        return []
+
+
+class LinkHandlerMixin:
+    """Handles textedit links for the SVG views.
+
+    The view should have a mainwindow() method, a _highlightFormat
+    QTextCharFormat and a _links attribute with the Links of the displayed
+    file (or None).
+
+    """
+    def textDocument(self, filename, load=False):
+        """Get the document with the specified filename.
+
+        If load is True, the document is loaded if it wasn't already.
+        Also takes scratchdir into account for unnamed or non-local documents.
+
+        """
+        doc = scratchdir.findDocument(filename)
+        if not doc and load:
+            doc = app.openUrl(QUrl.fromLocalFile(filename))
+        return doc
+
+    def doTextEdit(self, url, setCursor = False):
+        """Process a textedit link and either highlight
+           the corresponding source code or set the
+           cursor to it.
+        """
+        t = textedit.link(url)
+        # Only process textedit links
+        if not t:
+            return False
+        # the links follow the edits in the document
+        cursor = self._links.cursor(url, setCursor) if self._links else None
+        if not cursor:
+            filename = util.normpath(t.filename)
+            doc = self.textDocument(filename, setCursor)
+            if doc:
+                cursor = QTextCursor(doc)
+                b = doc.findBlockByNumber(t.line - 1)
+                p = b.position() + t.column
+                cursor.setPosition(p)
+        if cursor:
+            doc = cursor.document()
+            cursors = pointandclick.positions(cursor)
+            # Do highlighting if the document is active
+            if cursors and doc == self.mainwindow().currentDocument():
+                import viewhighlighter
+                view = self.mainwindow().currentView()
+                viewhighlighter.highlighter(view).highlight(self._highlightFormat, cursors, 2, 0)
+            # set the cursor and bring the document to front
+            if setCursor:
+                mainwindow = self.mainwindow()
+                mainwindow.setTextCursor(cursor)
+                import widgets.blink
+                widgets.blink.Blinker.blink_cursor(mainwindow.currentView())
+                self.mainwindow().setCurrentDocument(doc)
+                mainwindow.activateWindow()
+                mainwindow.currentView().setFocus()
+        return True
+
+    def unHighlight(self):
+        import viewhighlighter
+        view = self.mainwindow().currentView()
+        viewhighlighter.highlighter(view).clear(self._highlightFormat)
@@ -40,11 +40,10 @@ import app
 import util
 import textedit
 import textformats
-import pointandclick
-import scratchdir
 
 
 from . import __path__
+from . import svglinks
 
 
 def getJsScript(filename):
@@ -55,7 +54,7 @@ def getJsScript(filename):
     return jsValue
 
 
-class View(QWebEngineView):
+class View(svglinks.LinkHandlerMixin, QWebEngineView):
     zoomFactorChanged = pyqtSignal(float)
     objectDragged = pyqtSignal(float, float)
     objectDragging = pyqtSignal(float, float)
@@ -70,6 +69,9 @@ class View(QWebEngineView):
     def __init__(self, parent):
         super().__init__(parent)
         self._highlightFormat = QTextCharFormat()
+        self._highlightColor = None
+        self._highlighted = []
+        self._links = None
         self.jslink = JSLink(self)
         channel = QWebChannel(self)
         channel.registerObject("pyLinks", self.jslink)
@@ -95,18 +97,6 @@ class View(QWebEngineView):
     def currentSVG(self):
         return self.parent().getCurrent()
 
-    def document(self, filename, load=False):
-        """Get the document with the specified filename.
-
-        If load is True, the document is loaded if it wasn't already.
-        Also takes scratchdir into account for unnamed or non-local documents.
-
-        """
-        doc = scratchdir.findDocument(filename)
-        if not doc and load:
-            doc = app.openUrl(QUrl.fromLocalFile(filename))
-        return doc
-
     def initJavaScript(self):
         """Return a string containing all JavaScript to run in a page."""
         try:
@@ -127,9 +117,25 @@ class View(QWebEngineView):
         return self._initJavaScript
 
     def svgLoaded(self):
+        self._highlighted = []
         if not self.url().isEmpty() and not self.url().path().endswith(".html"):
             # initialize the js module
             self.page().runJavaScript(self.initJavaScript())
+            self._links = svglinks.links(self.url().toLocalFile())
+        else:
+            self._links = None
+
+    def links(self):
+        """Return the svglinks.Links of the displayed SVG file, or None."""
+        return self._links
+
+    def highlightCursor(self, cursor):
+        """Highlight the objects in the SVG the QTextCursor points at."""
+        elements = self._links.elements(cursor) if self._links else []
+        if elements or self._highlighted:
+            self._highlighted = elements
+            self.page().runJavaScript("highlightLinks({0}, '{1}');".format(
+                elements, self._highlightColor.name()))
 
     def evalSave(self):
         # to enable useful save of SVG edits to file uncomment the line below
@@ -138,6 +144,7 @@ class View(QWebEngineView):
 
     def clear(self):
         """Empty the View."""
+        self._links = None
         self.load(self.defaulturl)
 
     def dragElement(self, url):
@@ -146,7 +153,7 @@ class View(QWebEngineView):
         if not t:
             return False
         filename = util.normpath(t.filename)
-        doc = self.document(filename, True)
+        doc = self.textDocument(filename, True)
         if doc:
             cursor = QTextCursor(doc)
             b = doc.findBlockByNumber(t.line - 1)
@@ -166,45 +173,14 @@ class View(QWebEngineView):
         """announce extra-offsets when starting to drag an element"""
         self.objectStartDragging.emit(offsX, offsY)
 
-    def doTextEdit(self, url, setCursor = False):
-        """Process a textedit link and either highlight
-           the corresponding source code or set the
-           cursor to it.
-        """
-        t = textedit.link(url)
-        # Only process textedit links
-        if not t:
-            return False
-        filename = util.normpath(t.filename)
-        doc = self.document(filename, setCursor)
-        if doc:
-            cursor = QTextCursor(doc)
-            b = doc.findBlockByNumber(t.line - 1)
-            p = b.position() + t.column
-            cursor.setPosition(p)
-            cursors = pointandclick.positions(cursor)
-            # Do highlighting if the document is active
-            if cursors and doc == self.mainwindow().currentDocument():
-                import viewhighlighter
-                view = self.mainwindow().currentView()
-                viewhighlighter.highlighter(view).highlight(self._highlightFormat, cursors, 2, 0)
-            # set the cursor and bring the document to front
-            if setCursor:
-                mainwindow = self.mainwindow()
-                mainwindow.setTextCursor(cursor)
-                import widgets.blink
-                widgets.blink.Blinker.blink_cursor(mainwindow.currentView())
-                self.mainwindow().setCurrentDocument(doc)
-                mainwindow.activateWindow()
-                mainwindow.currentView().setFocus()
-        return True
-
     def emitCursor(self, cursor):
         self.cursor.emit(cursor)
 
     def readSettings(self):
         """Reads the settings from the user's preferences."""
-        color = textformats.formatData('editor').baseColors['selectionbackground']
+        colors = textformats.formatData('editor').baseColors
+        self._highlightColor = colors['musichighlight']
+        color = colors['selectionbackground']
         color.setAlpha(128)
         self._highlightFormat.setBackground(color)
 
@@ -213,11 +189,6 @@ class View(QWebEngineView):
         with open(self.currentSVG(), 'wb') as f:
             f.write(svg_string.encode('utf8'))
 
-    def unHighlight(self):
-        import viewhighlighter
-        view = self.mainwindow().currentView()
-        viewhighlighter.highlighter(view).clear(self._highlightFormat)
-
     def zoomIn(self):
         self.setZoomFactor(self.zoomFactor() * 1.1)
 
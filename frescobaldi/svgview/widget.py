@@ -33,7 +33,6 @@ import app
 import qutil
 import resultfiles
 
-from . import view
 from . import svgfiles
 
 
@@ -43,8 +42,9 @@ class SvgView(QWidget):
 
         self._document = None
         self._setting_zoom = False
+        self._native = False
 
-        self.view = view.View(self)
+        self.view = self.createView()
 
         self.pageLabel = QLabel()
         self.pageCombo = QComboBox(sizeAdjustPolicy=QComboBox.SizeAdjustPolicy.AdjustToContents)
@@ -80,14 +80,19 @@ class SvgView(QWidget):
         hbox.addStretch(1)
         layout.addLayout(hbox)
         layout.addWidget(self.view)
+        self.saveButton.setEnabled(not self._native)
 
         app.jobFinished.connect(self.initSvg)
         app.documentClosed.connect(self.slotDocumentClosed)
         app.documentLoaded.connect(self.initSvg)
         self.pageCombo.currentIndexChanged.connect(self.changePage)
         self.zoomNumber.valueChanged.connect(self.slotZoomNumberChanged)
-        self.view.zoomFactorChanged.connect(self.slotViewZoomChanged)
+        app.settingsChanged.connect(self.readSettings)
         dockwidget.mainwindow().currentDocumentChanged.connect(self.initSvg)
+        dockwidget.mainwindow().currentViewChanged.connect(self.slotCurrentViewChanged)
+        view = dockwidget.mainwindow().currentView()
+        if view:
+            self.slotCurrentViewChanged(view)
         self.zoomNumber.setValue(100)
         doc = dockwidget.mainwindow().currentDocument()
         if doc:
@@ -100,6 +105,29 @@ class SvgView(QWidget):
     def mainwindow(self):
         return self.parent().mainwindow()
 
+    def createView(self):
+        """Create the view, depending on the native rendering setting."""
+        self._native = QtCore.QSettings().value("svgview/native_renderer", False, bool)
+        if self._native:
+            from . import nativeview
+            v = nativeview.View(self)
+        else:
+            from . import view
+            v = view.View(self)
+        v.zoomFactorChanged.connect(self.slotViewZoomChanged)
+        return v
+
+    def readSettings(self):
+        """Replace the view if the native rendering setting changed."""
+        if QtCore.QSettings().value("svgview/native_renderer", False, bool) != self._native:
+            old = self.view
+            self.view = self.createView()
+            self.layout().replaceWidget(old, self.view)
+            old.deleteLater()
+            self.saveButton.setEnabled(not self._native)
+            self.slotZoomNumberChanged(self.zoomNumber.value())
+            self.reLoadDoc()
+
     def initSvg(self, doc):
         """Opens first page of score after compilation"""
         if doc == self.mainwindow().currentDocument():
@@ -144,6 +172,15 @@ class SvgView(QWidget):
                 svg = files.url(page_index)
                 self.view.load(svg)
 
+    def slotCurrentViewChanged(self, view, old=None):
+        if old:
+            old.cursorPositionChanged.disconnect(self.slotCursorPositionChanged)
+        view.cursorPositionChanged.connect(self.slotCursorPositionChanged)
+
+    def slotCursorPositionChanged(self):
+        """Called when the user moves the text cursor."""
+        self.view.highlightCursor(self.mainwindow().textCursor())
+
     def slotDocumentClosed(self, doc):
         if doc == self._document:
             self._document = None
@@ -20,21 +20,39 @@
 """
 Code to use LilyPond-generated SVGs as icons.
 The default black color will be adjusted to the default Text color.
+
+For every size that is requested, the alpha masks of all symbols are
+rendered once in a single image, a MaskAtlas, which is stored in the cache
+directory. Recolouring the symbols then is one composition per atlas.
 """
 
 
+import collections
 import os
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QRect, Qt
 from PyQt6.QtGui import QIcon, QIconEngine, QImage, QPainter, QPixmap
 from PyQt6.QtWidgets import QApplication, QStyleOption
 from PyQt6.QtSvg import QSvgRenderer
 
+import diskcache
+
 __all__ = ["icon"]
 
 
+# change this when the format of the cached atlases changes
+_CACHE_VERSION = 1
+_CACHE_NAME = "symbols"
+
+_MAX_CACHED = 16        # maximum number of atlases (sizes) on disk
+_MAX_IMAGES = 8         # maximum number of recoloured atlases in memory
+_MAX_PIXMAPS = 1000     # maximum number of pixmaps in memory
+
 _icons = {}
-_pixmaps = {}
+_names = None
+_masks = {}                             # (width, height) -> MaskAtlas
+_images = collections.OrderedDict()     # (width, height, rgb) -> QImage
+_pixmaps = collections.OrderedDict()    # (name, width, height, rgb, mode) -> QPixmap
 
 
 def icon(name):
@@ -58,21 +76,126 @@ def pixmap(name, size, mode, state):
         color = QApplication.palette().text().color()
     key = (name, size.width(), size.height(), color.rgb(), mode)
     try:
-        return _pixmaps[key]
+        pixmap = _pixmaps[key]
     except KeyError:
-        i = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
-        i.fill(0)
-        painter = QPainter(i)
-        # render SVG symbol
-        QSvgRenderer(os.path.join(__path__[0], name + ".svg")).render(painter)
-        # recolor to text color
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
-        painter.fillRect(i.rect(), color)
-        painter.end()
+        image = colored_atlas(size.width(), size.height(), color)
+        rect = mask_atlas(size.width(), size.height()).rect(name)
+        if rect:
+            i = image.copy(rect)
+        else:
+            i = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
+            i.fill(0)
         # let style alter the drawing based on mode, and create QPixmap
         pixmap = QApplication.style().generatedIconPixmap(mode, QPixmap.fromImage(i), QStyleOption())
         _pixmaps[key] = pixmap
-        return pixmap
+        while len(_pixmaps) > _MAX_PIXMAPS:
+            _pixmaps.popitem(False)
+    else:
+        _pixmaps.move_to_end(key)
+    return pixmap
+
+
+def names():
+    """Returns the sorted list of the names of all symbols."""
+    global _names
+    if _names is None:
+        _names = sorted(f[:-4] for f in os.listdir(__path__[0]) if f.endswith('.svg'))
+    return _names
+
+
+def mask_atlas(width, height):
+    """Returns the MaskAtlas for the size, loading or rendering it if needed."""
+    try:
+        return _masks[(width, height)]
+    except KeyError:
+        atlas = _masks[(width, height)] = MaskAtlas(width, height)
+        return atlas
+
+
+def colored_atlas(width, height, color):
+    """Returns a QImage with all symbols of the size in the given color."""
+    key = (width, height, color.rgb())
+    try:
+        image = _images[key]
+    except KeyError:
+        mask = mask_atlas(width, height).image
+        image = QImage(mask.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(color)
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_DestinationIn)
+        painter.drawImage(0, 0, mask)
+        painter.end()
+        _images[key] = image
+        while len(_images) > _MAX_IMAGES:
+            _images.popitem(False)
+    else:
+        _images.move_to_end(key)
+    return image
+
+
+class MaskAtlas:
+    """The alpha masks of all symbols at one size, in a single Alpha8 image.
+
+    The symbols are laid out in a grid in the order of names(). The atlas is
+    stored in the cache directory, and rendered again when a symbol file is
+    added or changed.
+
+    """
+    columns = 16
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._index = {name: i for i, name in enumerate(names())}
+        rows = (len(self._index) + self.columns - 1) // self.columns
+        self._size = (self.columns * width, max(rows, 1) * height)
+        stamp = self.stamp()
+        cached = diskcache.load(self.cache_name(), _CACHE_VERSION)
+        if cached and cached[0] == stamp:
+            bytesPerLine, data = cached[1:]
+            self.image = QImage(data, *self._size, bytesPerLine,
+                QImage.Format.Format_Alpha8).copy()
+        else:
+            self.image = self.render()
+            data = self.image.constBits().asstring(self.image.sizeInBytes())
+            diskcache.save(self.cache_name(),
+                (stamp, self.image.bytesPerLine(), data), _CACHE_VERSION)
+            diskcache.prune(_CACHE_NAME, _MAX_CACHED)
+
+    def cache_name(self):
+        """Returns the name of our cache file."""
+        return "{}/{}x{}".format(_CACHE_NAME, self.width, self.height)
+
+    @staticmethod
+    def stamp():
+        """Returns the names and modification times of all symbol files."""
+        return [(name, os.stat(os.path.join(__path__[0], name + ".svg")).st_mtime_ns)
+                for name in names()]
+
+    def rect(self, name):
+        """Returns the QRect of the named symbol in the image, or None."""
+        try:
+            i = self._index[name]
+        except KeyError:
+            return None
+        row, column = divmod(i, self.columns)
+        return QRect(column * self.width, row * self.height, self.width, self.height)
+
+    def render(self):
+        """Renders all symbols and returns the Alpha8 image."""
+        image = QImage(*self._size, QImage.Format.Format_Alpha8)
+        image.fill(0)
+        painter = QPainter(image)
+        for name in names():
+            # render each symbol separately, so it can't draw outside its cell
+            i = QImage(self.width, self.height, QImage.Format.Format_ARGB32_Premultiplied)
+            i.fill(0)
+            p = QPainter(i)
+            QSvgRenderer(os.path.join(__path__[0], name + ".svg")).render(p)
+            p.end()
+            painter.drawImage(self.rect(name).topLeft(), i)
+        painter.end()
+        return image
 
 
 class Engine(QIconEngine):
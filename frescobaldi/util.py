@@ -66,11 +66,19 @@ if platform.system() == "Windows":
     def equal_paths(p1, p2):
         """Returns True if the paths are equal (case and separator insensitive)."""
         return p1.lower().replace('\\', '/') == p2.lower().replace('\\', '/')
+
+    def path_key(path):
+        """Returns a key for the path, equal for paths that equal_paths() considers equal."""
+        return path.lower().replace('\\', '/')
 else:
     def equal_paths(p1, p2):
         """Returns True if the paths are equal."""
         return p1 == p2
 
+    def path_key(path):
+        """Returns a key for the path, equal for paths that equal_paths() considers equal."""
+        return path
+
 
 # Make sure that also on Windows, directory slashes remain forward
 if platform.system() == "Windows":
@@ -58,6 +58,7 @@ class View(QPlainTextEdit):
         super().__init__()
         # to enable mouseMoveEvent to display tooltip
         super().setMouseTracking(True)
+        document.ensureLoaded()
         self.setDocument(document)
         self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         self.setCursorWidth(2)
@@ -97,7 +97,8 @@ class DocumentGroup(plugin.DocumentPlugin):
             for filename in files:
                 doc = d.get(filename)
                 if doc:
-                    doc.invalidate()
+                    # only the changed pages need to be rendered again
+                    doc.reload()
                 else:
                     doc = pagedview.loadPdf(filename)
                     doc.ispresent = os.path.isfile(filename)
@@ -315,6 +315,10 @@ class ViewManager(QSplitter):
     def activeViewSpace(self):
         return self._viewSpaces[-1]
 
+    def viewSpaces(self):
+        """Return the list of ViewSpaces, the active one last."""
+        return list(self._viewSpaces)
+
     def splitViewSpace(self, viewspace, orientation):
         """Split the given view.
 
@@ -94,31 +94,44 @@ class LinePainter(QObject):
         return True
 
 
+class _Node:
+    """A fold region in the index of a Folder.
+
+    start and end are block numbers, end is None as long as the end of the
+    region is not known (yet). parent is the enclosing region, if any.
+
+    """
+    __slots__ = ('start', 'end', 'parent')
+
+    def __init__(self, start, parent):
+        self.start = start
+        self.end = None
+        self.parent = parent
+
+
 class Folder(QObject):
     """Manages the folding of a QTextDocument.
 
     You should inherit from this class to provide folding events.
     It is enough to implement the fold_events() method.
 
-    By default, simple caching is used to store the nesting depth every
-    20 lines. This makes the depth() method faster, which would otherwise count
-    the fold_events() for every block from the beginning of the document.
-
-    The depth() caching expects that the fold_events that a text block
-    generates do not depend on the contents of a text block later in the
-    document.
+    The Folder maintains an index of the fold level, the depth and the fold
+    regions of every block. The index is computed lazily from the beginning
+    of the document up to the block that is asked for, and it is discarded
+    from the first changed block on when the document changes. This makes
+    fold_level(), depth() and region() fast for the blocks that are shown
+    in the view, even in large documents.
 
-    If your fold_events() method generates events for a text block that depend
-    on a later block, you should disable caching by setting the
-    cache_depth_lines instance (or class) attribute to zero.
+    The index expects that the fold_events that a text block generates do
+    not depend on the contents of a text block later in the document.
 
     """
-    # cache depth() for every n lines (0=disable)
-    cache_depth_lines = 20
-
     def __init__(self, doc):
         QObject.__init__(self, doc)
-        self._depth_cache = []      # cache result of depth()
+        self._levels = []           # Level per block
+        self._depths = []           # depth at the start of every block
+        self._regions = []          # innermost open region after every block
+        self._closed = []           # regions that are closed in every block
         self._all_visible = None    # True when all are certainly visible
         doc.contentsChange.connect(self.slot_contents_change)
         self._timer = QTimer(singleShot=True, timeout=self.check_consistency)
@@ -141,9 +154,7 @@ class Folder(QObject):
 
         """
         block = self.document().findBlock(position)
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            del self._depth_cache[chunk:]
+        self.invalidate(block)
 
         if self._all_visible:
             return
@@ -169,11 +180,54 @@ class Folder(QObject):
                 self.document().markContentsDirty(start, n.position() - start)
         self._timer.start(250 + self.document().blockCount())
 
-    def invalidate_depth_cache(self, block):
-        """Makes sure the depth is recomputed from the specified block."""
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            del self._depth_cache[chunk:]
+    def invalidate(self, block):
+        """Makes sure the index is recomputed from the specified block."""
+        number = block.blockNumber() if block.isValid() else 0
+        for closed in self._closed[number:]:
+            for node in closed:
+                node.end = None
+        del self._levels[number:]
+        del self._depths[number:]
+        del self._regions[number:]
+        del self._closed[number:]
+
+    def _update(self, number, region=None):
+        """(internal) Compute the index up to and including block number.
+
+        If a region is given, the index is computed further until the end
+        of that region is known (or the end of the document is reached).
+
+        """
+        count = len(self._levels)
+        if count > number and (region is None or region.end is not None):
+            return
+        if count:
+            block = self.document().findBlockByNumber(count)
+            depth = self._depths[-1] + sum(self._levels[-1])
+            node = self._regions[-1]
+        else:
+            block = self.document().firstBlock()
+            depth = 0
+            node = None
+        while block.isValid() and (count <= number or
+                                   (region is not None and region.end is None)):
+            level = self._fold_level(block)
+            closed = []
+            for i in range(-level.stop):
+                if node is None:
+                    break
+                node.end = count
+                closed.append(node)
+                node = node.parent
+            for i in range(level.start):
+                node = _Node(count, node)
+            self._levels.append(level)
+            self._depths.append(depth)
+            self._regions.append(node)
+            self._closed.append(closed)
+            depth += sum(level)
+            count += 1
+            block = block.next()
 
     def check_consistency(self):
         """Called some time after the last document change.
@@ -271,6 +325,12 @@ class Folder(QObject):
         folding regions that start and stop on the same text line.
 
         """
+        number = block.blockNumber()
+        self._update(number)
+        return self._levels[number]
+
+    def _fold_level(self, block):
+        """(internal) Compute the fold_level() of the block."""
         start, stop = 0, 0
         for e in self.fold_events(block):
             if e is START:
@@ -284,34 +344,16 @@ class Folder(QObject):
     def depth(self, block):
         """Return the number of active regions at the start of this block.
 
-        The default implementation simply counts all the fold_events from
-        the beginning of the document, using caching if the cache_depth_lines
-        instance attribute is set to a value > 0.
+        This is the sum of all the fold_events from the beginning of the
+        document, which is kept in the index.
 
         """
-        depth = 0
-        last = block.document().firstBlock()
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            if chunk:
-                target = block.document().findBlockByNumber(chunk * self.cache_depth_lines)
-                if chunk <= len(self._depth_cache):
-                    depth = self._depth_cache[chunk - 1]
-                    last = target
-                else:
-                    # some values need to be computed first
-                    if self._depth_cache:
-                        depth = self._depth_cache[-1]
-                        last = block.document().findBlockByNumber(len(self._depth_cache) * self.cache_depth_lines)
-                    while last < target:
-                        depth += sum(self.fold_events(last))
-                        last = last.next()
-                        if last.blockNumber() % self.cache_depth_lines == 0:
-                            self._depth_cache.append(depth)
-        while last < block:
-            depth += sum(self.fold_events(last))
-            last = last.next()
-        return depth
+        if not block.isValid():
+            last = self.document().lastBlock()
+            return self.depth(last) + sum(self.fold_level(last))
+        number = block.blockNumber()
+        self._update(number)
+        return self._depths[number]
 
     def region(self, block, depth=0):
         """Return as Region (start, end) the region of the specified block.
@@ -325,29 +367,28 @@ class Folder(QObject):
         find one more above that, etc. Use -1 to get the top-most region.
 
         """
-        start = None
-        start_depth = 0
+        number = block.blockNumber()
+        self._update(number)
+        node = self._regions[number]
+        if node is None:
+            return
         count = 0
-        for b in cursortools.backwards(block):
-            l = self.fold_level(b)
-            if l.start:
-                count += l.start
-                if count > start_depth:
-                    start = b
-                    start_depth = count
-                    if count > depth > -1:
-                        break
-            count += l.stop
-        if start:
-            count = start_depth
-            end = None
-            for end in cursortools.forwards(block.next()):
-                l = self.fold_level(end)
-                if count <= -l.stop:
-                    return Region(start, end)
-                count += sum(l)
-            if end:
-                return Region(start, end)
+        while True:
+            # regions starting in the same block count as one region
+            while node.parent and node.parent.start == node.start:
+                node = node.parent
+                count += 1
+            count += 1
+            if node.parent is None or count > depth > -1:
+                break
+            node = node.parent
+        self._update(number, node)
+        doc = self.document()
+        if node.end is not None:
+            return Region(doc.findBlockByNumber(node.start), doc.findBlockByNumber(node.end))
+        elif doc.blockCount() > number + 1:
+            # the region is not closed
+            return Region(doc.findBlockByNumber(node.start), doc.lastBlock())
 
     def fold(self, block, depth=0):
         """Fold the region the block is in.
@@ -562,9 +603,13 @@ class FoldingArea(QWidget):
                         folded = next_block.isValid() and not next_block.isVisible()
                         if folded:
                             indicator = OPEN
+                            # skip the folded region at once
+                            r = folder.region(block)
+                            if r and not r.end.previous().isVisible():
+                                next_block = r.end if r.end.isVisible() else r.end.next()
                             while next_block.isValid() and not next_block.isVisible():
-                                count += sum(folder.fold_events(next_block))
                                 next_block = next_block.next()
+                            count = folder.depth(next_block) - depth
                         else:
                             indicator = CLOSE
                     else: